@@ -4,9 +4,16 @@ CrewAI Agent Orchestration for Jira AI Assistant
 Multi-agent system for story generation, estimation, breakdown, and assignment.
 Supports multiple AI providers through the model registry.
 """
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
+import asyncio
+import json
 import logging
 import os
+import re
+import threading
+
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +28,151 @@ except ImportError:
     Agent = Task = Crew = Process = LLM = None
 
 
+# Crew kickoff is blocking, so crews run in a bounded pool shared by all
+# JiraAICrew instances instead of on the event loop.
+_crew_executor: Optional[ThreadPoolExecutor] = None
+_crew_executor_lock = threading.Lock()
+
+
+def _get_crew_executor() -> ThreadPoolExecutor:
+    """Return the shared thread pool used to run crews."""
+    global _crew_executor
+    
+    if _crew_executor is None:
+        with _crew_executor_lock:
+            if _crew_executor is None:
+                _crew_executor = ThreadPoolExecutor(
+                    max_workers=settings.crew_max_workers,
+                    thread_name_prefix="crewai"
+                )
+    return _crew_executor
+
+
+# =============================================================================
+# AGENT AND CREW TEMPLATES
+# =============================================================================
+
+AGENT_SPECS: Dict[str, Dict[str, str]] = {
+    "story_generator": {
+        "role": "User Story Generator",
+        "goal": "Create well-structured user stories from natural language descriptions",
+        "backstory": """You are an expert product owner with 10+ years of experience 
+            writing user stories. You excel at translating vague requirements into 
+            clear, actionable user stories with proper acceptance criteria.""",
+    },
+    "estimator": {
+        "role": "Story Point Estimator",
+        "goal": "Accurately estimate story points using Fibonacci scale (1,2,3,5,8,13,21)",
+        "backstory": """You are a seasoned scrum master with deep expertise in 
+            story point estimation. You consider complexity, uncertainty, and effort 
+            when estimating. You learn from historical data to improve accuracy.""",
+    },
+    "breakdown": {
+        "role": "Story Breakdown Specialist",
+        "goal": "Break large stories into manageable subtasks across different categories",
+        "backstory": """You are a technical lead who excels at decomposing complex 
+            features into smaller, actionable tasks. You organize work by categories 
+            (Frontend, Backend, Testing, Documentation, DevOps) and ensure each 
+            subtask is independently deliverable.""",
+    },
+    "assignment": {
+        "role": "Intelligent Assignment Manager",
+        "goal": "Assign tickets to the most suitable team member based on skills, capacity, and performance",
+        "backstory": """You are an AI-powered resource manager who optimizes team 
+            productivity. You consider technical skills, current workload, past 
+            performance, and team dynamics when making assignments.""",
+    },
+}
+
+# Task descriptions are str.format templates; only the placeholders are bound per request
+CREW_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "story_generation": {
+        "agent": "story_generator",
+        "description": """Generate a complete user story from this description:
+            
+            {prompt}
+            
+            Create a JSON response with:
+            - title: User story in format "As a [user], I want [feature] so that [benefit]"
+            - description: Detailed description with context, problem, and solution
+            - acceptance_criteria: Array of 3-7 specific, testable criteria
+            - technical_requirements: Technical implementation notes
+            - required_skills: Array of required technical skills (e.g., Python, React, AWS)
+            
+            Be specific, clear, and actionable.""",
+        "expected_output": "JSON object with title, description, acceptance_criteria, technical_requirements, and required_skills",
+    },
+    "estimation": {
+        "agent": "estimator",
+        "description": """Estimate story points for this story using Fibonacci scale (1,2,3,5,8,13,21):
+            
+            Title: {title}
+            Description: {description}
+            {context}
+            
+            Consider:
+            - Complexity: How complex is the implementation?
+            - Uncertainty: How much is unknown?
+            - Effort: How much work is required?
+            
+            Respond in JSON format:
+            - points: Integer (Fibonacci number)
+            - reasoning: Brief explanation of the estimate
+            - confidence: Float between 0 and 1""",
+        "expected_output": "JSON object with points, reasoning, and confidence",
+    },
+    "breakdown": {
+        "agent": "breakdown",
+        "description": """Break down this {points}-point story into 4-8 subtasks:
+            
+            Title: {title}
+            Description: {description}
+            
+            Categories: Frontend, Backend, Testing, Documentation, DevOps
+            
+            Each subtask should be 1-3 points and independently deliverable.
+            
+            Respond in JSON format with a "subtasks" array:
+            {{
+              "subtasks": [
+                {{
+                  "title": "Brief subtask title",
+                  "description": "What needs to be done",
+                  "category": "Frontend|Backend|Testing|Documentation|DevOps",
+                  "points": 1-3
+                }}
+              ]
+            }}""",
+        "expected_output": "JSON object with subtasks array",
+    },
+    "assignment": {
+        "agent": "assignment",
+        "description": """Assign this ticket to the best team member:
+            
+            Ticket: {issue_key} - {title}
+            Required Skills: {required_skills}
+            Story Points: {points}
+            
+            Available Team Members:
+            {team_info}
+            
+            Consider:
+            1. Skill match (most important)
+            2. Available capacity
+            3. Past performance
+            4. Workload balance
+            
+            Respond in JSON format:
+            {{
+              "assigned_to": "username",
+              "score": 0.0-1.0,
+              "reasoning": "Why this person is the best choice"
+            }}""",
+        "expected_output": "JSON object with assigned_to, score, and reasoning",
+    },
+}
+
+
 class JiraAICrew:
     """
     CrewAI orchestration for Jira ticket management.
@@ -45,6 +197,10 @@ class JiraAICrew:
         
         self.model_config = model_config or self._get_default_model_config()
         self.llm = self._initialize_llm()
+        self.verbose = settings.crewai_verbose
+        # Agents are built once per thread: a crew mutates its agents while it
+        # runs, so concurrent crews must never share an Agent instance.
+        self._thread_agents = threading.local()
         
         logger.info(f"Initialized CrewAI with model: {self.model_config.get('model_name', 'unknown')}")
     
@@ -130,99 +286,117 @@ class JiraAICrew:
     # AGENTS
     # =========================================================================
     
+    def _get_agent(self, name: str) -> Agent:
+        """Get the calling thread's cached agent for a role, building it on first use."""
+        agents = getattr(self._thread_agents, "agents", None)
+        if agents is None:
+            agents = self._thread_agents.agents = {}
+        
+        agent = agents.get(name)
+        if agent is None:
+            agent = agents[name] = self._new_agent(name)
+        return agent
+    
     def _create_story_generator_agent(self) -> Agent:
-        """Create agent for generating user stories."""
-        return Agent(
-            role="User Story Generator",
-            goal="Create well-structured user stories from natural language descriptions",
-            backstory="""You are an expert product owner with 10+ years of experience 
-            writing user stories. You excel at translating vague requirements into 
-            clear, actionable user stories with proper acceptance criteria.""",
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False
-        )
+        """Get agent for generating user stories."""
+        return self._get_agent("story_generator")
     
     def _create_estimator_agent(self) -> Agent:
-        """Create agent for story point estimation."""
-        return Agent(
-            role="Story Point Estimator",
-            goal="Accurately estimate story points using Fibonacci scale (1,2,3,5,8,13,21)",
-            backstory="""You are a seasoned scrum master with deep expertise in 
-            story point estimation. You consider complexity, uncertainty, and effort 
-            when estimating. You learn from historical data to improve accuracy.""",
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False
-        )
+        """Get agent for story point estimation."""
+        return self._get_agent("estimator")
     
     def _create_breakdown_agent(self) -> Agent:
-        """Create agent for breaking down stories into subtasks."""
-        return Agent(
-            role="Story Breakdown Specialist",
-            goal="Break large stories into manageable subtasks across different categories",
-            backstory="""You are a technical lead who excels at decomposing complex 
-            features into smaller, actionable tasks. You organize work by categories 
-            (Frontend, Backend, Testing, Documentation, DevOps) and ensure each 
-            subtask is independently deliverable.""",
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False
-        )
+        """Get agent for breaking down stories into subtasks."""
+        return self._get_agent("breakdown")
     
     def _create_assignment_agent(self) -> Agent:
-        """Create agent for intelligent ticket assignment."""
-        return Agent(
-            role="Intelligent Assignment Manager",
-            goal="Assign tickets to the most suitable team member based on skills, capacity, and performance",
-            backstory="""You are an AI-powered resource manager who optimizes team 
-            productivity. You consider technical skills, current workload, past 
-            performance, and team dynamics when making assignments.""",
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False
-        )
+        """Get agent for intelligent ticket assignment."""
+        return self._get_agent("assignment")
     
     # =========================================================================
     # CREWS (Agent Workflows)
     # =========================================================================
     
-    def create_story_generation_crew(self, prompt: str) -> Crew:
+    def _new_agent(self, name: str) -> Agent:
+        """Build an uncached agent for a crew that will run on another thread."""
+        return Agent(
+            **AGENT_SPECS[name],
+            llm=self.llm,
+            verbose=self.verbose,
+            allow_delegation=False
+        )
+    
+    def _build_crew(self, template_name: str, fresh_agent: bool = False, **inputs: Any) -> Crew:
         """
-        Create crew for generating a user story from natural language.
+        Bind per-request inputs to a crew template
         
-        Args:
-            prompt: Natural language description of the feature
-            
-        Returns:
-            Crew configured for story generation
+        Uses the calling thread's cached agent, so only call this on the thread
+        that will run the crew (see run_template). fresh_agent builds a new
+        agent instead, for crews handed to another thread.
         """
-        agent = self._create_story_generator_agent()
+        template = CREW_TEMPLATES[template_name]
+        agent = self._new_agent(template["agent"]) if fresh_agent else self._get_agent(template["agent"])
         
         task = Task(
-            description=f"""Generate a complete user story from this description:
-            
-            {prompt}
-            
-            Create a JSON response with:
-            - title: User story in format "As a [user], I want [feature] so that [benefit]"
-            - description: Detailed description with context, problem, and solution
-            - acceptance_criteria: Array of 3-7 specific, testable criteria
-            - technical_requirements: Technical implementation notes
-            - required_skills: Array of required technical skills (e.g., Python, React, AWS)
-            
-            Be specific, clear, and actionable.""",
+            description=template["description"].format(**inputs),
             agent=agent,
-            expected_output="JSON object with title, description, acceptance_criteria, technical_requirements, and required_skills"
+            expected_output=template["expected_output"]
         )
         
         return Crew(
             agents=[agent],
             tasks=[task],
             process=Process.sequential,
-            verbose=True
+            verbose=self.verbose
         )
     
+    @staticmethod
+    def _estimation_inputs(
+        title: str,
+        description: str,
+        similar_stories: Optional[List[Dict]] = None
+    ) -> Dict[str, Any]:
+        context = ""
+        if similar_stories:
+            context = "\n\nSimilar stories for reference:\n"
+            for story in similar_stories:
+                context += f"- {story.get('title', 'N/A')}: {story.get('estimated_points', 'N/A')} points\n"
+        return {"title": title, "description": description, "context": context}
+    
+    @staticmethod
+    def _assignment_inputs(
+        issue_key: str,
+        title: str,
+        required_skills: List[str],
+        points: int,
+        team_members: List[Dict]
+    ) -> Dict[str, Any]:
+        team_info = "\n".join([
+            f"- {m['username']}: Skills={m.get('skills', [])}, "
+            f"Capacity={m.get('available_capacity', 0)}/{m.get('max_capacity', 0)}, "
+            f"Performance={m.get('performance_score', 0)}"
+            for m in team_members
+        ])
+        return {
+            "issue_key": issue_key,
+            "title": title,
+            "required_skills": ", ".join(required_skills),
+            "points": points,
+            "team_info": team_info
+        }
+    
+    def create_story_generation_crew(self, prompt: str) -> Crew:
+        """
+        Create crew for generating a user story from natural language.
+        
+        Args:
+            prompt: Natural language description of the feature
+            
+        Returns:
+            Crew configured for story generation
+        """
+        return self._build_crew("story_generation", fresh_agent=True, prompt=prompt)
+    
     def create_estimation_crew(
         self, 
         title: str, 
@@ -240,39 +414,10 @@ class JiraAICrew:
         Returns:
             Crew configured for estimation
         """
-        agent = self._create_estimator_agent()
-        
-        context = ""
-        if similar_stories:
-            context = "\n\nSimilar stories for reference:\n"
-            for story in similar_stories:
-                context += f"- {story.get('title', 'N/A')}: {story.get('estimated_points', 'N/A')} points\n"
-        
-        task = Task(
-            description=f"""Estimate story points for this story using Fibonacci scale (1,2,3,5,8,13,21):
-            
-            Title: {title}
-            Description: {description}
-            {context}
-            
-            Consider:
-            - Complexity: How complex is the implementation?
-            - Uncertainty: How much is unknown?
-            - Effort: How much work is required?
-            
-            Respond in JSON format:
-            - points: Integer (Fibonacci number)
-            - reasoning: Brief explanation of the estimate
-            - confidence: Float between 0 and 1""",
-            agent=agent,
-            expected_output="JSON object with points, reasoning, and confidence"
-        )
-        
-        return Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
+        return self._build_crew(
+            "estimation",
+            fresh_agent=True,
+            **self._estimation_inputs(title, description, similar_stories)
         )
     
     def create_breakdown_crew(self, title: str, description: str, points: int) -> Crew:
@@ -287,39 +432,7 @@ class JiraAICrew:
         Returns:
             Crew configured for breakdown
         """
-        agent = self._create_breakdown_agent()
-        
-        task = Task(
-            description=f"""Break down this {points}-point story into 4-8 subtasks:
-            
-            Title: {title}
-            Description: {description}
-            
-            Categories: Frontend, Backend, Testing, Documentation, DevOps
-            
-            Each subtask should be 1-3 points and independently deliverable.
-            
-            Respond in JSON format with a "subtasks" array:
-            {{
-              "subtasks": [
-                {{
-                  "title": "Brief subtask title",
-                  "description": "What needs to be done",
-                  "category": "Frontend|Backend|Testing|Documentation|DevOps",
-                  "points": 1-3
-                }}
-              ]
-            }}""",
-            agent=agent,
-            expected_output="JSON object with subtasks array"
-        )
-        
-        return Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
-        )
+        return self._build_crew("breakdown", fresh_agent=True, title=title, description=description, points=points)
     
     def create_assignment_crew(
         self,
@@ -342,46 +455,10 @@ class JiraAICrew:
         Returns:
             Crew configured for assignment
         """
-        agent = self._create_assignment_agent()
-        
-        team_info = "\n".join([
-            f"- {m['username']}: Skills={m.get('skills', [])}, "
-            f"Capacity={m.get('available_capacity', 0)}/{m.get('max_capacity', 0)}, "
-            f"Performance={m.get('performance_score', 0)}"
-            for m in team_members
-        ])
-        
-        task = Task(
-            description=f"""Assign this ticket to the best team member:
-            
-            Ticket: {issue_key} - {title}
-            Required Skills: {', '.join(required_skills)}
-            Story Points: {points}
-            
-            Available Team Members:
-            {team_info}
-            
-            Consider:
-            1. Skill match (most important)
-            2. Available capacity
-            3. Past performance
-            4. Workload balance
-            
-            Respond in JSON format:
-            {{
-              "assigned_to": "username",
-              "score": 0.0-1.0,
-              "reasoning": "Why this person is the best choice"
-            }}""",
-            agent=agent,
-            expected_output="JSON object with assigned_to, score, and reasoning"
-        )
-        
-        return Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
+        return self._build_crew(
+            "assignment",
+            fresh_agent=True,
+            **self._assignment_inputs(issue_key, title, required_skills, points, team_members)
         )
     
     # =========================================================================
@@ -392,6 +469,11 @@ class JiraAICrew:
         """
         Execute a crew and return the result.
         
+        The blocking kickoff runs in the shared bounded crew thread pool so
+        the event loop keeps serving other requests meanwhile.
+        Crews from the create_*_crew builders own their agents, so concurrent
+        run_crew calls never share one.
+        
         Args:
             crew: Configured crew to execute
             
@@ -399,28 +481,37 @@ class JiraAICrew:
             Result as string (usually JSON)
         """
         try:
-            result = crew.kickoff()
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(_get_crew_executor(), crew.kickoff)
             return str(result)
         except Exception as e:
             logger.error(f"Error running crew: {e}", exc_info=True)
             raise
     
-    # =========================================================================
-    # CONVENIENCE METHODS
-    # =========================================================================
-    
-    async def generate_story(self, prompt: str) -> Dict:
-        """Generate a story from natural language (convenience method)."""
-        crew = self.create_story_generation_crew(prompt)
-        result = await self.run_crew(crew)
+    async def run_template(self, template_name: str, **inputs: Any) -> str:
+        """
+        Build and execute a templated crew inside the crew thread pool.
+        
+        Building in the worker thread means each pool thread reuses its own
+        cached agents, so agents are never shared between running crews.
+        """
+        def build_and_kickoff():
+            return self._build_crew(template_name, **inputs).kickoff()
         
-        # Parse JSON from result
-        import json
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(_get_crew_executor(), build_and_kickoff)
+            return str(result)
+        except Exception as e:
+            logger.error(f"Error running {template_name} crew: {e}", exc_info=True)
+            raise
+    
+    @staticmethod
+    def _parse_json_result(result: str) -> Any:
+        """Parse JSON from a crew result, handling markdown-wrapped output."""
         try:
             return json.loads(result)
         except json.JSONDecodeError:
-            # Try to extract JSON from markdown
-            import re
             json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', result, re.DOTALL)
             if json_match:
                 return json.loads(json_match.group(1))
@@ -429,6 +520,15 @@ class JiraAICrew:
                 return json.loads(json_match.group(0))
             raise ValueError("Could not parse JSON from crew result")
     
+    # =========================================================================
+    # CONVENIENCE METHODS
+    # =========================================================================
+    
+    async def generate_story(self, prompt: str) -> Dict:
+        """Generate a story from natural language (convenience method)."""
+        result = await self.run_template("story_generation", prompt=prompt)
+        return self._parse_json_result(result)
+    
     async def estimate_story(
         self, 
         title: str, 
@@ -436,32 +536,13 @@ class JiraAICrew:
         similar_stories: Optional[List[Dict]] = None
     ) -> Dict:
         """Estimate story points (convenience method)."""
-        crew = self.create_estimation_crew(title, description, similar_stories)
-        result = await self.run_crew(crew)
-        
-        import json
-        try:
-            return json.loads(result)
-        except json.JSONDecodeError:
-            import re
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-            raise ValueError("Could not parse JSON from crew result")
+        result = await self.run_template(
+            "estimation",
+            **self._estimation_inputs(title, description, similar_stories)
+        )
+        return self._parse_json_result(result)
     
     async def breakdown_story(self, title: str, description: str, points: int) -> List[Dict]:
         """Break down story into subtasks (convenience method)."""
-        crew = self.create_breakdown_crew(title, description, points)
-        result = await self.run_crew(crew)
-        
-        import json
-        try:
-            parsed = json.loads(result)
-            return parsed.get("subtasks", [])
-        except json.JSONDecodeError:
-            import re
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                parsed = json.loads(json_match.group(0))
-                return parsed.get("subtasks", [])
-            raise ValueError("Could not parse JSON from crew result")
+        result = await self.run_template("breakdown", title=title, description=description, points=points)
+        return self._parse_json_result(result).get("subtasks", [])
@@ -21,11 +21,41 @@ class Settings(BaseSettings):
     openai_embedding_model: str = "text-embedding-3-small"
     openai_temperature: float = 0.7
     
+    # Shared async HTTP pool for LLM calls
+    llm_max_connections: int = 200
+    llm_max_keepalive_connections: int = 50
+    llm_request_timeout: float = 120.0
+    
+    # LLM response cache (TTL in seconds per operation, 0 disables caching)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1000
+    llm_cache_redis_enabled: bool = False
+    llm_cache_ttl_generate: int = 3600
+    llm_cache_ttl_estimate: int = 86400
+    llm_cache_ttl_breakdown: int = 3600
+    llm_cache_ttl_chat: int = 0
+    llm_cache_ttl_fused: int = 3600
+    
+    # Provider rate limits (requests per minute per model key, 0 = unlimited)
+    llm_rate_limit_openai: int = 0
+    llm_rate_limit_deepseek: int = 0
+    llm_rate_limit_gemini: int = 0
+    llm_rate_limit_grok: int = 0
+    
+    # Semantic (embedding-similarity) cache for story generation and estimation
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_ttl: int = 86400
+    semantic_cache_flush_size: int = 50  # Buffered entries per write to a numpy/memmap store
+    semantic_cache_flush_interval: int = 30  # Seconds before buffered entries are written
+    
     # Jira
     jira_url: str = ""
     jira_email: str = ""
     jira_api_token: str = ""
     jira_project_key: str = "PROJ"
+    jira_max_concurrency: int = 8  # Parallel Jira calls (subtask creation, assignment)
+    jira_metadata_ttl: int = 3600  # Cache issue types, projects, boards, priorities, fields
     
     # Jira Custom Fields (Story Points field IDs - try in order)
     jira_story_points_field: str = "customfield_10016,customfield_10002,customfield_10026"
@@ -42,6 +72,17 @@ class Settings(BaseSettings):
     pinecone_environment: str = ""
     pinecone_index_name: str = "jira-ai-stories"
     
+    # Vector store
+    # chroma, numpy (in-process brute-force index) or memmap (numpy index memory-mapped and shared by all workers)
+    vector_store_backend: str = "chroma"
+    vector_store_path: str = "./vector_index"  # Directory for the numpy/memmap index files
+    embedding_backend: str = "auto"  # openai, local (offline feature hashing) or auto (openai when a key is set)
+    local_embedding_dims: int = 1024
+    embedding_batch_size: int = 256  # Texts per embedding request
+    vector_upsert_batch_size: int = 500  # Stories per collection upsert
+    embedding_cache_enabled: bool = True  # Persist embeddings by (model, text hash)
+    embedding_cache_path: str = "./embedding_cache.sqlite3"
+    
     # CORS
     cors_origins: str = "http://localhost:4200,http://localhost:3000"
     
@@ -58,6 +99,8 @@ class Settings(BaseSettings):
     
     # Capacity Calculation
     capacity_sync_interval: int = 900  # 15 minutes
+    capacity_full_sync_interval: int = 21600  # Full reconciliation of the open-issue ledger every 6 hours
+    capacity_sync_overlap: int = 120  # Seconds of overlap added to each incremental "updated since" window
     daily_working_hours: int = 8  # Standard work day
     hours_per_story_point: float = 4.0  # Hours needed per story point
     focus_factor: float = 0.7  # 70% focus factor (accounts for meetings, emails, etc.)
@@ -69,6 +112,28 @@ class Settings(BaseSettings):
     capacity_multiplier_lead: float = 0.8  # 80% (more meetings/mentoring)
     capacity_multiplier_principal: float = 0.7  # 70% (mostly architecture/mentoring)
     
+    # CrewAI (crews run in a bounded thread pool off the event loop)
+    crew_max_workers: int = 8
+    crewai_verbose: bool = False
+    
+    # Story pipeline (staged: generate -> estimate -> breakdown, fused: one combined LLM call,
+    # speculative: estimate, breakdown and Jira creation in parallel after generation)
+    story_pipeline_mode: str = "staged"
+    # Where create-story runs: "background" (in the API process) or "celery" (durable task chain)
+    story_pipeline_backend: str = "background"
+    
+    # Bulk story creation
+    bulk_story_concurrency: int = 5  # Stories processed at once per batch
+    bulk_story_max_stories: int = 200
+    
+    # Story events (push stage transitions to clients; Redis fans out across workers)
+    story_events_redis_enabled: bool = False
+    
+    # Jira webhooks ("inline": apply in the request, "queued": store and apply in micro-batches)
+    webhook_ingest_mode: str = "inline"
+    webhook_batch_size: int = 500
+    webhook_batch_interval: int = 10  # Seconds between micro-batches (queued mode)
+    
     # Assignment
     max_assignment_attempts: int = 3
     assignment_queue_process_interval: int = 3600  # 1 hour
@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
@@ -21,3 +24,39 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def add_missing_columns(metadata):
+    """
+    Add model columns and indexes missing from existing tables
+    
+    create_all only creates missing tables, so columns added to a model later
+    (e.g. StoryRequest.pipeline_stage) would otherwise fail every query on an
+    existing database. Only nullable columns are added; existing rows get NULL.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    with engine.begin() as conn:
+        preparer = conn.dialect.identifier_preparer
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                if not column.nullable:
+                    logger.error(f"Cannot add NOT NULL column {table.name}.{column.name} automatically")
+                    continue
+                
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                ))
+                logger.info(f"Added column {table.name}.{column.name}")
+            
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
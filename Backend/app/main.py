@@ -6,8 +6,9 @@ import logging
 import time
 
 from app.config import settings
-from app.database import engine, get_db
+from app.database import engine, get_db, add_missing_columns
 from app import models, schemas
+from app.services.model_registry import close_async_http_client
 from app.routers import prompt, capacity, assignment, analytics, webhook, settings as settings_router
 
 # Configure logging
@@ -21,6 +22,7 @@ def init_db(max_retries=5, retry_delay=2):
         try:
             logger.info(f"Attempting to connect to database (attempt {attempt + 1}/{max_retries})...")
             models.Base.metadata.create_all(bind=engine)
+            add_missing_columns(models.Base.metadata)
             logger.info("Database tables created successfully")
             return
         except Exception as e:
@@ -96,6 +98,7 @@ async def startup_event():
 async def shutdown_event():
     """Shutdown event"""
     logger.info(f"Shutting down {settings.app_name}")
+    await close_async_http_client()
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -30,6 +30,14 @@ class StoryRequest(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    batch_id = Column(UUID(as_uuid=True), index=True)  # Set for bulk-created stories
+    
+    # Durable pipeline checkpoints (see StoryService.run_pipeline_stage)
+    pipeline_stage = Column(String(50))  # Last completed stage
+    pipeline_options = Column(JSON)  # StoryCreateRequest the pipeline was started with
+    generated_subtasks = Column(JSON)  # AI breakdown output
+    created_subtasks = Column(JSON)  # [{index, key, points, category, assigned_to}]
+    
     # Relationships
     feedback_estimations = relationship("FeedbackEstimation", back_populates="story_request")
     # Removed assignment_history relationship - query directly by issue_key when needed
@@ -80,6 +88,7 @@ class FeedbackEstimation(Base):
     estimation_error = Column(Float)  # Difference between AI and human
     was_accepted = Column(Boolean, default=True)  # Was AI estimation accepted?
     feedback_notes = Column(Text)
+    webhook_event_id = Column(Integer, index=True)  # WebhookEvent this was learned from (replay resets by it)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -102,6 +111,7 @@ class AssignmentHistory(Base):
     performance_score = Column(Float, nullable=True)
     was_reassigned = Column(Boolean, default=False, nullable=True)
     reassignment_reason = Column(Text, nullable=True)
+    reassignment_event_id = Column(Integer, nullable=True, index=True)  # WebhookEvent that set the reassignment
     completion_time_days = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=True)
     completed_at = Column(DateTime, nullable=True)
@@ -158,3 +168,49 @@ class VectorEmbedding(Base):
     actual_points = Column(Integer)
     completion_time_days = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class JiraSyncState(Base):
+    """High-water mark of the incremental capacity sync, per project"""
+    __tablename__ = "jira_sync_state"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_key = Column(String(50), unique=True, nullable=False, index=True)
+    sprint_id = Column(Integer)  # Sprint the ledger was built for
+    watermark = Column(DateTime)  # Start of the last successful sync; next sync fetches issues updated since
+    last_full_sync_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class OpenSprintIssue(Base):
+    """Local ledger of open issues in the active sprint (source for member workload)"""
+    __tablename__ = "open_sprint_issues"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    issue_key = Column(String(50), unique=True, nullable=False, index=True)
+    project_key = Column(String(50), nullable=False, index=True)
+    assignee = Column(String(100), index=True)  # accountId (Cloud) or username (Server)
+    story_points = Column(Float, default=0)
+    status = Column(String(100))
+    jira_updated_at = Column(DateTime)
+    synced_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class WebhookEvent(Base):
+    """Append-only log of raw Jira webhook payloads"""
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # Replay reads events grouped by issue in arrival order
+        Index("ix_webhook_events_issue_key_id", "issue_key", "id"),
+        # Queued processing looks up already processed retries of each change
+        Index("ix_webhook_events_issue_key_changelog_id", "issue_key", "changelog_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    webhook_event = Column(String(50), nullable=False, index=True)  # jira:issue_updated, ...
+    issue_key = Column(String(50), index=True)
+    changelog_id = Column(String(50))  # Jira changelog id; retries of the same change share it
+    payload = Column(JSON, nullable=False)
+    received_at = Column(DateTime, default=datetime.utcnow, index=True)
+    processed_at = Column(DateTime, index=True)  # Null while queued
+    error = Column(Text)  # Set when the event could not be applied
@@ -5,6 +5,7 @@ import logging
 
 from app.database import get_db
 from app import models, schemas
+from app.services.pipeline_metrics import get_pipeline_latency_stats
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -541,3 +542,9 @@ async def get_recent_activity(limit: int = 20, db: Session = Depends(get_db)):
     except Exception as e:
         logger.error(f"Error getting recent activity: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/pipeline-latency")
+async def get_pipeline_latency():
+    """Get story pipeline latency (mean/p50/p95 seconds per phase) by pipeline mode"""
+    return {"modes": get_pipeline_latency_stats()}
@@ -6,6 +6,7 @@ import logging
 from app.database import get_db
 from app import models, schemas
 from app.services.jira_service import JiraService
+from app.services.capacity_sync_service import CapacitySyncService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -99,44 +100,30 @@ async def mark_out_of_office(
 
 
 @router.post("/refresh")
-async def refresh_capacity(db: Session = Depends(get_db)):
-    """Refresh capacity from Jira (active sprint only, excluding Done)"""
+async def refresh_capacity(full: bool = False, db: Session = Depends(get_db)):
+    """
+    Refresh capacity from Jira (active sprint only, excluding Done)
+    
+    Applies only issues changed since the last sync unless `full` is set or
+    a full reconciliation is due.
+    """
     try:
-        jira_service = JiraService()
-        
-        # Get active sprint info
-        sprint_info = jira_service.get_active_sprint()
-        sprint_id = sprint_info.get("id") if sprint_info else None
-        
-        members = db.query(models.TeamMember).all()
-        
-        for member in members:
-            # Get workload from active sprint only
-            workload = jira_service.get_user_workload(member.username, sprint_id)
-            member.current_story_points = workload["story_points"]
-            member.current_ticket_count = workload["ticket_count"]
-            
-            # Update availability status
-            if member.max_story_points > 0:
-                utilization = (member.current_story_points / member.max_story_points) * 100
-                if utilization >= 100:
-                    member.availability_status = "overloaded"
-                elif utilization >= 75:
-                    member.availability_status = "busy"
-                else:
-                    member.availability_status = "available"
-        
-        db.commit()
+        result = CapacitySyncService(db).sync(full=full)
+        sprint_info = result["sprint_info"]
         
         sprint_msg = f" (Sprint: {sprint_info['name']})" if sprint_info else ""
         return {
             "status": "success", 
             "message": f"Capacity refreshed from Jira{sprint_msg}",
+            "mode": result["mode"],
+            "issues_fetched": result["issues_fetched"],
+            "members_updated": result["members_updated"],
             "sprint_info": sprint_info
         }
         
     except Exception as e:
         logger.error(f"Error refreshing capacity: {e}")
+        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -254,6 +241,9 @@ async def sync_team_from_jira(db: Session = Depends(get_db)):
         # Get all users from the Jira project
         jira_users = jira_service.get_project_users()
         
+        # Current workload of everyone in one paginated search
+        team_workload = jira_service.get_team_workload(sprint_info.get("id") if sprint_info else None)
+        
         synced_members = []
         
         for jira_user in jira_users:
@@ -302,7 +292,11 @@ async def sync_team_from_jira(db: Session = Depends(get_db)):
                 capacity_data = jira_service.calculate_user_capacity(
                     username, 
                     sprint_info,
-                    member.seniority_level
+                    member.seniority_level,
+                    workload=(
+                        team_workload.get(username, {"story_points": 0, "ticket_count": 0})
+                        if team_workload is not None else None
+                    )
                 )
                 
                 # Only update max_story_points if not manually overridden
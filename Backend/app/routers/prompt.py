@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
+from datetime import datetime
+from sqlalchemy import func
+import asyncio
+import json
 import logging
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app import models, schemas
-from app.services.story_service import StoryService
-from app.services.ai_service import AIService
+from app.config import settings
+from app.services.story_service import StoryService, process_story_batch
+from app.services.ai_service import get_ai_service
+from app.services.story_events import get_story_event_bus, TERMINAL_STAGES
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -26,6 +33,9 @@ async def create_story(
     3. Breaks down into subtasks (if auto_breakdown=True and points > 5)
     4. Assigns to team member (if auto_assign=True)
     5. Creates ticket in Jira
+    
+    With STORY_PIPELINE_BACKEND=celery the pipeline runs as a durable,
+    checkpointed Celery task chain instead of in the API process.
     """
     try:
         story_service = StoryService(db)
@@ -33,12 +43,16 @@ async def create_story(
         # Create story request record
         story_request = story_service.create_story_request(request)
         
-        # Process in background
-        background_tasks.add_task(
-            story_service.process_story_creation,
-            story_request.request_id,
-            request
-        )
+        if settings.story_pipeline_backend == "celery":
+            from app.tasks.story_tasks import enqueue_story_pipeline
+            enqueue_story_pipeline(story_request.request_id)
+        else:
+            # Process in background
+            background_tasks.add_task(
+                story_service.process_story_creation,
+                story_request.request_id,
+                request
+            )
         
         return schemas.StoryCreateResponse(
             request_id=story_request.request_id,
@@ -51,6 +65,118 @@ async def create_story(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/create-stories/bulk", response_model=schemas.BulkStoryCreateResponse)
+async def create_stories_bulk(
+    request: schemas.BulkStoryCreateRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Create many stories from one planning session
+    
+    Identical prompts (same prompt text and options) are created once and
+    share a request id. Stories run through the pipeline with at most
+    BULK_STORY_CONCURRENCY in flight, sharing one AI and Jira client, and AI
+    calls respect the per-provider rate limits. Parent tickets are created
+    with Jira bulk requests. Track progress with /story-batches/{batch_id}.
+    """
+    if len(request.stories) > settings.bulk_story_max_stories:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many stories in one batch (max {settings.bulk_story_max_stories})"
+        )
+    
+    try:
+        story_service = StoryService(db)
+        batch_id = uuid4()
+        
+        request_ids = []
+        unique_items = []
+        seen = {}
+        for story in request.stories:
+            dedupe_key = json.dumps(
+                {**story.model_dump(mode="json"), "prompt": " ".join(story.prompt.split())},
+                sort_keys=True
+            )
+            if dedupe_key not in seen:
+                story_request = story_service.create_story_request(story, batch_id=batch_id)
+                seen[dedupe_key] = story_request.request_id
+                unique_items.append((story_request.request_id, story))
+            request_ids.append(seen[dedupe_key])
+        
+        if settings.story_pipeline_backend == "celery":
+            from app.tasks.story_tasks import enqueue_story_pipeline
+            for request_id, _ in unique_items:
+                enqueue_story_pipeline(request_id)
+        else:
+            background_tasks.add_task(
+                process_story_batch,
+                [request_id for request_id, _ in unique_items],
+                settings.bulk_story_concurrency
+            )
+        
+        logger.info(f"Batch {batch_id}: {len(unique_items)} stories queued ({len(request.stories) - len(unique_items)} duplicates)")
+        return schemas.BulkStoryCreateResponse(
+            batch_id=batch_id,
+            status="processing",
+            total=len(request.stories),
+            unique=len(unique_items),
+            duplicates=len(request.stories) - len(unique_items),
+            request_ids=request_ids,
+            created_at=datetime.utcnow()
+        )
+    
+    except Exception as e:
+        logger.error(f"Error creating story batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/story-batches/{batch_id}", response_model=schemas.StoryBatchStatusResponse)
+async def get_story_batch_status(
+    batch_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """Aggregate progress of a story batch"""
+    counts = dict(
+        db.query(models.StoryRequest.status, func.count(models.StoryRequest.id))
+        .filter(models.StoryRequest.batch_id == batch_id)
+        .group_by(models.StoryRequest.status)
+        .all()
+    )
+    total = sum(counts.values())
+    if not total:
+        raise HTTPException(status_code=404, detail="Story batch not found")
+    
+    stories = db.query(
+        models.StoryRequest.request_id,
+        models.StoryRequest.status,
+        models.StoryRequest.jira_issue_key,
+        models.StoryRequest.error_message
+    ).filter(
+        models.StoryRequest.batch_id == batch_id
+    ).order_by(models.StoryRequest.id).all()
+    
+    finished = counts.get("completed", 0) + counts.get("failed", 0)
+    return schemas.StoryBatchStatusResponse(
+        batch_id=batch_id,
+        total=total,
+        pending=counts.get("pending", 0),
+        processing=counts.get("processing", 0),
+        completed=counts.get("completed", 0),
+        failed=counts.get("failed", 0),
+        progress=round(finished / total, 4),
+        stories=[
+            schemas.StoryBatchItem(
+                request_id=story.request_id,
+                status=story.status,
+                jira_issue_key=story.jira_issue_key,
+                error_message=story.error_message
+            )
+            for story in stories
+        ]
+    )
+
+
 @router.get("/story-status/{request_id}", response_model=schemas.StoryStatusResponse)
 async def get_story_status(
     request_id: UUID,
@@ -84,6 +210,90 @@ async def get_story_status(
     )
 
 
+@router.post("/story-resume/{request_id}", response_model=schemas.StoryCreateResponse)
+async def resume_story(
+    request_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Resume a failed or interrupted story request from its last checkpoint
+    
+    Completed stages (generation, estimate, Jira issue, subtasks...) are
+    not redone.
+    """
+    story_request = db.query(models.StoryRequest).filter(
+        models.StoryRequest.request_id == request_id
+    ).first()
+    
+    if not story_request:
+        raise HTTPException(status_code=404, detail="Story request not found")
+    if story_request.status == "completed":
+        raise HTTPException(status_code=409, detail="Story request already completed")
+    if not story_request.pipeline_options:
+        raise HTTPException(status_code=409, detail="Story request has no pipeline checkpoint to resume from")
+    
+    story_service = StoryService(db)
+    story_service.reset_for_resume(story_request)
+    
+    if settings.story_pipeline_backend == "celery":
+        from app.tasks.story_tasks import enqueue_story_pipeline
+        enqueue_story_pipeline(request_id)
+    else:
+        background_tasks.add_task(story_service.run_pipeline, request_id)
+    
+    return schemas.StoryCreateResponse(
+        request_id=story_request.request_id,
+        status="processing",
+        created_at=story_request.created_at
+    )
+
+
+@router.get("/story-events/{request_id}")
+async def story_events(request_id: UUID):
+    """
+    Push story creation progress as Server-Sent Events
+    
+    Sends the current status first, then a 'stage' event per pipeline
+    transition (generating, estimating, jira_created, subtasks_created,
+    assigned, completed/failed). The stream closes after a terminal stage;
+    clients then fetch /story-status once for the full result.
+    """
+    # Short-lived session: the stream can stay open for the whole pipeline
+    db = SessionLocal()
+    try:
+        story_request = db.query(models.StoryRequest).filter(
+            models.StoryRequest.request_id == request_id
+        ).first()
+        if not story_request:
+            raise HTTPException(status_code=404, detail="Story request not found")
+        status = story_request.status
+    finally:
+        db.close()
+    
+    bus = get_story_event_bus()
+    
+    async def event_stream():
+        last_event = await asyncio.to_thread(bus.get_last_event, request_id)
+        if status in TERMINAL_STAGES or not last_event:
+            last_event = {"request_id": str(request_id), "stage": status}
+        yield f"event: stage\ndata: {json.dumps(last_event, default=str)}\n\n"
+        if last_event["stage"] in TERMINAL_STAGES:
+            return
+        
+        async for event in bus.subscribe(request_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: stage\ndata: {json.dumps(event, default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/chat", response_model=schemas.ChatResponse)
 async def chat(
     message: schemas.ChatMessage,
@@ -95,7 +305,7 @@ async def chat(
     Users can chat with AI to create stories interactively
     """
     try:
-        ai_service = AIService()
+        ai_service = get_ai_service()
         response = await ai_service.process_chat_message(
             message.message,
             message.session_id,
@@ -107,6 +317,35 @@ async def chat(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+async def chat_stream(message: schemas.ChatMessage):
+    """
+    Streaming variant of /chat using Server-Sent Events
+    
+    Emits 'token' events as the model produces text, then a 'done' event
+    carrying time-to-first-token and total-time metrics.
+    """
+    try:
+        ai_service = get_ai_service()
+    except Exception as e:
+        logger.error(f"Error in chat stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def event_stream():
+        async for event in ai_service.stream_chat_message(
+            message.message,
+            message.session_id,
+            message.context
+        ):
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/suggest-estimation", response_model=schemas.EstimationSuggestionResponse)
 async def suggest_estimation(
     request: schemas.EstimationSuggestionRequest,
@@ -118,7 +357,7 @@ async def suggest_estimation(
     Uses RAG to find similar stories and suggest story points
     """
     try:
-        ai_service = AIService()
+        ai_service = get_ai_service()
         suggestion = await ai_service.suggest_estimation(
             request.story_title,
             request.story_description
@@ -4,6 +4,11 @@ import logging
 import os
 from typing import Optional, Dict, List
 from app.services.model_registry import list_available_models, initialize_model_client
+from app.services.ai_service import invalidate_ai_services
+from app.services.llm_cache import get_llm_cache
+from app.services.semantic_cache import get_semantic_cache
+from app.services.embedding_cache import get_embedding_cache
+from app.services.jira_service import JiraService
 
 logger = logging.getLogger(__name__)
 
@@ -198,6 +203,9 @@ async def update_ai_model(model_settings: AIModelSettings):
         if hasattr(settings, 'openai_temperature'):
             settings.openai_temperature = model_settings.temperature
         
+        # Pooled AI services hold clients built from the old configuration
+        invalidate_ai_services()
+        
         logger.info(f"Updated AI model to {provider}: {model_settings.model}")
         
         return {
@@ -218,6 +226,44 @@ async def update_ai_model(model_settings: AIModelSettings):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """Get LLM response cache hit/miss statistics"""
+    return get_llm_cache().get_stats()
+
+
+@router.get("/semantic-cache")
+async def get_semantic_cache_stats():
+    """Get semantic cache statistics, including similarity of recent hits"""
+    semantic_cache = get_semantic_cache()
+    if not semantic_cache:
+        return {"enabled": False}
+    return semantic_cache.get_stats()
+
+
+@router.get("/embedding-cache")
+async def get_embedding_cache_stats():
+    """Get persistent embedding cache size and hit/miss statistics"""
+    embedding_cache = get_embedding_cache()
+    if not embedding_cache:
+        return {"enabled": False}
+    return embedding_cache.get_stats()
+
+
+@router.post("/llm-cache/clear")
+async def clear_llm_cache():
+    """Clear the in-process LLM response cache"""
+    get_llm_cache().clear()
+    return {"status": "success", "message": "LLM response cache cleared"}
+
+
+@router.post("/jira-metadata/refresh")
+async def refresh_jira_metadata():
+    """Re-fetch cached Jira metadata (issue types, projects, boards, priorities, fields)"""
+    JiraService.refresh_metadata()
+    return {"status": "success", "message": "Jira metadata cache cleared"}
+
+
 @router.post("/test-connection")
 async def test_ai_connection(model_settings: AIModelSettings):
     """Test AI model connection using model registry"""
@@ -266,7 +312,8 @@ async def test_ai_connection(model_settings: AIModelSettings):
                 }
             
             # Test with a simple completion
-            from app.services.model_registry import get_completion_handler
+            from app.services.model_registry import get_completion_handler, get_async_completion_handler
+            async_handler = get_async_completion_handler(provider)
             handler = get_completion_handler(provider)
             
             if not handler:
@@ -276,7 +323,10 @@ async def test_ai_connection(model_settings: AIModelSettings):
                 }
             
             messages = [{"role": "user", "content": "Say 'Hello' in one word"}]
-            response = handler(model_instance, messages, max_tokens=10, temperature=0.5)
+            if async_handler:
+                response = await async_handler(model_instance, messages, max_tokens=10, temperature=0.5)
+            else:
+                response = handler(model_instance, messages, max_tokens=10, temperature=0.5)
             
             return {
                 "status": "success",
@@ -1,21 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import logging
 
 from app.database import get_db
-from app import models, schemas
+from app import schemas
+from app.config import settings
+from app.services.webhook_service import WebhookService, CAPACITY_EVENTS
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.post("/jira", response_model=schemas.WebhookResponse)
-async def jira_webhook(request: Request, db: Session = Depends(get_db)):
+async def jira_webhook(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Handle Jira webhooks for learning from human changes
     
     Events handled:
     - issue_updated: Capture estimation changes, reassignments
-    - issue_created: Track manually created issues
+    - issue_created/updated/deleted: Keep the open sprint issue ledger and
+      team workload up to date in near real time
+    
+    With WEBHOOK_INGEST_MODE=queued the raw event is only stored and a 202 is
+    returned; the Celery worker applies queued events in micro-batches.
     """
     try:
         payload = await request.json()
@@ -23,88 +30,42 @@ async def jira_webhook(request: Request, db: Session = Depends(get_db)):
         
         logger.info(f"Received Jira webhook: {webhook_event}")
         
-        if webhook_event == "jira:issue_updated":
-            return await handle_issue_updated(payload, db)
-        elif webhook_event == "jira:issue_created":
-            return await handle_issue_created(payload, db)
-        else:
+        if webhook_event not in CAPACITY_EVENTS:
             return schemas.WebhookResponse(
                 status="ignored",
                 message=f"Event {webhook_event} not handled"
             )
-            
+        
+        service = WebhookService(db)
+        
+        if settings.webhook_ingest_mode == "queued":
+            service.record_event(payload)
+            db.commit()
+            response.status_code = 202
+            return schemas.WebhookResponse(status="queued", message=f"Event {webhook_event} queued")
+        
+        # Jira and database calls are blocking; keep them off the event loop
+        return await run_in_threadpool(handle_issue_event, service, webhook_event, payload)
+    
     except Exception as e:
         logger.error(f"Error processing webhook: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def handle_issue_updated(payload: dict, db: Session) -> schemas.WebhookResponse:
-    """Handle issue update events"""
+def handle_issue_event(service: WebhookService, webhook_event: str, payload: dict) -> schemas.WebhookResponse:
+    """Apply an issue event within the request"""
+    issue_key = payload.get("issue", {}).get("key")
     try:
-        issue = payload.get("issue", {})
-        issue_key = issue.get("key")
-        changelog = payload.get("changelog", {})
-        
-        if not changelog:
-            return schemas.WebhookResponse(status="ignored", message="No changes")
-        
-        # Check for estimation changes
-        for item in changelog.get("items", []):
-            field = item.get("field")
-            
-            # Story points changed
-            if field == "Story Points":
-                from_value = item.get("fromString")
-                to_value = item.get("toString")
-                
-                # Find story request
-                story_request = db.query(models.StoryRequest).filter(
-                    models.StoryRequest.jira_issue_key == issue_key
-                ).first()
-                
-                if story_request:
-                    # Create feedback record
-                    feedback = models.FeedbackEstimation(
-                        issue_key=issue_key,
-                        ai_estimated_points=story_request.estimated_points,
-                        human_estimated_points=int(to_value) if to_value else None,
-                        estimation_error=abs(story_request.estimated_points - int(to_value)) if to_value else 0,
-                        was_accepted=False
-                    )
-                    db.add(feedback)
-                    logger.info(f"Captured estimation change for {issue_key}: {from_value} -> {to_value}")
-            
-            # Assignee changed
-            elif field == "assignee":
-                from_user = item.get("from")
-                to_user = item.get("to")
-                
-                # Find assignment record
-                assignment = db.query(models.AssignmentHistory).filter(
-                    models.AssignmentHistory.issue_key == issue_key
-                ).first()
-                
-                if assignment and from_user != to_user:
-                    assignment.was_reassigned = True
-                    assignment.reassignment_reason = f"Manually reassigned from {from_user} to {to_user}"
-                    logger.info(f"Captured reassignment for {issue_key}: {from_user} -> {to_user}")
-        
-        db.commit()
-        
-        return schemas.WebhookResponse(
-            status="processed",
-            message=f"Processed changes for {issue_key}"
-        )
-        
+        service.process_event(payload)
     except Exception as e:
-        logger.error(f"Error handling issue update: {e}")
+        service.db.rollback()
+        logger.error(f"Error handling {webhook_event}: {e}")
         return schemas.WebhookResponse(status="error", message=str(e))
-
-
-async def handle_issue_created(payload: dict, db: Session) -> schemas.WebhookResponse:
-    """Handle issue creation events"""
-    # Can be used to track manually created issues for learning
-    return schemas.WebhookResponse(
-        status="received",
-        message="Issue creation logged"
-    )
+    
+    if webhook_event == "jira:issue_created":
+        return schemas.WebhookResponse(status="received", message="Issue creation logged")
+    if webhook_event == "jira:issue_deleted":
+        return schemas.WebhookResponse(status="processed", message=f"Removed {issue_key} from workload")
+    if not payload.get("changelog"):
+        return schemas.WebhookResponse(status="ignored", message="No changes")
+    return schemas.WebhookResponse(status="processed", message=f"Processed changes for {issue_key}")
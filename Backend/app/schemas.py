@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 from uuid import UUID
 
@@ -16,6 +16,10 @@ class StoryCreateRequest(BaseModel):
     auto_breakdown: bool = Field(default=True, description="Auto-break into subtasks if > 5 points")
     auto_estimate: bool = Field(default=True, description="Auto-estimate story points")
     auto_assign: bool = Field(default=True, description="Auto-assign to team member")
+    pipeline_mode: Optional[Literal["staged", "fused", "speculative"]] = Field(
+        None,
+        description="staged, fused or speculative (defaults to STORY_PIPELINE_MODE)"
+    )
     
     class Config:
         json_schema_extra = {
@@ -66,6 +70,42 @@ class StoryStatusResponse(BaseModel):
     error_message: Optional[str] = None
 
 
+class BulkStoryCreateRequest(BaseModel):
+    """Request to create many stories in one batch"""
+    stories: List[StoryCreateRequest] = Field(..., min_length=1, description="Stories to create")
+
+
+class BulkStoryCreateResponse(BaseModel):
+    """Response after submitting a story batch"""
+    batch_id: UUID
+    status: str
+    total: int  # Stories submitted
+    unique: int  # Stories actually created after deduplication
+    duplicates: int
+    request_ids: List[UUID]  # One per submitted story; duplicates share an id
+    created_at: datetime
+
+
+class StoryBatchItem(BaseModel):
+    """Status of one story in a batch"""
+    request_id: UUID
+    status: str
+    jira_issue_key: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+class StoryBatchStatusResponse(BaseModel):
+    """Aggregate progress of a story batch"""
+    batch_id: UUID
+    total: int
+    pending: int
+    processing: int
+    completed: int
+    failed: int
+    progress: float  # Fraction of stories finished (completed or failed)
+    stories: List[StoryBatchItem]
+
+
 # ============= Team Capacity =============
 
 class TeamMemberBase(BaseModel):
@@ -289,5 +329,5 @@ class JiraWebhookPayload(BaseModel):
 
 class WebhookResponse(BaseModel):
     """Webhook processing response"""
-    status: str  # received, processed, ignored
+    status: str  # received, processed, queued, ignored, error
     message: Optional[str] = None
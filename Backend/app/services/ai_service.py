@@ -1,13 +1,21 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
 import logging
 import json
 import re
+import threading
+import time
 from app.config import settings
 from app.services.model_registry import (
     initialize_model_client,
     get_completion_handler,
+    get_async_completion_handler,
+    get_stream_handler,
     list_available_models,
 )
+from app.services.llm_cache import get_llm_cache, get_operation_ttl
+from app.services.rate_limiter import get_provider_rate_limiter
+from app.services.semantic_cache import get_semantic_cache
 
 # CrewAI is optional - only import if available
 try:
@@ -19,14 +27,58 @@ except ImportError:
 
 # VectorService is optional - only import if available
 try:
-    from app.services.vector_service import VectorService
+    from app.services.vector_service import VectorService, get_vector_service
     VECTOR_SERVICE_AVAILABLE = True
 except ImportError:
     VECTOR_SERVICE_AVAILABLE = False
     VectorService = None
+    get_vector_service = None
 
 logger = logging.getLogger(__name__)
 
+# Story point scale the estimation prompts ask for
+FIBONACCI_POINTS = {1, 2, 3, 5, 8, 13, 21}
+
+
+def detect_model_from_settings() -> str:
+    """Auto-detect which model to use based on settings."""
+    import os
+    
+    # Priority order: Check environment variables for API keys
+    # 1. Check for DeepSeek
+    if os.getenv("DEEPSEEK_API_KEY"):
+        logger.info("Auto-detected DeepSeek from DEEPSEEK_API_KEY")
+        return "deepseek"
+    
+    # 2. Check for Grok
+    if os.getenv("GROK_API_KEY"):
+        logger.info("Auto-detected Grok from GROK_API_KEY")
+        return "grok"
+    
+    # 3. Check for Gemini
+    if os.getenv("GEMINI_API_KEY"):
+        logger.info("Auto-detected Gemini from GEMINI_API_KEY")
+        return "gemini"
+    
+    # 4. Check for OpenAI
+    if settings.openai_api_key:
+        logger.info("Auto-detected OpenAI from OPENAI_API_KEY")
+        return "openai"
+    
+    # 5. Check API base URL as fallback
+    if settings.openai_api_base:
+        if 'deepseek' in settings.openai_api_base.lower():
+            logger.info("Auto-detected DeepSeek from API base URL")
+            return "deepseek"
+        if 'x.ai' in settings.openai_api_base.lower():
+            logger.info("Auto-detected Grok from API base URL")
+            return "grok"
+    
+    # Default to OpenAI (will fail if no key, but that's expected)
+    logger.warning("No AI model API key found, defaulting to OpenAI")
+    return "openai"
+
+
 class AIService:
     """Service for AI/LLM operations with multi-model support via registry"""
     
@@ -38,11 +90,11 @@ class AIService:
             model_key: Model identifier (openai, deepseek, gemini, grok)
                       If None, attempts to auto-detect from settings
         """
-        self.vector_service = VectorService() if VECTOR_SERVICE_AVAILABLE else None
+        self.vector_service = get_vector_service() if VECTOR_SERVICE_AVAILABLE else None
         
         # Auto-detect model if not specified
         if not model_key:
-            model_key = self._detect_model_from_settings()
+            model_key = detect_model_from_settings()
         
         self.model_key = model_key
         self.model_instance = initialize_model_client(model_key)
@@ -55,6 +107,10 @@ class AIService:
         if not self.completion_handler:
             raise ValueError(f"No completion handler for model: {model_key}")
         
+        # Native async handler keeps the event loop free during LLM round trips
+        self.async_completion_handler = get_async_completion_handler(model_key)
+        self.stream_handler = get_stream_handler(model_key)
+        
         logger.info(f"Initialized AI service with model: {self.model_instance.get('display_name')}")
         
         # Initialize CrewAI with model configuration
@@ -100,65 +156,85 @@ class AIService:
             if not CREWAI_AVAILABLE:
                 logger.info("CrewAI not available - using direct model calls")
     
-    def _detect_model_from_settings(self) -> str:
-        """Auto-detect which model to use based on settings."""
-        import os
-        
-        # Priority order: Check environment variables for API keys
-        # 1. Check for DeepSeek
-        if os.getenv("DEEPSEEK_API_KEY"):
-            logger.info("Auto-detected DeepSeek from DEEPSEEK_API_KEY")
-            return "deepseek"
-        
-        # 2. Check for Grok
-        if os.getenv("GROK_API_KEY"):
-            logger.info("Auto-detected Grok from GROK_API_KEY")
-            return "grok"
-        
-        # 3. Check for Gemini
-        if os.getenv("GEMINI_API_KEY"):
-            logger.info("Auto-detected Gemini from GEMINI_API_KEY")
-            return "gemini"
-        
-        # 4. Check for OpenAI
-        if settings.openai_api_key:
-            logger.info("Auto-detected OpenAI from OPENAI_API_KEY")
-            return "openai"
-        
-        # 5. Check API base URL as fallback
-        if settings.openai_api_base:
-            if 'deepseek' in settings.openai_api_base.lower():
-                logger.info("Auto-detected DeepSeek from API base URL")
-                return "deepseek"
-            if 'x.ai' in settings.openai_api_base.lower():
-                logger.info("Auto-detected Grok from API base URL")
-                return "grok"
-        
-        # Default to OpenAI (will fail if no key, but that's expected)
-        logger.warning("No AI model API key found, defaulting to OpenAI")
-        return "openai"
-    
     @staticmethod
     def list_models() -> List[Dict]:
         """List all available AI models."""
         return list_available_models()
     
-    def _call_model(self, messages: List[Dict], **kwargs) -> str:
+    async def _call_model(self, messages: List[Dict], operation: str = None, **kwargs) -> str:
         """
         Call the AI model with messages.
         
+        Uses the model's async handler when registered; otherwise the sync
+        handler runs in a worker thread so the event loop is never blocked.
+        Responses are served from the LLM cache when the operation has a TTL;
+        misses wait on the provider's rate limiter.
+        
         Args:
             messages: List of message dicts with 'role' and 'content'
+            operation: Cache bucket (generate, estimate, breakdown, chat)
             **kwargs: Additional parameters (temperature, max_tokens, json_mode, etc.)
         
         Returns:
             Model response as string
         """
+        cache = get_llm_cache()
+        ttl = get_operation_ttl(operation)
+        cache_key = None
+        if ttl > 0:
+            cache_key = cache.make_key(
+                self.model_key,
+                self.model_instance.get("model_name"),
+                messages,
+                temperature=kwargs.get("temperature"),
+                json_mode=kwargs.get("json_mode", False),
+                max_tokens=kwargs.get("max_tokens")
+            )
+            cached = await cache.get(cache_key, operation)
+            if cached is not None:
+                logger.debug(f"LLM cache hit for {operation}")
+                return cached
+        
+        rate_limiter = get_provider_rate_limiter(self.model_key)
+        if rate_limiter:
+            await rate_limiter.acquire()
+        
         try:
-            return self.completion_handler(self.model_instance, messages, **kwargs)
+            if self.async_completion_handler:
+                response_text = await self.async_completion_handler(self.model_instance, messages, **kwargs)
+            else:
+                response_text = await asyncio.to_thread(self.completion_handler, self.model_instance, messages, **kwargs)
         except Exception as e:
             logger.error(f"Error calling model: {e}", exc_info=True)
             raise
+        
+        if cache_key and response_text:
+            await cache.set(cache_key, response_text, ttl)
+        return response_text
+    
+    async def _semantic_cache_lookup(self, operation: str, text: str) -> Optional[Dict]:
+        """Return a cached result for a near-duplicate prompt, if any."""
+        semantic_cache = get_semantic_cache()
+        if not semantic_cache:
+            return None
+        
+        try:
+            hit = await asyncio.to_thread(semantic_cache.lookup, operation, self.model_key, text)
+            return hit["result"] if hit else None
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+    
+    async def _semantic_cache_store(self, operation: str, text: str, result: Dict) -> None:
+        """Remember a successful result for future near-duplicate prompts."""
+        semantic_cache = get_semantic_cache()
+        if not semantic_cache:
+            return
+        
+        try:
+            await asyncio.to_thread(semantic_cache.store, operation, self.model_key, text, result)
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
     
     def _extract_json_from_response(self, content: str) -> Dict:
         """Extract JSON from response, handling both pure JSON and markdown-wrapped JSON"""
@@ -190,12 +266,17 @@ class AIService:
             }
         """
         try:
+            cached = await self._semantic_cache_lookup("generate", prompt)
+            if cached:
+                return cached
+            
             # Try CrewAI first if available
             if self.crew_manager and CREWAI_AVAILABLE:
                 try:
                     logger.info("Using CrewAI for story generation")
                     result = await self.crew_manager.generate_story(prompt)
                     logger.info(f"CrewAI generated story: {result.get('title', 'N/A')}")
+                    await self._semantic_cache_store("generate", prompt, result)
                     return result
                 except Exception as e:
                     logger.warning(f"CrewAI failed, falling back to direct model call: {e}")
@@ -218,8 +299,9 @@ Be specific, clear, and actionable."""
             ]
             
             # Call model with JSON mode if supported
-            response_text = self._call_model(
+            response_text = await self._call_model(
                 messages,
+                operation="generate",
                 temperature=0.7,
                 json_mode=self.model_instance.get("supports_json_mode", False)
             )
@@ -227,6 +309,7 @@ Be specific, clear, and actionable."""
             # Extract JSON from response (handles both pure JSON and markdown-wrapped)
             result = self._extract_json_from_response(response_text)
             logger.info(f"Generated story: {result.get('title', 'N/A')}")
+            await self._semantic_cache_store("generate", prompt, result)
             return result
             
         except Exception as e:
@@ -252,21 +335,35 @@ Be specific, clear, and actionable."""
             }
         """
         try:
+            cache_text = f"{title}\n\n{description}"
+            cached = await self._semantic_cache_lookup("estimate", cache_text)
+            if cached:
+                return cached
+            
             # Find similar stories using RAG if available
             similar_stories = []
             if self.vector_service:
                 try:
-                    similar_stories = self.vector_service.find_similar_stories(title, description, top_k=3)
+                    similar_stories = await asyncio.to_thread(
+                        self.vector_service.find_similar_stories, title, description, 3
+                    )
                 except Exception:
                     pass
             
-            # Use CrewAI if available
+            # Use CrewAI if available; the direct model call is only a fallback
             if self.crew_manager:
                 try:
-                    crew = self.crew_manager.create_estimation_crew(title, description, similar_stories)
-                    result_text = await self.crew_manager.run_crew(crew)
-                except Exception:
-                    pass
+                    result = await self.crew_manager.estimate_story(title, description, similar_stories)
+                    result["points"] = int(result["points"])
+                    if result["points"] not in FIBONACCI_POINTS:
+                        raise ValueError(f"crew returned {result['points']} points, not on the Fibonacci scale")
+                    result.setdefault("reasoning", "")
+                    result.setdefault("confidence", 0.5)
+                    logger.info(f"CrewAI estimated {result['points']} points for: {title} (with RAG)")
+                    await self._semantic_cache_store("estimate", cache_text, result)
+                    return result
+                except Exception as e:
+                    logger.warning(f"CrewAI estimation failed, falling back to direct model call: {e}")
             
             # Use model registry for estimation
             context = ""
@@ -293,14 +390,16 @@ Respond in JSON format:
                 {"role": "user", "content": f"Title: {title}\n\nDescription: {description}"}
             ]
             
-            response_text = self._call_model(
+            response_text = await self._call_model(
                 messages,
+                operation="estimate",
                 temperature=0.5,
                 json_mode=self.model_instance.get("supports_json_mode", False)
             )
             
             result = self._extract_json_from_response(response_text)
             logger.info(f"Estimated {result.get('points', 'N/A')} points for: {title} (with RAG)")
+            await self._semantic_cache_store("estimate", cache_text, result)
             return result
             
         except Exception as e:
@@ -311,10 +410,13 @@ Respond in JSON format:
                 "confidence": 0.5
             }
     
-    async def breakdown_story(self, title: str, description: str, points: int) -> List[Dict]:
+    async def breakdown_story(self, title: str, description: str, points: Optional[int] = None) -> List[Dict]:
         """
         Break down large story into subtasks
         
+        points may be None when the breakdown runs speculatively, in parallel
+        with estimation.
+        
         Returns:
             [
                 {
@@ -327,7 +429,8 @@ Respond in JSON format:
             ]
         """
         try:
-            system_prompt = f"""You are a task breakdown expert. Break this {points}-point story into 4-8 subtasks.
+            story_size = f"{points}-point " if points else ""
+            system_prompt = f"""You are a task breakdown expert. Break this {story_size}story into 4-8 subtasks.
 
 Categories: Frontend, Backend, Testing, Documentation, DevOps
 
@@ -348,8 +451,9 @@ Each subtask should be 1-3 points. Respond in JSON format with a "subtasks" arra
                 {"role": "user", "content": f"Title: {title}\n\nDescription: {description}"}
             ]
             
-            response_text = self._call_model(
+            response_text = await self._call_model(
                 messages,
+                operation="breakdown",
                 temperature=0.7,
                 json_mode=self.model_instance.get("supports_json_mode", False)
             )
@@ -370,6 +474,136 @@ Each subtask should be 1-3 points. Respond in JSON format with a "subtasks" arra
             logger.error(f"Error breaking down story: {e}", exc_info=True)
             return []
     
+    async def generate_story_bundle(self, prompt: str, breakdown_threshold: Optional[int] = 5) -> Dict:
+        """
+        Generate story, estimate and subtasks in a single model call (fused mode)
+        
+        Raises on a missing or malformed response so callers can fall back to
+        the staged generate -> estimate -> breakdown path.
+        
+        Args:
+            prompt: User's request
+            breakdown_threshold: Points above which subtasks are required;
+                None when breakdown is off (no subtasks are asked for)
+        
+        Returns:
+            {
+                "title": "...", "description": "...", "acceptance_criteria": [...],
+                "technical_requirements": "...", "required_skills": [...],
+                "points": 8, "reasoning": "...", "confidence": 0.8,
+                "subtasks": [{"title": ..., "description": ..., "category": ..., "points": 2}, ...]
+            }
+        """
+        # RAG on the raw prompt since no title/description exists yet
+        similar_stories = []
+        if self.vector_service:
+            try:
+                similar_stories = await asyncio.to_thread(
+                    self.vector_service.find_similar_stories, prompt, "", 3
+                )
+            except Exception:
+                pass
+        
+        context = ""
+        if similar_stories:
+            context = "\n\nSimilar stories for reference:\n"
+            for story in similar_stories:
+                context += f"- {story.get('title', 'N/A')}: {story.get('estimated_points', 'N/A')} points (similarity: {story.get('similarity_score', 0)})\n"
+        
+        if breakdown_threshold is None:
+            breakdown_rule = "Do not break the story down: return an empty subtasks array."
+        else:
+            breakdown_rule = (
+                f"If points > {breakdown_threshold}, break the story into 4-8 subtasks of 1-3 points each\n"
+                "(categories: Frontend, Backend, Testing, Documentation, DevOps). Otherwise return an empty subtasks array."
+            )
+        
+        system_prompt = f"""You are a Jira story creation, estimation and task breakdown expert.
+Turn the request into a user story, estimate it and, if needed, break it down.
+
+Estimate using Fibonacci scale: 1, 2, 3, 5, 8, 13, 21. Consider complexity, uncertainty and effort.
+{breakdown_rule}
+{context}
+Respond with a single JSON object:
+{{
+  "title": "As a [user], I want [feature] so that [benefit]",
+  "description": "Detailed description with context, problem, and solution",
+  "acceptance_criteria": ["3-7 testable criteria"],
+  "technical_requirements": "Technical implementation notes",
+  "required_skills": ["Required technical skills"],
+  "points": 5,
+  "reasoning": "Brief explanation of the estimate",
+  "confidence": 0.8,
+  "subtasks": [
+    {{
+      "title": "Brief subtask title",
+      "description": "What needs to be done",
+      "category": "Frontend|Backend|Testing|Documentation|DevOps",
+      "points": 2
+    }}
+  ]
+}}"""
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Create a user story for: {prompt}"}
+        ]
+        
+        response_text = await self._call_model(
+            messages,
+            operation="fused",
+            temperature=0.5,
+            max_tokens=3000,
+            json_mode=self.model_instance.get("supports_json_mode", False)
+        )
+        
+        result = self._validate_story_bundle(self._extract_json_from_response(response_text), breakdown_threshold)
+        logger.info(
+            f"Generated story bundle: {result['title']} "
+            f"({result['points']} points, {len(result['subtasks'])} subtasks)"
+        )
+        return result
+    
+    @staticmethod
+    def _validate_story_bundle(result: Dict, breakdown_threshold: Optional[int] = None) -> Dict:
+        """
+        Check a fused response has every field the pipeline needs
+        
+        A story above breakdown_threshold without subtasks is rejected so the
+        caller falls back to the staged path, which runs a real breakdown.
+        """
+        if not isinstance(result, dict):
+            raise ValueError("Story bundle is not a JSON object")
+        
+        for field in ("title", "description"):
+            if not isinstance(result.get(field), str) or not result[field].strip():
+                raise ValueError(f"Story bundle missing '{field}'")
+        
+        if not isinstance(result.get("acceptance_criteria"), list):
+            raise ValueError("Story bundle missing 'acceptance_criteria'")
+        
+        try:
+            result["points"] = int(result["points"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Story bundle has no valid 'points'")
+        if result["points"] not in FIBONACCI_POINTS:
+            raise ValueError(f"Story bundle has {result['points']} points, not on the Fibonacci scale")
+        
+        subtasks = result.get("subtasks") or []
+        if not isinstance(subtasks, list) or not all(
+            isinstance(subtask, dict) and subtask.get("title") for subtask in subtasks
+        ):
+            raise ValueError("Story bundle has malformed 'subtasks'")
+        
+        if breakdown_threshold is not None and result["points"] > breakdown_threshold and not subtasks:
+            raise ValueError(f"Story bundle has {result['points']} points but no 'subtasks'")
+        
+        result["subtasks"] = subtasks
+        result.setdefault("required_skills", [])
+        result.setdefault("reasoning", "")
+        result.setdefault("confidence", 0.5)
+        return result
+    
     async def process_chat_message(
         self,
         message: str,
@@ -388,12 +622,9 @@ Each subtask should be 1-3 points. Respond in JSON format with a "subtasks" arra
             }
         """
         try:
-            messages = [
-                {"role": "system", "content": "You are a helpful Jira assistant. Help users create stories."},
-                {"role": "user", "content": message}
-            ]
+            messages = self._chat_messages(message)
             
-            response_text = self._call_model(messages, temperature=0.7)
+            response_text = await self._call_model(messages, operation="chat", temperature=0.7)
             
             return {
                 "response": response_text,
@@ -410,6 +641,66 @@ Each subtask should be 1-3 points. Respond in JSON format with a "subtasks" arra
                 "session_id": session_id or "new-session"
             }
     
+    async def stream_chat_message(
+        self,
+        message: str,
+        session_id: str = None,
+        context: Dict = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream a chat response token by token
+        
+        Yields events:
+            {"type": "token", "content": "..."}
+            {"type": "done", "session_id": "...", "metrics": {"ttft_ms": 180.2, "total_ms": 2400.5, "chunks": 42}}
+            {"type": "error", "message": "..."}
+        """
+        session_id = session_id or "new-session"
+        messages = self._chat_messages(message)
+        started = time.perf_counter()
+        first_token_at = None
+        chunks = 0
+        
+        try:
+            if self.stream_handler:
+                rate_limiter = get_provider_rate_limiter(self.model_key)
+                if rate_limiter:
+                    await rate_limiter.acquire()
+                async for delta in self.stream_handler(self.model_instance, messages, temperature=0.7):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    chunks += 1
+                    yield {"type": "token", "content": delta}
+            else:
+                # No streaming API for this model: send the full completion as one chunk
+                response_text = await self._call_model(messages, operation="chat", temperature=0.7)
+                first_token_at = time.perf_counter()
+                chunks = 1
+                yield {"type": "token", "content": response_text}
+        except Exception as e:
+            logger.error(f"Error in streaming chat: {e}")
+            yield {"type": "error", "message": "I'm having trouble processing that. Could you rephrase?"}
+            return
+        
+        finished = time.perf_counter()
+        yield {
+            "type": "done",
+            "session_id": session_id,
+            "metrics": {
+                "ttft_ms": round(((first_token_at or finished) - started) * 1000, 1),
+                "total_ms": round((finished - started) * 1000, 1),
+                "chunks": chunks
+            }
+        }
+    
+    @staticmethod
+    def _chat_messages(message: str) -> List[Dict]:
+        """Build the chat prompt for a user message."""
+        return [
+            {"role": "system", "content": "You are a helpful Jira assistant. Help users create stories."},
+            {"role": "user", "content": message}
+        ]
+    
     async def suggest_estimation(self, title: str, description: str) -> Dict:
         """Get estimation suggestion with similar stories"""
         # This would use RAG with vector database in production
@@ -421,3 +712,52 @@ Each subtask should be 1-3 points. Respond in JSON format with a "subtasks" arra
             "confidence": estimation["confidence"],
             "similar_stories": []  # Would query vector DB here
         }
+
+
+# ---------------------------------------------------------------------------
+# Process-wide AIService pool
+# ---------------------------------------------------------------------------
+
+_AI_SERVICE_POOL: Dict[str, AIService] = {}
+_AI_SERVICE_POOL_LOCK = threading.Lock()
+
+
+def get_ai_service(model_key: str = None) -> AIService:
+    """
+    Return the shared AIService for a model, creating it on first use.
+    
+    Building an AIService initializes the model client, the vector store and
+    the CrewAI LLM, so instances are pooled per model key and reused across
+    requests until invalidate_ai_services() is called.
+    
+    Args:
+        model_key: Model identifier. If None, auto-detects from settings.
+    """
+    model_key = model_key or detect_model_from_settings()
+    
+    service = _AI_SERVICE_POOL.get(model_key)
+    if service:
+        return service
+    
+    with _AI_SERVICE_POOL_LOCK:
+        # Another thread may have built it while we waited for the lock
+        service = _AI_SERVICE_POOL.get(model_key)
+        if not service:
+            service = AIService(model_key)
+            _AI_SERVICE_POOL[model_key] = service
+        return service
+
+
+def invalidate_ai_services(model_key: str = None) -> None:
+    """
+    Drop pooled AIService instances so the next request picks up new config.
+    
+    Args:
+        model_key: Model to invalidate. If None, the whole pool is cleared.
+    """
+    with _AI_SERVICE_POOL_LOCK:
+        if model_key:
+            _AI_SERVICE_POOL.pop(model_key, None)
+        else:
+            _AI_SERVICE_POOL.clear()
+    logger.info(f"Invalidated AI service pool ({model_key or 'all models'})")
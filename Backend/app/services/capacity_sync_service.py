@@ -0,0 +1,356 @@
+"""
+Incremental capacity sync
+-------------------------
+Keeps a local ledger of open sprint issues (OpenSprintIssue) and a per-project
+watermark (JiraSyncState). Each sync fetches only issues updated since the
+watermark and recomputes the workload of the members those issues touch, so
+sync cost follows churn rather than team size. A full reconciliation rebuilds
+the ledger periodically, when the sprint changes, or on demand.
+"""
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.services.jira_service import JiraService, get_jira_service
+
+logger = logging.getLogger(__name__)
+
+# Changelog fields that can change someone's sprint workload (lowercase)
+WORKLOAD_FIELDS = {"assignee", "status", "resolution", "sprint", "story points", "story point estimate"}
+
+# Statuses excluded from workload (matches the JQL used by the polling sync)
+CLOSED_STATUS_NAMES = {"done", "closed", "resolved", "cancelled"}
+
+
+def parse_jira_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Jira timestamp (2024-01-31T10:15:00.000+0000) to naive UTC."""
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
+        try:
+            return datetime.strptime(value, fmt).astimezone(timezone.utc).replace(tzinfo=None)
+        except ValueError:
+            continue
+    return None
+
+
+def update_availability(member: models.TeamMember) -> None:
+    """Recalculate a member's availability status from their utilization."""
+    if member.max_story_points and member.max_story_points > 0:
+        utilization = (member.current_story_points / member.max_story_points) * 100
+        if utilization >= 100:
+            member.availability_status = "overloaded"
+        elif utilization >= 75:
+            member.availability_status = "busy"
+        else:
+            member.availability_status = "available"
+
+
+class CapacitySyncService:
+    """Watermark-based capacity sync backed by the open sprint issue ledger"""
+    
+    def __init__(self, db: Session, jira_service: Optional[JiraService] = None):
+        self.db = db
+        self.jira_service = jira_service or get_jira_service()
+        self.project_key = self.jira_service.project_key
+    
+    def sync(self, full: bool = False) -> Dict:
+        """
+        Bring member workload up to date with Jira
+        
+        Runs a full reconciliation when forced, on first run, when the active
+        sprint changed or when the last one is older than
+        CAPACITY_FULL_SYNC_INTERVAL; otherwise an incremental sync.
+        """
+        # An empty search would otherwise look like an empty sprint and wipe the ledger
+        if not self.jira_service.jira:
+            raise Exception("Jira client not initialized")
+        
+        started = datetime.utcnow()
+        state = self._get_state()
+        sprint_info = self.jira_service.get_active_sprint()
+        sprint_id = sprint_info.get("id") if sprint_info else None
+        
+        full_due = (
+            not state.watermark
+            or not state.last_full_sync_at
+            or state.sprint_id != sprint_id
+            or started - state.last_full_sync_at >= timedelta(seconds=settings.capacity_full_sync_interval)
+        )
+        
+        if full or full_due:
+            result = self._full_sync(state, sprint_id, started)
+        else:
+            result = self._incremental_sync(state, sprint_id, started)
+        
+        result["sprint_info"] = sprint_info
+        return result
+    
+    def _get_state(self) -> models.JiraSyncState:
+        state = self.db.query(models.JiraSyncState).filter(
+            models.JiraSyncState.project_key == self.project_key
+        ).first()
+        if not state:
+            state = models.JiraSyncState(project_key=self.project_key)
+            self.db.add(state)
+            self.db.flush()
+        return state
+    
+    def _full_sync(self, state: models.JiraSyncState, sprint_id: Optional[int], started: datetime) -> Dict:
+        """Rebuild the ledger from every open sprint issue and recompute all members"""
+        story_points_fields = self.jira_service.get_story_points_fields()
+        jql = self.jira_service.sprint_workload_jql(sprint_id)
+        
+        snapshots = [
+            self.issue_snapshot(issue, story_points_fields)
+            for issue in self.jira_service.search_jql(jql, self._fields(story_points_fields))
+        ]
+        
+        self.db.query(models.OpenSprintIssue).filter(
+            models.OpenSprintIssue.project_key == self.project_key
+        ).delete(synchronize_session=False)
+        for snapshot in snapshots:
+            self.db.add(models.OpenSprintIssue(project_key=self.project_key, **snapshot))
+        self.db.flush()
+        
+        members_updated = self.recompute_members()
+        
+        state.sprint_id = sprint_id
+        state.watermark = started
+        state.last_full_sync_at = started
+        self.db.commit()
+        
+        logger.info(f"Full capacity sync: {len(snapshots)} open sprint issues, {members_updated} members updated")
+        return {"mode": "full", "issues_fetched": len(snapshots), "members_updated": members_updated}
+    
+    def _incremental_sync(self, state: models.JiraSyncState, sprint_id: Optional[int], started: datetime) -> Dict:
+        """Apply only issues changed since the watermark"""
+        story_points_fields = self.jira_service.get_story_points_fields()
+        
+        # Relative JQL dates avoid depending on the Jira user's timezone
+        window = (started - state.watermark).total_seconds() + settings.capacity_sync_overlap
+        since_clause = f"updated >= -{max(1, math.ceil(window / 60))}m"
+        
+        # Changed issues still open in the sprint, and every changed issue (to catch ones that left it)
+        open_jql = f"{self.jira_service.sprint_workload_jql(sprint_id)} AND {since_clause}"
+        changed_jql = f'project = "{self.project_key}" AND {since_clause}'
+        
+        open_snapshots = {
+            snapshot["issue_key"]: snapshot
+            for snapshot in (
+                self.issue_snapshot(issue, story_points_fields)
+                for issue in self.jira_service.search_jql(open_jql, self._fields(story_points_fields))
+            )
+        }
+        changed_keys = {issue["key"] for issue in self.jira_service.search_jql(changed_jql, ["status"])}
+        
+        affected: Set[str] = set()
+        for snapshot in open_snapshots.values():
+            affected |= self.upsert_open_issue(snapshot)
+        for issue_key in changed_keys - set(open_snapshots):
+            affected |= self.remove_open_issue(issue_key)
+        
+        members_updated = self.recompute_members(affected) if affected else 0
+        
+        state.watermark = started
+        self.db.commit()
+        
+        logger.info(
+            f"Incremental capacity sync: {len(changed_keys | set(open_snapshots))} changed issues, "
+            f"{members_updated} members updated"
+        )
+        return {
+            "mode": "incremental",
+            "issues_fetched": len(changed_keys | set(open_snapshots)),
+            "members_updated": members_updated
+        }
+    
+    # =========================================================================
+    # LEDGER
+    # =========================================================================
+    
+    @staticmethod
+    def _fields(story_points_fields: List[str]) -> List[str]:
+        return ["assignee", "status", "updated"] + story_points_fields
+    
+    def issue_snapshot(self, issue: Dict, story_points_fields: List[str]) -> Dict:
+        """Ledger row values from a Jira search result or webhook issue payload"""
+        fields = issue.get("fields", {})
+        assignee = fields.get("assignee") or {}
+        return {
+            "issue_key": issue["key"],
+            "assignee": assignee.get("accountId") or assignee.get("name"),
+            "story_points": self.jira_service.issue_story_points(issue, story_points_fields),
+            "status": (fields.get("status") or {}).get("name"),
+            "jira_updated_at": parse_jira_datetime(fields.get("updated")),
+        }
+    
+    def upsert_open_issue(self, snapshot: Dict) -> Set[str]:
+        """Insert or update a ledger row; returns assignees whose workload changed"""
+        row = self.db.query(models.OpenSprintIssue).filter(
+            models.OpenSprintIssue.issue_key == snapshot["issue_key"]
+        ).first()
+        
+        if not row:
+            self.db.add(models.OpenSprintIssue(project_key=self.project_key, **snapshot))
+            return {snapshot["assignee"]} - {None}
+        
+        # Ignore snapshots older than what the ledger already holds
+        if row.jira_updated_at and snapshot["jira_updated_at"] and snapshot["jira_updated_at"] < row.jira_updated_at:
+            return set()
+        
+        affected = {row.assignee, snapshot["assignee"]} - {None}
+        if row.assignee == snapshot["assignee"] and (row.story_points or 0) == snapshot["story_points"]:
+            affected = set()
+        for field, value in snapshot.items():
+            setattr(row, field, value)
+        return affected
+    
+    def apply_issue_event(self, webhook_event: str, issue: Dict, changelog: Optional[Dict] = None) -> int:
+        """
+        Apply a Jira issue webhook to the ledger and member workload
+        
+        Ledger changes and the affected members' recomputed counters are
+        committed in one transaction. With webhooks flowing, the polling sync
+        only has to catch what webhooks missed.
+        
+        Returns:
+            Number of members whose workload was updated
+        """
+        affected = self.apply_issue_change(webhook_event, issue, changelog)
+        members_updated = self.recompute_members(affected) if affected else 0
+        self.db.commit()
+        
+        if members_updated:
+            logger.info(f"Webhook {webhook_event} for {issue.get('key')} updated workload of {members_updated} members")
+        return members_updated
+    
+    def apply_issue_change(self, webhook_event: str, issue: Dict, changelog: Optional[Dict] = None) -> Set[str]:
+        """
+        Update the ledger row for a webhook issue without committing
+        
+        Returns:
+            Assignees whose workload needs recomputing
+        """
+        issue_key = issue.get("key")
+        if not issue_key:
+            return set()
+        
+        if changelog is not None and webhook_event == "jira:issue_updated":
+            if not self.touches_workload(changelog):
+                return set()
+        
+        if webhook_event == "jira:issue_deleted":
+            return self.remove_open_issue(issue_key)
+        if not self._is_open_in_sprint(issue):
+            updated_at = parse_jira_datetime((issue.get("fields") or {}).get("updated"))
+            return self.remove_open_issue(issue_key, updated_at)
+        
+        story_points_fields = self.jira_service.get_story_points_fields()
+        return self.upsert_open_issue(self.issue_snapshot(issue, story_points_fields))
+    
+    @staticmethod
+    def touches_workload(changelog: Dict) -> bool:
+        """Whether a changelog changes any field that affects sprint workload"""
+        changed_fields = {(item.get("field") or "").lower() for item in changelog.get("items", [])}
+        return bool(changed_fields & WORKLOAD_FIELDS)
+    
+    def _is_open_in_sprint(self, issue: Dict) -> bool:
+        """Whether a webhook issue counts towards the current sprint workload"""
+        fields = issue.get("fields", {})
+        
+        project_key = (fields.get("project") or {}).get("key") or self.jira_service.project_key_from_issue_key(issue["key"])
+        if project_key != self.project_key:
+            return False
+        
+        status = fields.get("status") or {}
+        if (status.get("name") or "").lower() in CLOSED_STATUS_NAMES:
+            return False
+        if (status.get("statusCategory") or {}).get("key") == "done":
+            return False
+        
+        sprint_field = self.jira_service.get_sprint_field()
+        if not sprint_field:
+            # Cannot tell sprint membership from the payload; keep issues already tracked
+            return self.db.query(models.OpenSprintIssue.id).filter(
+                models.OpenSprintIssue.issue_key == issue["key"]
+            ).first() is not None
+        
+        state = self._get_state()
+        for sprint in fields.get(sprint_field) or []:
+            if not isinstance(sprint, dict):
+                continue
+            if state.sprint_id and sprint.get("id") == state.sprint_id:
+                return True
+            if not state.sprint_id and sprint.get("state") == "active":
+                return True
+        return False
+    
+    def remove_open_issue(self, issue_key: str, updated_at: Optional[datetime] = None) -> Set[str]:
+        """
+        Drop an issue that left the sprint or closed; returns affected assignees
+        
+        Args:
+            issue_key: Issue to drop
+            updated_at: Jira update time of the snapshot that showed it closed or
+                moved; older than the ledger row means the issue was reopened
+                since, so the row is kept
+        """
+        row = self.db.query(models.OpenSprintIssue).filter(
+            models.OpenSprintIssue.issue_key == issue_key
+        ).first()
+        if not row:
+            return set()
+        if row.jira_updated_at and updated_at and updated_at < row.jira_updated_at:
+            return set()
+        self.db.delete(row)
+        return {row.assignee} - {None}
+    
+    def recompute_members(self, assignees: Optional[Iterable[str]] = None) -> int:
+        """
+        Set member workload from the ledger
+        
+        Args:
+            assignees: Only recompute these members (default: everyone)
+        
+        Returns:
+            Number of members updated
+        """
+        self.db.flush()
+        
+        totals_query = self.db.query(
+            models.OpenSprintIssue.assignee,
+            func.coalesce(func.sum(models.OpenSprintIssue.story_points), 0),
+            func.count(models.OpenSprintIssue.id)
+        ).filter(
+            models.OpenSprintIssue.project_key == self.project_key,
+            models.OpenSprintIssue.assignee.isnot(None)
+        ).group_by(models.OpenSprintIssue.assignee)
+        
+        members_query = self.db.query(models.TeamMember)
+        if assignees is not None:
+            assignees = list(assignees)
+            totals_query = totals_query.filter(models.OpenSprintIssue.assignee.in_(assignees))
+            # Lock the members (in a stable order) so concurrent webhooks cannot
+            # write totals computed from a stale ledger
+            members_query = members_query.filter(
+                models.TeamMember.username.in_(assignees)
+            ).order_by(models.TeamMember.username).with_for_update()
+        
+        members = members_query.all()
+        totals = {assignee: (points, count) for assignee, points, count in totals_query.all()}
+        
+        updated = 0
+        for member in members:
+            points, count = totals.get(member.username, (0, 0))
+            member.current_story_points = int(points)
+            member.current_ticket_count = count
+            update_availability(member)
+            updated += 1
+        return updated
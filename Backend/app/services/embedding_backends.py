@@ -0,0 +1,162 @@
+"""
+Embedding backends
+------------------
+VectorService embeds text through a pluggable backend selected by
+EMBEDDING_BACKEND:
+
+- openai: the OpenAI-compatible embeddings API (batched requests)
+- local:  deterministic feature hashing of word/bigram/character n-grams in
+          NumPy; no network, suitable for air-gapped deployments and CI
+- auto:   openai when an API key is configured, otherwise local
+
+Vectors from different backends are not comparable, so each backend stores
+its vectors in its own collections (see collection_suffix).
+"""
+import hashlib
+import logging
+import math
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional
+
+import openai
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Embedding inputs are truncated to stay under the provider's per-input token limit
+MAX_EMBEDDING_CHARS = 24000
+
+# Configure OpenAI for embeddings
+openai.api_key = settings.openai_api_key
+if hasattr(settings, 'openai_api_base') and settings.openai_api_base:
+    openai.base_url = settings.openai_api_base
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into vectors; subclasses implement embed()"""
+    
+    name: str = ""  # Identifies the vector space (embedding cache key)
+    collection_suffix: str = ""  # Appended to collection names ("" keeps the default collections)
+    remote: bool = True  # Whether embedding calls a provider (worth caching)
+    
+    @abstractmethod
+    def embed(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """One vector per text, in order ([] for texts that could not be embedded)"""
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """OpenAI-compatible embeddings API"""
+    
+    def __init__(self, model: str):
+        self.model = model
+        self.name = model
+    
+    def embed(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """Call the embeddings API, batch_size texts per request"""
+        batch_size = batch_size or settings.embedding_batch_size
+        embeddings: List[List[float]] = []
+        
+        for start in range(0, len(texts), batch_size):
+            batch = [(text or " ")[:MAX_EMBEDDING_CHARS] for text in texts[start:start + batch_size]]
+            try:
+                response = openai.embeddings.create(
+                    model=self.model,
+                    input=batch
+                )
+                by_index = {item.index: item.embedding for item in response.data}
+                embeddings.extend(by_index.get(i, []) for i in range(len(batch)))
+            except Exception as e:
+                logger.error(f"Error generating embeddings for batch at {start}: {e}")
+                embeddings.extend([] for _ in batch)
+        
+        return embeddings
+
+
+@lru_cache(maxsize=200_000)
+def _feature_hash(feature: str) -> int:
+    # Stable across processes (unlike hash()), so vectors are deterministic
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Local feature-hashing embeddings
+    
+    Words, word bigrams and character trigrams are hashed into a fixed number
+    of signed buckets with sublinear term frequency, then L2-normalized, so
+    cosine similarity reflects shared vocabulary and word fragments.
+    """
+    
+    remote = False
+    
+    # Relative weight of each feature kind
+    WORD_WEIGHT = 1.0
+    BIGRAM_WEIGHT = 1.0
+    TRIGRAM_WEIGHT = 0.5
+    
+    def __init__(self, dims: int = 1024):
+        self.dims = dims
+        self.name = f"local-hashing-v1-{dims}"
+        self.collection_suffix = f"local{dims}"
+    
+    def _features(self, text: str) -> Counter:
+        words = re.findall(r"\w+", (text or "").lower())
+        features = Counter()
+        for word in words:
+            features[("w", word)] += 1
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                features[("c", padded[i:i + 3])] += 1
+        for first, second in zip(words, words[1:]):
+            features[("b", f"{first} {second}")] += 1
+        return features
+    
+    def embed(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        import numpy as np
+        
+        weights = {"w": self.WORD_WEIGHT, "b": self.BIGRAM_WEIGHT, "c": self.TRIGRAM_WEIGHT}
+        matrix = np.zeros((len(texts), self.dims), dtype=np.float32)
+        
+        for row, text in enumerate(texts):
+            for (kind, feature), count in self._features(text).items():
+                bucket = _feature_hash(f"{kind}:{feature}")
+                sign = 1.0 if bucket >> 63 else -1.0
+                matrix[row, bucket % self.dims] += sign * weights[kind] * (1.0 + math.log(count))
+        
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+
+_embedding_backend: Optional[EmbeddingBackend] = None
+_embedding_backend_lock = threading.Lock()
+
+
+def create_embedding_backend(backend: Optional[str] = None) -> EmbeddingBackend:
+    """Build the backend named by EMBEDDING_BACKEND (openai, local or auto)."""
+    backend = (backend or settings.embedding_backend).lower()
+    if backend == "auto":
+        backend = "openai" if settings.openai_api_key else "local"
+    
+    if backend == "local":
+        return HashingEmbeddingBackend(dims=settings.local_embedding_dims)
+    if backend != "openai":
+        logger.warning(f"Unknown embedding backend '{backend}', using openai")
+    return OpenAIEmbeddingBackend(settings.openai_embedding_model)
+
+
+def get_embedding_backend() -> EmbeddingBackend:
+    """Return the process-wide embedding backend."""
+    global _embedding_backend
+    
+    if _embedding_backend is None:
+        with _embedding_backend_lock:
+            if _embedding_backend is None:
+                _embedding_backend = create_embedding_backend()
+                logger.info(f"Embedding backend: {_embedding_backend.name}")
+    return _embedding_backend
@@ -0,0 +1,152 @@
+"""
+Embedding cache
+---------------
+Disk-backed cache of embedding vectors keyed by (embedding model, sha256 of
+whitespace-normalized text). Vectors are stored as float32 blobs in a SQLite
+file shared by all API and Celery workers, so re-indexing or re-querying the
+same text never calls the embedding provider twice.
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """SQLite store of float32 embeddings keyed by model and text hash"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        # WAL lets several worker processes read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                dims INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace (does not change what the text means to the model)."""
+        return re.sub(r"\s+", " ", text or "").strip()
+    
+    @classmethod
+    def text_hash(cls, text: str) -> bytes:
+        return hashlib.sha256(cls.normalize(text).encode("utf-8")).digest()
+    
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Cached vectors for texts, in order (None for misses)."""
+        hashes = [self.text_hash(text) for text in texts]
+        found: Dict[bytes, List[float]] = {}
+        
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk]
+                ).fetchall()
+                for text_hash, vector in rows:
+                    found[bytes(text_hash)] = np.frombuffer(vector, dtype=np.float32).tolist()
+            
+            results = [found.get(text_hash) for text_hash in hashes]
+            hits = sum(1 for result in results if result is not None)
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(results) - hits
+        return results
+    
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text])[0]
+    
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]) -> None:
+        """Store vectors for texts (empty embeddings are skipped)."""
+        now = time.time()
+        rows = [
+            (model, self.text_hash(text), len(embedding), np.asarray(embedding, dtype=np.float32).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+            if embedding
+        ]
+        if not rows:
+            return
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dims, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._stats["stores"] += len(rows)
+    
+    def put(self, model: str, text: str, embedding: List[float]) -> None:
+        self.put_many(model, [text], [embedding])
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "enabled": True,
+                "path": self.path,
+                "entries": entries,
+                "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+            }
+    
+    def clear(self, model: Optional[str] = None) -> None:
+        """Remove all cached vectors, or only those of one model."""
+        with self._lock:
+            if model:
+                self._conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+            else:
+                self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the process-wide embedding cache, or None when disabled."""
+    global _embedding_cache
+    
+    if not settings.embedding_cache_enabled:
+        return None
+    
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                try:
+                    _embedding_cache = EmbeddingCache(settings.embedding_cache_path)
+                except Exception as e:
+                    logger.error(f"Embedding cache unavailable: {e}")
+                    return None
+    return _embedding_cache
@@ -1,10 +1,72 @@
-from jira import JIRA
+from jira import JIRA, JIRAError
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict
 import logging
+import threading
+import time
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# The agile API accepts at most 50 issues per sprint move
+SPRINT_ISSUES_PER_REQUEST = 50
+
+# /rest/api/3/issue/bulk accepts at most 50 issues per request
+ISSUES_PER_BULK_REQUEST = 50
+
+# Page size for /rest/api/3/search/jql
+JQL_PAGE_SIZE = 100
+
+# Statuses that no longer count towards a sprint workload
+CLOSED_STATUSES = "Done, Closed, Resolved, Cancelled"
+
+# Bounded pool for running blocking Jira calls concurrently off the event loop
+_jira_executor: Optional[ThreadPoolExecutor] = None
+_jira_executor_lock = threading.Lock()
+
+
+def get_jira_executor() -> ThreadPoolExecutor:
+    """Return the shared thread pool used for concurrent Jira calls."""
+    global _jira_executor
+    
+    if _jira_executor is None:
+        with _jira_executor_lock:
+            if _jira_executor is None:
+                _jira_executor = ThreadPoolExecutor(
+                    max_workers=settings.jira_max_concurrency,
+                    thread_name_prefix="jira"
+                )
+    return _jira_executor
+
+
+class _JiraMetadataCache:
+    """Process-wide TTL cache for Jira metadata shared by all JiraService instances"""
+    
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def get_or_load(self, key: str, loader, ttl: int):
+        """Return a cached value, calling loader on a miss (failures are not cached)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        
+        value = loader()
+        with self._lock:
+            self._entries[key] = (now + ttl, value)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_metadata_cache = _JiraMetadataCache()
+
+
 class JiraService:
     """Service for Jira API operations"""
     
@@ -23,6 +85,90 @@ class JiraService:
             self.jira = None
             self.project_key = settings.jira_project_key
     
+    # =========================================================================
+    # METADATA (cached process-wide for JIRA_METADATA_TTL seconds)
+    # =========================================================================
+    
+    def _metadata(self, key: str, loader):
+        return _metadata_cache.get_or_load(f"{settings.jira_url}:{key}", loader, settings.jira_metadata_ttl)
+    
+    @staticmethod
+    def refresh_metadata():
+        """Drop cached Jira metadata so it is re-fetched on next use"""
+        _metadata_cache.clear()
+        logger.info("Jira metadata cache cleared")
+    
+    def get_project(self, project_key: str):
+        """Get a project (cached)"""
+        return self._metadata(f"project:{project_key}", lambda: self.jira.project(project_key))
+    
+    def get_issue_types(self) -> List:
+        """Get all issue types (cached)"""
+        return self._metadata("issue_types", self.jira.issue_types)
+    
+    def get_board_id(self, project_key: Optional[str] = None) -> Optional[int]:
+        """Get the id of the project's first board (cached)"""
+        project_key = project_key or self.project_key
+        
+        def load():
+            boards = self.jira.boards(projectKeyOrID=project_key)
+            return boards[0].id if boards else None
+        
+        return self._metadata(f"board:{project_key}", load)
+    
+    def get_priority_names(self) -> List[str]:
+        """Get the priority names defined in Jira (cached)"""
+        return self._metadata("priorities", lambda: [priority.name for priority in self.jira.priorities()])
+    
+    def get_story_points_fields(self) -> List[str]:
+        """
+        Story point field ids present on this Jira instance (cached)
+        
+        Configured ids (JIRA_STORY_POINTS_FIELD) that exist come first; if none
+        do, fields named like "Story Points" are used.
+        """
+        configured = settings.jira_story_points_fields
+        if not self.jira:
+            return configured
+        
+        def load():
+            fields = self.jira.fields()
+            available = {field["id"] for field in fields}
+            found = [field_id for field_id in configured if field_id in available]
+            if not found:
+                found = [
+                    field["id"] for field in fields
+                    if field.get("name", "").lower() in ("story points", "story point estimate")
+                ]
+            return found or configured
+        
+        try:
+            return self._metadata("story_points_fields", load)
+        except Exception as e:
+            logger.warning(f"Error discovering story points fields: {e}, using configured ids")
+            return configured
+    
+    def get_sprint_field(self) -> Optional[str]:
+        """Id of the Sprint custom field, if the instance has one (cached)"""
+        if not self.jira:
+            return None
+        
+        def load():
+            for field in self.jira.fields():
+                if field.get("schema", {}).get("custom") == "com.pyxis.greenhopper.jira:gh-sprint":
+                    return field["id"]
+            return None
+        
+        try:
+            return self._metadata("sprint_field", load)
+        except Exception as e:
+            logger.warning(f"Error discovering sprint field: {e}")
+            return None
+    
+    def get_story_points_field(self) -> str:
+        """Field id used when writing story points"""
+        return self.get_story_points_fields()[0]
+    
     @staticmethod
     def convert_to_adf(text: str) -> Dict:
         """
@@ -91,6 +237,29 @@ class JiraService:
             "content": content
         }
     
+    @staticmethod
+    def adf_to_text(document) -> str:
+        """Extract plain text from an ADF document (plain strings pass through)"""
+        if not document:
+            return ""
+        if isinstance(document, str):
+            return document
+        
+        blocks = []
+        
+        def walk(node, parts):
+            if node.get("type") == "text":
+                parts.append(node.get("text", ""))
+            for child in node.get("content", []):
+                walk(child, parts)
+        
+        for block in document.get("content", []):
+            parts = []
+            walk(block, parts)
+            if parts:
+                blocks.append("".join(parts))
+        return "\n\n".join(blocks)
+    
     def create_issue(
         self,
         project_key: str,
@@ -107,29 +276,16 @@ class JiraService:
             raise Exception("Jira client not initialized")
         
         try:
-            # Convert description to Atlassian Document Format (ADF) for API v3
-            description_adf = self.convert_to_adf(description)
-            
-            issue_dict = {
-                'project': {'key': project_key},
-                'summary': summary,
-                'description': description_adf,  # Use ADF format
-                'issuetype': {'name': issue_type},
-                'priority': {'name': priority}
-            }
-            
-            # Add story points if provided (custom field)
-            if story_points:
-                # Note: Field ID may vary by Jira instance
-                issue_dict['customfield_10016'] = story_points
-            
-            # Add labels
-            if labels:
-                issue_dict['labels'] = labels
-            
-            # Link to epic
-            if epic_key:
-                issue_dict['customfield_10014'] = epic_key
+            issue_dict = self.build_issue_fields(
+                project_key=project_key,
+                issue_type=issue_type,
+                summary=summary,
+                description=description,
+                priority=priority,
+                story_points=story_points,
+                labels=labels,
+                epic_key=epic_key
+            )
             
             issue = self.jira.create_issue(fields=issue_dict)
             logger.info(f"Created Jira issue: {issue.key}")
@@ -139,36 +295,176 @@ class JiraService:
             logger.error(f"Error creating Jira issue: {e}")
             raise
     
+    def build_issue_fields(
+        self,
+        project_key: str,
+        issue_type: str,
+        summary: str,
+        description: str = "",
+        priority: Optional[str] = None,
+        story_points: Optional[int] = None,
+        labels: Optional[List[str]] = None,
+        epic_key: Optional[str] = None,
+        parent_key: Optional[str] = None
+    ) -> Dict:
+        """Build the fields payload for a new issue (description converted to ADF)"""
+        issue_dict = {
+            'project': {'key': project_key},
+            'summary': summary,
+            'description': self.convert_to_adf(description),  # Use ADF format
+            'issuetype': {'name': issue_type}
+        }
+        
+        if priority:
+            if self._is_known_priority(priority):
+                issue_dict['priority'] = {'name': priority}
+            else:
+                logger.warning(f"Unknown Jira priority '{priority}', using the project default")
+        
+        if parent_key:
+            issue_dict['parent'] = {'key': parent_key}
+        
+        # Add story points if provided (custom field, discovered per instance)
+        if story_points:
+            issue_dict[self.get_story_points_field()] = story_points
+        
+        # Add labels
+        if labels:
+            issue_dict['labels'] = labels
+        
+        # Link to epic
+        if epic_key:
+            issue_dict['customfield_10014'] = epic_key
+        
+        return issue_dict
+    
+    def _is_known_priority(self, priority: str) -> bool:
+        """Whether Jira defines this priority; assume yes when it cannot be checked"""
+        if not self.jira:
+            return True
+        try:
+            names = self.get_priority_names()
+        except Exception as e:
+            logger.debug(f"Could not load Jira priorities: {e}")
+            return True
+        return not names or priority in names
+    
+    def create_issues_bulk(self, issues: List[Dict]) -> List[Dict]:
+        """
+        Create issues with /rest/api/3/issue/bulk, 50 per request
+        
+        Args:
+            issues: Field payloads (see build_issue_fields)
+            
+        Returns:
+            One entry per input, in order: {"key": ..., "id": ...} when created,
+            {"error": "..."} when Jira rejected that issue, and
+            {"error": "...", "retryable": True} when its request failed as a
+            whole (transport error, or no per-issue answer from Jira)
+        """
+        if not self.jira:
+            raise Exception("Jira client not initialized")
+        
+        url = f"{self.jira._options['server']}/rest/api/3/issue/bulk"
+        results = []
+        for start in range(0, len(issues), ISSUES_PER_BULK_REQUEST):
+            chunk = issues[start:start + ISSUES_PER_BULK_REQUEST]
+            results.extend(self._create_issues_chunk(url, chunk))
+        
+        created = sum(1 for result in results if "key" in result)
+        logger.info(f"Bulk created {created}/{len(issues)} Jira issues")
+        return results
+    
+    def _create_issues_chunk(self, url: str, chunk: List[Dict]) -> List[Dict]:
+        """Create one bulk request's worth of issues and map errors back by position"""
+        headers = {"Content-Type": "application/json"}
+        data = {"issueUpdates": [{"fields": fields} for fields in chunk]}
+        
+        try:
+            response = self.jira._session.post(url, json=data, headers=headers)
+        except JIRAError as e:
+            # Jira answers 400 when every issue in the request failed
+            response = e.response
+            if response is None:
+                return [{"error": str(e), "retryable": True} for _ in chunk]
+        except Exception as e:
+            logger.error(f"Error bulk creating Jira issues: {e}")
+            return [{"error": str(e), "retryable": True} for _ in chunk]
+        
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        
+        errors = {}
+        for error in body.get("errors", []):
+            element_errors = error.get("elementErrors", {})
+            messages = list(element_errors.get("errorMessages", []))
+            messages += [f"{field}: {message}" for field, message in element_errors.get("errors", {}).items()]
+            errors[error.get("failedElementNumber")] = "; ".join(messages) or f"HTTP {error.get('status')}"
+        
+        # Created issues are listed in request order, skipping failed elements
+        created_issues = iter(body.get("issues", []))
+        results = []
+        for index in range(len(chunk)):
+            if index in errors:
+                results.append({"error": errors[index]})
+                continue
+            issue = next(created_issues, None)
+            if issue:
+                results.append({"key": issue["key"], "id": issue["id"]})
+            else:
+                # Not rejected individually: the request itself failed (auth, 5xx, rate limit)
+                results.append({
+                    "error": f"Issue not created: {response.status_code} - {response.text[:200]}",
+                    "retryable": not errors
+                })
+        return results
+    
+    def set_story_points(self, issue_key: str, story_points: int):
+        """Set story points on an existing issue"""
+        self.update_issue(issue_key, {self.get_story_points_field(): story_points})
+    
     def get_subtask_issue_type(self, project_key: str) -> str:
-        """Get the correct subtask issue type name for the project"""
+        """Get the correct subtask issue type name for the project (cached)"""
         if not self.jira:
             raise Exception("Jira client not initialized")
         
         try:
-            # Get project metadata
-            project = self.jira.project(project_key)
-            issue_types = self.jira.issue_types()
-            
-            # Look for subtask issue type (case-insensitive)
-            for issue_type in issue_types:
-                if issue_type.subtask:
-                    logger.info(f"Found subtask issue type: {issue_type.name}")
-                    return issue_type.name
-            
-            # Fallback to common names
-            for name in ['Subtask', 'Sub-task', 'Sub task']:
-                for issue_type in issue_types:
-                    if issue_type.name.lower() == name.lower():
-                        return issue_type.name
-            
-            # Default fallback
-            logger.warning("Could not find subtask issue type, using 'Subtask'")
-            return "Subtask"
-            
+            return self._metadata(
+                f"subtask_type:{project_key}",
+                lambda: self._find_subtask_issue_type(project_key)
+            )
         except Exception as e:
             logger.warning(f"Error getting subtask issue type: {e}, using default")
             return "Subtask"
     
+    def _find_subtask_issue_type(self, project_key: str) -> str:
+        # Prefer the project's own issue types (team-managed projects define their own)
+        project = self.get_project(project_key)
+        issue_types = getattr(project, "issueTypes", None) or self.get_issue_types()
+        
+        # Look for subtask issue type (case-insensitive)
+        for issue_type in issue_types:
+            if issue_type.subtask:
+                logger.info(f"Found subtask issue type: {issue_type.name}")
+                return issue_type.name
+        
+        # Fallback to common names
+        for name in ['Subtask', 'Sub-task', 'Sub task']:
+            for issue_type in issue_types:
+                if issue_type.name.lower() == name.lower():
+                    return issue_type.name
+        
+        # Default fallback
+        logger.warning("Could not find subtask issue type, using 'Subtask'")
+        return "Subtask"
+    
+    @staticmethod
+    def project_key_from_issue_key(issue_key: str) -> str:
+        """Project key of an issue key (e.g. SCRUM-123 -> SCRUM)"""
+        return issue_key.rsplit("-", 1)[0]
+    
     def create_subtask(
         self,
         parent_key: str,
@@ -181,24 +477,20 @@ class JiraService:
             raise Exception("Jira client not initialized")
         
         try:
-            parent_issue = self.jira.issue(parent_key)
+            # Project comes from the parent key, so no parent lookup is needed
+            project_key = self.project_key_from_issue_key(parent_key)
             
             # Get correct subtask issue type name
-            subtask_type = self.get_subtask_issue_type(parent_issue.fields.project.key)
-            
-            # Convert description to ADF format
-            description_adf = self.convert_to_adf(description)
+            subtask_type = self.get_subtask_issue_type(project_key)
             
-            subtask_dict = {
-                'project': {'key': parent_issue.fields.project.key},
-                'summary': summary,
-                'description': description_adf,  # Use ADF format
-                'issuetype': {'name': subtask_type},  # Use detected type
-                'parent': {'key': parent_key}
-            }
-            
-            if story_points:
-                subtask_dict['customfield_10016'] = story_points
+            subtask_dict = self.build_issue_fields(
+                project_key=project_key,
+                issue_type=subtask_type,  # Use detected type
+                summary=summary,
+                description=description,
+                story_points=story_points,
+                parent_key=parent_key
+            )
             
             subtask = self.jira.create_issue(fields=subtask_dict)
             logger.info(f"Created subtask: {subtask.key} for {parent_key}")
@@ -208,6 +500,36 @@ class JiraService:
             logger.error(f"Error creating subtask: {e}")
             raise
     
+    def create_subtasks_bulk(self, parent_key: str, subtasks: List[Dict]) -> List[Dict]:
+        """
+        Create several subtasks under one parent with bulk requests
+        
+        Args:
+            parent_key: Parent issue key
+            subtasks: Dicts with title, description and points
+            
+        Returns:
+            Per-subtask results in order (see create_issues_bulk)
+        """
+        if not self.jira:
+            raise Exception("Jira client not initialized")
+        
+        project_key = self.project_key_from_issue_key(parent_key)
+        subtask_type = self.get_subtask_issue_type(project_key)
+        
+        issues = [
+            self.build_issue_fields(
+                project_key=project_key,
+                issue_type=subtask_type,
+                summary=subtask["title"],
+                description=subtask.get("description", ""),
+                story_points=subtask.get("points"),
+                parent_key=parent_key
+            )
+            for subtask in subtasks
+        ]
+        return self.create_issues_bulk(issues)
+    
     def assign_issue(self, issue_key: str, assignee: str):
         """Assign issue to user using account ID"""
         if not self.jira:
@@ -254,69 +576,119 @@ class JiraService:
             else:
                 assignee_clause = f'assignee = "{username}"'
             
-            # Build JQL query for active sprint issues only
-            if sprint_id:
-                # Query issues in specific sprint, excluding Done/Closed
-                jql = (
-                    f'{assignee_clause} '
-                    f'AND project = "{self.project_key}" '
-                    f'AND sprint = {sprint_id} '
-                    f'AND status NOT IN (Done, Closed, Resolved, Cancelled)'
-                )
-            else:
-                # Fallback: Query open issues in current sprint
-                jql = (
-                    f'{assignee_clause} '
-                    f'AND project = "{self.project_key}" '
-                    f'AND sprint in openSprints() '
-                    f'AND status NOT IN (Done, Closed, Resolved, Cancelled)'
-                )
-            
+            jql = f'{assignee_clause} AND {self.sprint_workload_jql(sprint_id)}'
             logger.debug(f"Workload JQL for {username}: {jql}")
             
-            # Use JQL API directly (new endpoint required by Atlassian)
-            import requests
-            from requests.auth import HTTPBasicAuth
-            
-            url = f"{settings.jira_url}/rest/api/3/search/jql"
-            auth = HTTPBasicAuth(settings.jira_email, settings.jira_api_token)
-            headers = {"Accept": "application/json"}
-            params = {
-                "jql": jql,
-                "maxResults": 100,
-                "fields": "customfield_10016,customfield_10002,customfield_10026"  # Story points fields
-            }
-            
-            response = requests.get(url, headers=headers, params=params, auth=auth)
-            response.raise_for_status()
-            data = response.json()
-            issues = data.get("issues", [])
-            
+            story_points_fields = self.get_story_points_fields()
             total_points = 0
-            for issue in issues:
-                # Get story points from fields (try multiple common field IDs)
-                fields = issue.get("fields", {})
-                points = (
-                    fields.get('customfield_10016') or
-                    fields.get('customfield_10002') or
-                    fields.get('customfield_10026')
-                )
-                if points:
-                    total_points += float(points)
+            ticket_count = 0
+            for issue in self.search_jql(jql, story_points_fields):
+                total_points += self.issue_story_points(issue, story_points_fields)
+                ticket_count += 1
             
             logger.info(
-                f"Workload for {username}: {len(issues)} tickets, "
+                f"Workload for {username}: {ticket_count} tickets, "
                 f"{total_points} story points (active sprint only)"
             )
             
             return {
                 "story_points": int(total_points),
-                "ticket_count": len(issues)
+                "ticket_count": ticket_count
             }
         except Exception as e:
             logger.error(f"Error getting user workload: {e}")
             return {"story_points": 0, "ticket_count": 0}
     
+    def get_team_workload(self, sprint_id: Optional[int] = None) -> Optional[Dict[str, Dict]]:
+        """
+        Get every assignee's workload with one paginated JQL search
+        
+        Fetches only assignee and story point fields for open issues in the
+        sprint and aggregates them in memory.
+        
+        Args:
+            sprint_id: Sprint ID (if None, uses open sprints)
+            
+        Returns:
+            {username/accountId: {"story_points": int, "ticket_count": int}},
+            or None if Jira could not be queried
+        """
+        if not self.jira:
+            return None
+        
+        try:
+            story_points_fields = self.get_story_points_fields()
+            jql = self.sprint_workload_jql(sprint_id)
+            
+            totals: Dict[str, Dict] = {}
+            issue_count = 0
+            for issue in self.search_jql(jql, ["assignee"] + story_points_fields):
+                issue_count += 1
+                assignee = issue.get("fields", {}).get("assignee")
+                if not assignee:
+                    continue
+                username = assignee.get("accountId") or assignee.get("name")
+                workload = totals.setdefault(username, {"story_points": 0, "ticket_count": 0})
+                workload["story_points"] += self.issue_story_points(issue, story_points_fields)
+                workload["ticket_count"] += 1
+            
+            for workload in totals.values():
+                workload["story_points"] = int(workload["story_points"])
+            
+            logger.info(f"Team workload: {issue_count} open sprint issues across {len(totals)} assignees")
+            return totals
+        except Exception as e:
+            logger.error(f"Error getting team workload: {e}")
+            return None
+    
+    def sprint_workload_jql(self, sprint_id: Optional[int] = None) -> str:
+        """JQL for open issues in a sprint (or the open sprints) of the project"""
+        # Query issues in specific sprint, or fall back to open sprints, excluding Done/Closed
+        sprint_clause = f'sprint = {sprint_id}' if sprint_id else 'sprint in openSprints()'
+        return (
+            f'project = "{self.project_key}" '
+            f'AND {sprint_clause} '
+            f'AND status NOT IN ({CLOSED_STATUSES})'
+        )
+    
+    def search_jql(self, jql: str, fields: List[str]):
+        """
+        Iterate over all issues matching a JQL query
+        
+        Uses the /rest/api/3/search/jql endpoint (required by Atlassian),
+        following nextPageToken until the last page.
+        """
+        if not self.jira:
+            logger.warning("Jira client not initialized, skipping JQL search")
+            return
+        
+        url = f"{settings.jira_url}/rest/api/3/search/jql"
+        headers = {"Accept": "application/json"}
+        params = {
+            "jql": jql,
+            "maxResults": JQL_PAGE_SIZE,
+            "fields": ",".join(fields)
+        }
+        
+        while True:
+            response = self.jira._session.get(url, headers=headers, params=params)
+            response.raise_for_status()
+            data = response.json()
+            
+            yield from data.get("issues", [])
+            
+            next_page_token = data.get("nextPageToken")
+            if not next_page_token or data.get("isLast"):
+                return
+            params["nextPageToken"] = next_page_token
+    
+    @staticmethod
+    def issue_story_points(issue: Dict, story_points_fields: List[str]) -> float:
+        """Story points of a search result (first story points field that is set)"""
+        fields = issue.get("fields", {})
+        points = next((fields[field_id] for field_id in story_points_fields if fields.get(field_id)), None)
+        return float(points) if points else 0
+    
     def get_all_users(self) -> List[Dict]:
         """Get all Jira users"""
         if not self.jira:
@@ -422,16 +794,14 @@ class JiraService:
             return None
         
         try:
-            # Get the board for the project
-            boards = self.jira.boards(projectKeyOrID=self.project_key)
-            if not boards:
+            # Get the board for the project (first board, cached)
+            board_id = self.get_board_id()
+            if not board_id:
                 logger.warning(f"No boards found for project {self.project_key}")
                 return None
             
-            board = boards[0]  # Use first board
-            
             # Get active sprints
-            sprints = self.jira.sprints(board.id, state='active')
+            sprints = self.jira.sprints(board_id, state='active')
             if not sprints:
                 logger.info("No active sprint found")
                 return None
@@ -482,6 +852,21 @@ class JiraService:
         Returns:
             True if successful, False otherwise
         """
+        return self.add_issues_to_sprint([issue_key], sprint_id=sprint_id)
+    
+    def add_issues_to_sprint(self, issue_keys: List[str], sprint_id: Optional[int] = None) -> bool:
+        """
+        Add several issues to a sprint with one agile API call per 50 issues
+        
+        Args:
+            issue_keys: Jira issue keys
+            sprint_id: Sprint ID (if None, uses active sprint)
+            
+        Returns:
+            True if every issue was added, False otherwise
+        """
+        if not issue_keys:
+            return True
         if not self.jira:
             logger.warning("Jira client not initialized")
             return False
@@ -491,27 +876,29 @@ class JiraService:
             if not sprint_id:
                 active_sprint = self.get_active_sprint()
                 if not active_sprint:
-                    logger.warning(f"No active sprint found, cannot add {issue_key} to sprint")
+                    logger.warning(f"No active sprint found, cannot add {', '.join(issue_keys)} to sprint")
                     return False
                 sprint_id = active_sprint["id"]
             
-            # Add issue to sprint using Jira API
+            # Add issues to sprint using Jira API
             # The Jira library doesn't have a direct method, so we use the REST API
             url = f"{self.jira._options['server']}/rest/agile/1.0/sprint/{sprint_id}/issue"
             headers = {"Content-Type": "application/json"}
-            data = {"issues": [issue_key]}
             
-            response = self.jira._session.post(url, json=data, headers=headers)
-            
-            if response.status_code in [200, 204]:
-                logger.info(f"Successfully added {issue_key} to sprint {sprint_id}")
-                return True
-            else:
-                logger.error(f"Failed to add {issue_key} to sprint: {response.status_code} - {response.text}")
-                return False
+            success = True
+            for start in range(0, len(issue_keys), SPRINT_ISSUES_PER_REQUEST):
+                chunk = issue_keys[start:start + SPRINT_ISSUES_PER_REQUEST]
+                response = self.jira._session.post(url, json={"issues": chunk}, headers=headers)
+                
+                if response.status_code in [200, 204]:
+                    logger.info(f"Successfully added {', '.join(chunk)} to sprint {sprint_id}")
+                else:
+                    logger.error(f"Failed to add {', '.join(chunk)} to sprint: {response.status_code} - {response.text}")
+                    success = False
+            return success
                 
         except Exception as e:
-            logger.error(f"Error adding {issue_key} to sprint: {e}")
+            logger.error(f"Error adding {', '.join(issue_keys)} to sprint: {e}")
             return False
     
     def get_user_velocity(self, username: str, sprint_count: int = 3) -> float:
@@ -528,7 +915,7 @@ class JiraService:
             issue_count = 0
             
             for issue in issues:
-                points = getattr(issue.fields, 'customfield_10016', None)
+                points = getattr(issue.fields, self.get_story_points_field(), None)
                 if points:
                     total_points += points
                     issue_count += 1
@@ -550,7 +937,8 @@ class JiraService:
         self, 
         username: str, 
         sprint_info: Optional[Dict] = None,
-        seniority_level: str = "Mid"
+        seniority_level: str = "Mid",
+        workload: Optional[Dict] = None
     ) -> Dict:
         """
         Calculate user's capacity using proper sprint capacity formula:
@@ -562,6 +950,8 @@ class JiraService:
         - Senior: 120% (more efficient)
         - Lead: 80% (more meetings, mentoring)
         - Principal: 70% (architecture, strategy, mentoring)
+        
+        Pass `workload` (from get_team_workload) to skip the per-user search.
         """
         if not self.jira:
             return {
@@ -574,8 +964,9 @@ class JiraService:
         
         try:
             # Get current workload from active sprint only
-            sprint_id = sprint_info.get("id") if sprint_info else None
-            workload = self.get_user_workload(username, sprint_id)
+            if workload is None:
+                sprint_id = sprint_info.get("id") if sprint_info else None
+                workload = self.get_user_workload(username, sprint_id)
             current_points = workload["story_points"]
             ticket_count = workload["ticket_count"]
             
@@ -657,3 +1048,24 @@ class JiraService:
                 "utilization_percentage": 0,
                 "status": "available"
             }
+
+
+_shared_jira_service: Optional[JiraService] = None
+_shared_jira_service_lock = threading.Lock()
+
+
+def get_jira_service() -> JiraService:
+    """
+    Return the process-wide JiraService
+    
+    Building a client costs a serverInfo round trip, so hot paths such as
+    webhooks share one. A client that failed to connect is rebuilt next call.
+    """
+    global _shared_jira_service
+    
+    if _shared_jira_service is None or not _shared_jira_service.jira:
+        with _shared_jira_service_lock:
+            if _shared_jira_service is None or not _shared_jira_service.jira:
+                _shared_jira_service = JiraService()
+    return _shared_jira_service
+
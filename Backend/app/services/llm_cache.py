@@ -0,0 +1,176 @@
+"""
+LLM Response Cache
+------------------
+Content-addressed cache for model completions. Responses are keyed by a hash
+of everything that influences the output (model, messages, sampling params)
+and kept in an in-process LRU tier, optionally backed by Redis so that all
+API and Celery workers share hits.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "llm-cache:"
+
+
+class LLMResponseCache:
+    """Two-tier (LRU + optional Redis) cache for LLM responses with per-entry TTL"""
+    
+    def __init__(self, max_entries: int = 1000, redis_url: Optional[str] = None):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "redis_hits": 0, "sets": 0, "evictions": 0}
+        self._op_stats: Dict[str, Dict[str, int]] = {}
+        self._redis = None
+        
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url)
+                logger.info("LLM cache Redis tier enabled")
+            except Exception as e:
+                logger.warning(f"LLM cache Redis tier unavailable, using in-process cache only: {e}")
+                self._redis = None
+    
+    @staticmethod
+    def make_key(
+        model_key: str,
+        model_name: str,
+        messages: List[Dict],
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """Build a stable content hash for a completion request."""
+        payload = json.dumps(
+            {
+                "model_key": model_key,
+                "model_name": model_name,
+                "messages": messages,
+                "temperature": temperature,
+                "json_mode": bool(json_mode),
+                "max_tokens": max_tokens,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _record(self, operation: str, outcome: str) -> None:
+        self._stats[outcome] += 1
+        op_stats = self._op_stats.setdefault(operation, {"hits": 0, "misses": 0})
+        if outcome in op_stats:
+            op_stats[outcome] += 1
+    
+    def get_local(self, key: str) -> Optional[str]:
+        """Look up the in-process tier only (no I/O)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set_local(self, key: str, value: str, ttl: int) -> None:
+        """Store a value in the in-process tier, evicting least recently used entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+    
+    async def get(self, key: str, operation: str = "default") -> Optional[str]:
+        """Look up a response, checking the local tier before Redis."""
+        value = self.get_local(key)
+        if value is not None:
+            self._record(operation, "hits")
+            return value
+        
+        if self._redis:
+            try:
+                raw = await asyncio.to_thread(self._redis.get, REDIS_KEY_PREFIX + key)
+                if raw is not None:
+                    value = raw.decode("utf-8")
+                    ttl = await asyncio.to_thread(self._redis.ttl, REDIS_KEY_PREFIX + key)
+                    # Promote to the local tier for the rest of its lifetime
+                    if ttl and ttl > 0:
+                        self.set_local(key, value, ttl)
+                    self._record(operation, "hits")
+                    self._stats["redis_hits"] += 1
+                    return value
+            except Exception as e:
+                logger.warning(f"LLM cache Redis lookup failed: {e}")
+        
+        self._record(operation, "misses")
+        return None
+    
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        """Store a response in every enabled tier."""
+        if ttl <= 0 or value is None:
+            return
+        
+        self.set_local(key, value, ttl)
+        self._stats["sets"] += 1
+        
+        if self._redis:
+            try:
+                await asyncio.to_thread(self._redis.setex, REDIS_KEY_PREFIX + key, ttl, value)
+            except Exception as e:
+                logger.warning(f"LLM cache Redis write failed: {e}")
+    
+    def clear(self) -> None:
+        """Drop all in-process entries (Redis entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, overall and per operation."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "redis_enabled": self._redis is not None,
+            "operations": {op: dict(counts) for op, counts in self._op_stats.items()},
+        }
+
+
+def get_operation_ttl(operation: Optional[str]) -> int:
+    """TTL in seconds configured for an AI operation (0 disables caching)."""
+    if not operation or not settings.llm_cache_enabled:
+        return 0
+    return int(getattr(settings, f"llm_cache_ttl_{operation}", 0) or 0)
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide LLM response cache."""
+    global _llm_cache
+    
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache(
+                    max_entries=settings.llm_cache_max_entries,
+                    redis_url=settings.redis_url if settings.llm_cache_redis_enabled else None,
+                )
+    return _llm_cache
@@ -7,8 +7,11 @@ handlers for different AI operations.
 """
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import os
-from typing import Any, Dict, List, Optional, Callable
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional, Callable
 import logging
 from app.config import settings
 
@@ -89,6 +92,32 @@ def get_completion_handler(model_key: str) -> Optional[Callable]:
     return handler
 
 
+def get_async_completion_handler(model_key: str) -> Optional[Callable]:
+    """
+    Get the native async completion handler for a model, if it has one.
+    
+    Unlike get_completion_handler this is not an error when missing: callers
+    fall back to running the sync handler in a worker thread.
+    """
+    definition = MODEL_REGISTRY.get(model_key)
+    if not definition:
+        return None
+    return definition.get("async_completion_handler")
+
+
+def get_stream_handler(model_key: str) -> Optional[Callable]:
+    """
+    Get the token streaming handler for a model, if it has one.
+    
+    Stream handlers are async generators yielding text deltas as the
+    provider produces them.
+    """
+    definition = MODEL_REGISTRY.get(model_key)
+    if not definition:
+        return None
+    return definition.get("stream_handler")
+
+
 # ---------------------------------------------------------------------------
 # Shared utilities
 # ---------------------------------------------------------------------------
@@ -119,6 +148,61 @@ def _strip_markdown_fences(text: str) -> str:
     return text.strip().rstrip(";")
 
 
+# One pooled keep-alive HTTP client per event loop. httpx connections are bound
+# to the loop that opened them, so uvicorn shares a single pool while scripts
+# and Celery tasks that spin up their own loops get their own. Short-lived
+# loops must close theirs before shutting down (see run_async).
+_ASYNC_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def _get_async_http_client() -> Optional[Any]:
+    """Return the shared async HTTP client for the running event loop."""
+    httpx_module = _require_package("httpx")
+    if not httpx_module:
+        return None
+    
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        # HTTP/2 multiplexing needs the optional 'h2' package (pip install httpx[http2])
+        http2 = importlib.util.find_spec("h2") is not None
+        client = httpx_module.AsyncClient(
+            http2=http2,
+            limits=httpx_module.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+            ),
+            timeout=httpx_module.Timeout(settings.llm_request_timeout, connect=10.0),
+        )
+        _ASYNC_HTTP_CLIENTS[loop] = client
+        logger.info(f"Created pooled async HTTP client (http2={http2})")
+    return client
+
+
+async def close_async_http_client() -> None:
+    """Close the running event loop's pooled HTTP client, if it has one."""
+    client = _ASYNC_HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.debug("Closed pooled async HTTP client")
+
+
+def run_async(coroutine: Any) -> Any:
+    """
+    asyncio.run a coroutine from sync code (Celery tasks, scripts).
+    
+    The loop's pooled HTTP client is closed before the loop shuts down, so
+    each call does not leak a connection pool.
+    """
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await close_async_http_client()
+    
+    return asyncio.run(main())
+
+
 # ---------------------------------------------------------------------------
 # Model: OpenAI
 # ---------------------------------------------------------------------------
@@ -169,6 +253,68 @@ def _openai_completion(model_instance: Dict[str, Any], messages: List[Dict], **k
     return content
 
 
+def _get_async_openai_client(model_instance: Dict[str, Any]) -> Any:
+    """
+    Get an AsyncOpenAI client mirroring the instance's sync client.
+    
+    Works for every OpenAI-compatible provider since api_key and base_url are
+    taken from the already configured sync client.
+    """
+    clients = model_instance.setdefault("async_clients", weakref.WeakKeyDictionary())
+    loop = asyncio.get_running_loop()
+    client = clients.get(loop)
+    if client is None:
+        sync_client = model_instance.get("client")
+        if not sync_client:
+            raise ValueError("OpenAI client not initialized")
+        
+        openai_module = _require_package("openai")
+        client = openai_module.AsyncOpenAI(
+            api_key=sync_client.api_key,
+            base_url=sync_client.base_url,
+            http_client=_get_async_http_client(),
+        )
+        clients[loop] = client
+    return client
+
+
+async def _openai_async_completion(model_instance: Dict[str, Any], messages: List[Dict], **kwargs) -> str:
+    """Execute OpenAI chat completion without blocking the event loop."""
+    client = _get_async_openai_client(model_instance)
+    
+    params = {
+        "model": model_instance.get("model_name"),
+        "messages": messages,
+        "temperature": kwargs.get("temperature", model_instance.get("temperature", 0.7)),
+        "max_tokens": kwargs.get("max_tokens", 1000),
+    }
+    
+    # Add JSON mode if requested and supported
+    if kwargs.get("json_mode") and model_instance.get("supports_json_mode"):
+        params["response_format"] = {"type": "json_object"}
+    
+    response = await client.chat.completions.create(**params)
+    content = response.choices[0].message.content if response.choices else ""
+    
+    return content
+
+
+async def _openai_stream(model_instance: Dict[str, Any], messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+    """Stream OpenAI chat completion tokens."""
+    client = _get_async_openai_client(model_instance)
+    
+    stream = await client.chat.completions.create(
+        model=model_instance.get("model_name"),
+        messages=messages,
+        temperature=kwargs.get("temperature", model_instance.get("temperature", 0.7)),
+        max_tokens=kwargs.get("max_tokens", 1000),
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
 # ---------------------------------------------------------------------------
 # Model: DeepSeek
 # ---------------------------------------------------------------------------
@@ -232,13 +378,8 @@ def _initialize_gemini() -> Optional[Dict[str, Any]]:
     }
 
 
-def _gemini_completion(model_instance: Dict[str, Any], messages: List[Dict], **kwargs) -> str:
-    """Execute Gemini completion."""
-    client = model_instance.get("client")
-    if not client:
-        raise ValueError("Gemini client not initialized")
-    
-    # Convert messages to Gemini format
+def _build_gemini_prompt(messages: List[Dict], json_mode: bool = False) -> str:
+    """Flatten chat messages into a single Gemini prompt."""
     system_prompt = ""
     user_prompt = ""
     
@@ -256,13 +397,51 @@ def _gemini_completion(model_instance: Dict[str, Any], messages: List[Dict], **k
     full_prompt = f"{system_prompt}{user_prompt}".strip()
     
     # Add JSON instruction if needed
-    if kwargs.get("json_mode"):
+    if json_mode:
         full_prompt += "\n\nRespond with valid JSON only."
     
+    return full_prompt
+
+
+def _gemini_completion(model_instance: Dict[str, Any], messages: List[Dict], **kwargs) -> str:
+    """Execute Gemini completion."""
+    client = model_instance.get("client")
+    if not client:
+        raise ValueError("Gemini client not initialized")
+    
+    full_prompt = _build_gemini_prompt(messages, kwargs.get("json_mode", False))
+    
     response = client.generate_content(full_prompt)
     return getattr(response, "text", "")
 
 
+async def _gemini_async_completion(model_instance: Dict[str, Any], messages: List[Dict], **kwargs) -> str:
+    """Execute Gemini completion on the SDK's async (pooled gRPC) transport."""
+    client = model_instance.get("client")
+    if not client:
+        raise ValueError("Gemini client not initialized")
+    
+    full_prompt = _build_gemini_prompt(messages, kwargs.get("json_mode", False))
+    
+    response = await client.generate_content_async(full_prompt)
+    return getattr(response, "text", "")
+
+
+async def _gemini_stream(model_instance: Dict[str, Any], messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+    """Stream Gemini completion chunks."""
+    client = model_instance.get("client")
+    if not client:
+        raise ValueError("Gemini client not initialized")
+    
+    full_prompt = _build_gemini_prompt(messages, kwargs.get("json_mode", False))
+    
+    response = await client.generate_content_async(full_prompt, stream=True)
+    async for chunk in response:
+        text = getattr(chunk, "text", "")
+        if text:
+            yield text
+
+
 # ---------------------------------------------------------------------------
 # Model: Grok (xAI)
 # ---------------------------------------------------------------------------
@@ -302,6 +481,8 @@ register_model("openai", {
     "description": "OpenAI GPT models (GPT-4, GPT-3.5, etc.)",
     "initializer": _initialize_openai,
     "completion_handler": _openai_completion,
+    "async_completion_handler": _openai_async_completion,
+    "stream_handler": _openai_stream,
     "tags": ["chat", "completion", "json-mode"],
     "supports_json_mode": True,
 })
@@ -311,6 +492,8 @@ register_model("deepseek", {
     "description": "DeepSeek chat model via OpenAI-compatible API",
     "initializer": _initialize_deepseek,
     "completion_handler": _openai_completion,  # Uses same handler as OpenAI
+    "async_completion_handler": _openai_async_completion,
+    "stream_handler": _openai_stream,
     "tags": ["chat", "completion", "openai-compatible"],
     "supports_json_mode": False,
 })
@@ -320,6 +503,8 @@ register_model("gemini", {
     "description": "Google Gemini generative AI model",
     "initializer": _initialize_gemini,
     "completion_handler": _gemini_completion,
+    "async_completion_handler": _gemini_async_completion,
+    "stream_handler": _gemini_stream,
     "tags": ["chat", "completion", "google"],
     "supports_json_mode": True,
 })
@@ -329,6 +514,8 @@ register_model("grok", {
     "description": "xAI Grok model via OpenAI-compatible API",
     "initializer": _initialize_grok,
     "completion_handler": _openai_completion,  # Uses same handler as OpenAI
+    "async_completion_handler": _openai_async_completion,
+    "stream_handler": _openai_stream,
     "tags": ["chat", "completion", "openai-compatible"],
     "supports_json_mode": True,
 })
@@ -0,0 +1,656 @@
+"""
+NumPy vector index
+------------------
+In-process brute-force alternative to ChromaDB for corpora of up to tens of
+thousands of vectors. Each collection is a contiguous float32 matrix of
+L2-normalized rows; a query batch is one matrix multiply plus argpartition
+top-k. Collections persist as <name>.npy plus a <name>.json sidecar holding
+ids, documents and metadata, and expose the subset of the ChromaDB
+collection API that VectorService and SemanticCache use (add, upsert, query,
+count, name, metadata). Writers in every process serialize on a file lock;
+each write rewrites the collection (O(N)), so bulk loads group their writes
+with batch() to persist once.
+
+MemmapVectorIndex stores the matrix in a raw file with a fixed header that
+every API and Celery worker maps read-only, so the vectors live once in the
+OS page cache instead of once per process. Writes go through a single
+writer (file lock) that builds a new generation and swaps it in atomically.
+"""
+import glob
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Memory-mapped vector file header: magic, dims, dtype code, row count (padded to 64 bytes)
+MEMMAP_MAGIC = b"JAIVEC01"
+MEMMAP_HEADER = struct.Struct("<8sIIQ")
+MEMMAP_HEADER_SIZE = 64
+MEMMAP_DTYPES = {1: np.float32}
+MEMMAP_COPY_ROWS = 8192  # Rows copied per chunk when writing a new generation
+LOAD_ATTEMPTS = 5  # Loads retried while a writer in another process swaps the files
+
+
+def matches_where(metadata: Dict, where: Optional[Dict]) -> bool:
+    """Evaluate a ChromaDB-style metadata filter ($and/$or, $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin)."""
+    if not where:
+        return True
+    
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, operand in condition.items():
+                if operator == "$eq" and value != operand:
+                    return False
+                if operator == "$ne" and value == operand:
+                    return False
+                if operator == "$in" and value not in operand:
+                    return False
+                if operator == "$nin" and value in operand:
+                    return False
+                if operator in ("$gt", "$gte", "$lt", "$lte"):
+                    if value is None:
+                        return False
+                    if operator == "$gt" and not value > operand:
+                        return False
+                    if operator == "$gte" and not value >= operand:
+                        return False
+                    if operator == "$lt" and not value < operand:
+                        return False
+                    if operator == "$lte" and not value <= operand:
+                        return False
+    return True
+
+
+class NumpyVectorIndex:
+    """One collection: normalized float32 matrix with ids, documents and metadata"""
+    
+    def __init__(self, name: str, directory: str, metadata: Optional[Dict] = None):
+        self.name = name
+        self.metadata = metadata or {}
+        self._directory = directory
+        self._matrix_path = os.path.join(directory, f"{name}.npy")
+        self._sidecar_path = os.path.join(directory, f"{name}.json")
+        self._lock_path = os.path.join(directory, f"{name}.lock")
+        self._lock = threading.RLock()
+        self._writer_depth = 0  # Re-entrant holds of the file lock (under _lock)
+        self._batch_depth = 0
+        self._dirty = False
+        
+        self._matrix = np.zeros((0, 0), dtype=np.float32)  # Rows beyond _count are spare capacity
+        self._count = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Dict] = []
+        self._loaded_mtime = None
+        
+        self._load()
+    
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+    
+    def _load(self, strict: bool = False) -> None:
+        """
+        Load matrix and sidecar, retrying while another process replaces them
+        
+        Args:
+            strict: Raise if no consistent pair could be read (write paths),
+                instead of logging and keeping the current state
+        """
+        for attempt in range(LOAD_ATTEMPTS):
+            version = self._sidecar_version()
+            if version is None:
+                return
+            
+            try:
+                with open(self._sidecar_path, encoding="utf-8") as f:
+                    sidecar = json.load(f)
+                matrix = np.load(self._matrix_path)
+            except (OSError, ValueError):
+                matrix = None  # Replaced or still being written
+            
+            # Writers replace the matrix, then the sidecar: a count mismatch or a sidecar
+            # replaced while reading means a write was in flight
+            ids = sidecar.get("ids", []) if matrix is not None else []
+            if matrix is not None and matrix.shape[0] == len(ids) and self._sidecar_version() == version:
+                self.metadata = sidecar.get("metadata") or self.metadata
+                self._ids = ids
+                self._documents = sidecar.get("documents", [None] * len(ids))
+                self._metadatas = sidecar.get("metadatas", [{}] * len(ids))
+                self._rows = {issue_id: row for row, issue_id in enumerate(ids)}
+                self._count = len(ids)
+                self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+                self._loaded_mtime = version
+                return
+            time.sleep(0.05 * (attempt + 1))
+        
+        message = f"Vector index {self.name} matrix does not match its sidecar"
+        if strict:
+            raise ValueError(message)
+        logger.error(f"{message}; keeping the previously loaded state")
+    
+    def _reset(self) -> None:
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._count = 0
+        self._ids, self._rows, self._documents, self._metadatas = [], {}, [], []
+    
+    def _sidecar_version(self):
+        # Every save renames a new file into place, so the inode changes even
+        # when two saves land within the filesystem's mtime granularity
+        try:
+            stat = os.stat(self._sidecar_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+    
+    def _reload_if_changed(self, strict: bool = False) -> None:
+        """Pick up writes made by other processes since the last load."""
+        version = self._sidecar_version()
+        if version is not None and version != self._loaded_mtime:
+            self._load(strict)
+    
+    @contextmanager
+    def _writer_lock(self):
+        """Exclusive lock shared by all processes writing this collection (re-entrant under _lock)."""
+        if self._writer_depth:
+            self._writer_depth += 1
+            try:
+                yield
+            finally:
+                self._writer_depth -= 1
+            return
+        
+        os.makedirs(self._directory or ".", exist_ok=True)
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._writer_depth = 1
+            try:
+                yield
+            finally:
+                self._writer_depth = 0
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _save(self) -> None:
+        """Write matrix and sidecar atomically (temp file + rename); rewrites all N rows."""
+        os.makedirs(os.path.dirname(self._matrix_path) or ".", exist_ok=True)
+        
+        matrix_tmp = f"{self._matrix_path}.tmp"
+        with open(matrix_tmp, "wb") as f:
+            np.save(f, self._matrix[:self._count])
+        os.replace(matrix_tmp, self._matrix_path)
+        
+        sidecar_tmp = f"{self._sidecar_path}.tmp"
+        with open(sidecar_tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "name": self.name,
+                "metadata": self.metadata,
+                "dims": int(self._matrix.shape[1]) if self._count else 0,
+                "ids": self._ids,
+                "documents": self._documents,
+                "metadatas": self._metadatas
+            }, f)
+        os.replace(sidecar_tmp, self._sidecar_path)
+        self._loaded_mtime = self._sidecar_version()
+    
+    # =========================================================================
+    # WRITES
+    # =========================================================================
+    
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def _ensure_capacity(self, rows: int, dims: int) -> None:
+        if self._count == 0 and self._matrix.shape[1] != dims:
+            self._matrix = np.zeros((max(rows, 64), dims), dtype=np.float32)
+            return
+        if dims != self._matrix.shape[1]:
+            raise ValueError(f"Embedding dimension {dims} does not match collection dimension {self._matrix.shape[1]}")
+        if rows > self._matrix.shape[0]:
+            grown = np.zeros((max(rows, self._matrix.shape[0] * 2), dims), dtype=np.float32)
+            grown[:self._count] = self._matrix[:self._count]
+            self._matrix = grown
+    
+    def _write(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]],
+        metadatas: Optional[List[Dict]],
+        replace: bool
+    ) -> None:
+        if not ids:
+            return
+        vectors = self._normalize(embeddings)
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [{}] * len(ids)
+        
+        # The file lock keeps other processes from saving between our reload and save
+        with self._lock, self._writer_lock():
+            self._reload_if_changed(strict=True)
+            self._apply(ids, vectors, documents, metadatas, replace)
+            if not self._batch_depth:
+                self._flush()
+    
+    def _apply(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        documents: List[Optional[str]],
+        metadatas: List[Dict],
+        replace: bool
+    ) -> None:
+        """Apply a write in memory; _flush persists it."""
+        self._ensure_capacity(self._count + len(ids), vectors.shape[1])
+        
+        for issue_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+            row = self._rows.get(issue_id)
+            if row is None:
+                row = self._count
+                self._count += 1
+                self._rows[issue_id] = row
+                self._ids.append(issue_id)
+                self._documents.append(document)
+                self._metadatas.append(metadata or {})
+            elif not replace:
+                continue  # Like ChromaDB, add() leaves existing ids untouched
+            else:
+                self._documents[row] = document
+                self._metadatas[row] = metadata or {}
+            self._matrix[row] = vector
+            self._dirty = True
+    
+    def _flush(self) -> None:
+        if self._dirty:
+            self._save()
+            self._dirty = False
+    
+    def _discard(self) -> None:
+        """Drop unsaved writes and return to what is on disk."""
+        self._dirty = False
+        self._reset()
+        self._loaded_mtime = None
+        self._load()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group add/upsert calls into one write
+        
+        Holds the writer lock for the block and saves once when it exits,
+        instead of rewriting the collection on every call. Writes in the
+        block are discarded if it raises.
+        """
+        with self._lock, self._writer_lock():
+            self._reload_if_changed(strict=True)
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._discard()
+                raise
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._flush()
+    
+    def add(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict]] = None
+    ) -> None:
+        """Insert new ids (existing ids are skipped)."""
+        self._write(ids, embeddings, documents, metadatas, replace=False)
+    
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict]] = None
+    ) -> None:
+        """Insert or replace ids."""
+        self._write(ids, embeddings, documents, metadatas, replace=True)
+    
+    # =========================================================================
+    # READS
+    # =========================================================================
+    
+    def count(self) -> int:
+        with self._lock:
+            self._reload_if_changed()
+            return self._count
+    
+    def _distances(self, similarities: np.ndarray) -> np.ndarray:
+        # Same distance definitions as ChromaDB: cosine space 1 - cos, otherwise squared L2
+        if self.metadata.get("hnsw:space") == "cosine":
+            return 1.0 - similarities
+        return 2.0 - 2.0 * similarities
+    
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where: Optional[Dict] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Top-k rows for each query embedding (batched into one matrix multiply)
+        
+        Returns:
+            ChromaDB-shaped results: {"ids": [[...]], "distances": [[...]],
+            "documents": [[...]], "metadatas": [[...]]}, one list per query
+        """
+        include = include or ["documents", "metadatas", "distances"]
+        queries = self._normalize(query_embeddings)
+        
+        with self._lock:
+            self._reload_if_changed()
+            matrix = self._matrix[:self._count]
+            ids, documents, metadatas = self._ids, self._documents, self._metadatas
+            mask = None
+            if where:
+                mask = np.fromiter((matches_where(metadata, where) for metadata in metadatas), dtype=bool, count=self._count)
+        
+        results: Dict[str, Any] = {"ids": []}
+        for field in ("distances", "documents", "metadatas"):
+            if field in include:
+                results[field] = []
+        
+        candidates = int(mask.sum()) if mask is not None else matrix.shape[0]
+        k = min(n_results, candidates)
+        if k <= 0:
+            for values in results.values():
+                values.extend([] for _ in range(len(queries)))
+            return results
+        
+        similarities = queries @ matrix.T
+        if mask is not None:
+            similarities[:, ~mask] = -np.inf
+        
+        # argpartition finds the top k per query in O(n); only those k are sorted
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_distances = self._distances(np.take_along_axis(top_scores, order, axis=1))
+        
+        for query_rows, query_distances in zip(top, top_distances):
+            results["ids"].append([ids[row] for row in query_rows])
+            if "distances" in results:
+                results["distances"].append([float(distance) for distance in query_distances])
+            if "documents" in results:
+                results["documents"].append([documents[row] for row in query_rows])
+            if "metadatas" in results:
+                results["metadatas"].append([metadatas[row] for row in query_rows])
+        return results
+
+
+class MemmapVectorIndex(NumpyVectorIndex):
+    """
+    NumpyVectorIndex backed by a read-only memory map shared across processes
+    
+    Files per collection, in the store directory:
+    - <name>.<generation>.vec:  header + float32 rows
+    - <name>.<generation>.json: ids, documents and metadata
+    - <name>.current:           generation readers should map
+    - <name>.lock:              held by the single writer
+    
+    Writers never modify a mapped file: they write the next generation and
+    atomically replace the pointer. Readers notice the new pointer on their
+    next call and remap; the previous generation stays until the one after.
+    Writes made inside batch() are published as one generation when it exits.
+    """
+    
+    def __init__(self, name: str, directory: str, metadata: Optional[Dict] = None):
+        self._generation = 0
+        self._pointer_path = os.path.join(directory, f"{name}.current")
+        self._pending: List[tuple] = []  # (id, vector, document, metadata, replace) not yet published
+        super().__init__(name, directory, metadata)
+    
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self._directory, f"{self.name}.{generation:08d}.vec")
+    
+    def _generation_sidecar_path(self, generation: int) -> str:
+        return os.path.join(self._directory, f"{self.name}.{generation:08d}.json")
+    
+    def _pointer_version(self):
+        try:
+            stat = os.stat(self._pointer_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+    
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+    
+    def _load(self, strict: bool = False) -> None:
+        # A writer may remove an old generation between reading the pointer and opening it
+        for _ in range(LOAD_ATTEMPTS):
+            version = self._pointer_version()
+            if version is None:
+                return
+            try:
+                with open(self._pointer_path, encoding="utf-8") as f:
+                    generation = int(f.read().strip())
+                self._open_generation(generation)
+                self._loaded_mtime = version
+                return
+            except FileNotFoundError:
+                continue
+        message = f"Vector index {self.name} generation files disappeared while loading"
+        if strict:
+            raise ValueError(message)
+        logger.error(message)
+    
+    def _open_generation(self, generation: int) -> None:
+        """Map a generation's vectors read-only and load its sidecar."""
+        with open(self._vectors_path(generation), "rb") as f:
+            magic, dims, dtype_code, count = MEMMAP_HEADER.unpack(f.read(MEMMAP_HEADER.size))
+        if magic != MEMMAP_MAGIC or dtype_code not in MEMMAP_DTYPES:
+            raise ValueError(f"{self._vectors_path(generation)} is not a vector index file")
+        
+        with open(self._generation_sidecar_path(generation), encoding="utf-8") as f:
+            sidecar = json.load(f)
+        
+        if count:
+            matrix = np.memmap(
+                self._vectors_path(generation),
+                dtype=MEMMAP_DTYPES[dtype_code],
+                mode="r",
+                offset=MEMMAP_HEADER_SIZE,
+                shape=(count, dims)
+            )
+        else:
+            matrix = np.zeros((0, dims), dtype=np.float32)
+        
+        self.metadata = sidecar.get("metadata") or self.metadata
+        self._ids = sidecar.get("ids", [])
+        self._documents = sidecar.get("documents", [None] * len(self._ids))
+        self._metadatas = sidecar.get("metadatas", [{}] * len(self._ids))
+        self._rows = {issue_id: row for row, issue_id in enumerate(self._ids)}
+        self._count = count
+        self._matrix = matrix
+        self._generation = generation
+    
+    def _reload_if_changed(self, strict: bool = False) -> None:
+        """Remap when another process published a new generation."""
+        if self._pointer_version() != self._loaded_mtime:
+            self._load(strict)
+    
+    @staticmethod
+    def _replace_file(path: str, write, binary: bool = False) -> None:
+        """Write a file under a temporary name, fsync it and rename it into place."""
+        tmp = f"{path}.tmp"
+        with (open(tmp, "wb") if binary else open(tmp, "w", encoding="utf-8")) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    
+    def _publish(
+        self,
+        dims: int,
+        updates: Dict[int, np.ndarray],
+        new_vectors: List[np.ndarray],
+        ids: List[str],
+        documents: List[Optional[str]],
+        metadatas: List[Dict]
+    ) -> None:
+        """Write the next generation (current rows + updates + appended rows) and swap it in."""
+        generation = self._generation + 1
+        old_count = self._count
+        count = old_count + len(new_vectors)
+        update_rows = np.array(sorted(updates), dtype=np.int64)
+        
+        def write_vectors(f):
+            header = MEMMAP_HEADER.pack(MEMMAP_MAGIC, dims, 1, count)
+            f.write(header.ljust(MEMMAP_HEADER_SIZE, b"\0"))
+            for start in range(0, old_count, MEMMAP_COPY_ROWS):
+                end = min(start + MEMMAP_COPY_ROWS, old_count)
+                block = np.array(self._matrix[start:end], dtype=np.float32)
+                lo, hi = np.searchsorted(update_rows, [start, end])
+                for row in update_rows[lo:hi]:
+                    block[row - start] = updates[int(row)]
+                f.write(block.tobytes())
+            if new_vectors:
+                f.write(np.stack(new_vectors).astype(np.float32).tobytes())
+        
+        def write_sidecar(f):
+            json.dump({
+                "name": self.name,
+                "metadata": self.metadata,
+                "dims": dims,
+                "ids": ids,
+                "documents": documents,
+                "metadatas": metadatas
+            }, f)
+        
+        self._replace_file(self._vectors_path(generation), write_vectors, binary=True)
+        self._replace_file(self._generation_sidecar_path(generation), write_sidecar)
+        self._replace_file(self._pointer_path, lambda f: f.write(str(generation)))
+        
+        self._load(strict=True)
+        self._remove_old_generations(keep_from=generation - 1)
+    
+    def _remove_old_generations(self, keep_from: int) -> None:
+        # Processes still mapping a removed file keep their pages until they remap
+        pattern = re.compile(rf"^{re.escape(self.name)}\.(\d+)\.(vec|json)$")
+        for path in glob.glob(os.path.join(glob.escape(self._directory), f"{glob.escape(self.name)}.*")):
+            match = pattern.match(os.path.basename(path))
+            if match and int(match.group(1)) < keep_from:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.debug(f"Could not remove old vector index generation {path}: {e}")
+    
+    # =========================================================================
+    # WRITES
+    # =========================================================================
+    
+    def _apply(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        documents: List[Optional[str]],
+        metadatas: List[Dict],
+        replace: bool
+    ) -> None:
+        """Queue a write for the next generation; the mapped matrix is read-only."""
+        dims = vectors.shape[1]
+        expected = self._pending[0][1].shape[0] if self._pending else (self._matrix.shape[1] if self._count else dims)
+        if dims != expected:
+            raise ValueError(f"Embedding dimension {dims} does not match collection dimension {expected}")
+        for item in zip(ids, vectors, documents, metadatas):
+            self._pending.append((*item, replace))
+    
+    def _discard(self) -> None:
+        self._pending = []
+    
+    def _flush(self) -> None:
+        """Publish the queued writes as one generation."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        
+        # Build the next generation's lists; readers keep using the current ones
+        all_ids, all_documents, all_metadatas = list(self._ids), list(self._documents), list(self._metadatas)
+        rows = dict(self._rows)
+        updates: Dict[int, np.ndarray] = {}
+        new_vectors: List[np.ndarray] = []
+        
+        for issue_id, vector, document, metadata, replace in pending:
+            row = rows.get(issue_id)
+            if row is None:
+                rows[issue_id] = len(all_ids)
+                all_ids.append(issue_id)
+                all_documents.append(document)
+                all_metadatas.append(metadata or {})
+                new_vectors.append(vector)
+            elif not replace:
+                continue  # Like ChromaDB, add() leaves existing ids untouched
+            elif row < self._count:
+                all_documents[row] = document
+                all_metadatas[row] = metadata or {}
+                updates[row] = vector
+            else:
+                # Id appended earlier in this same generation
+                all_documents[row] = document
+                all_metadatas[row] = metadata or {}
+                new_vectors[row - self._count] = vector
+        
+        if not updates and not new_vectors:
+            return
+        self._publish(pending[0][1].shape[0], updates, new_vectors, all_ids, all_documents, all_metadatas)
+
+
+class NumpyVectorStore:
+    """Directory of NumpyVectorIndex collections (client with the ChromaDB collection API)"""
+    
+    def __init__(self, directory: str, memory_mapped: bool = False):
+        self.directory = directory
+        self.index_class = MemmapVectorIndex if memory_mapped else NumpyVectorIndex
+        self._collections: Dict[str, NumpyVectorIndex] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None) -> NumpyVectorIndex:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = self.index_class(name, self.directory, metadata)
+            return self._collections[name]
@@ -0,0 +1,51 @@
+"""
+Story pipeline latency metrics
+------------------------------
+In-process latency samples per pipeline mode so the staged, fused and other
+story creation modes can be compared from the analytics API.
+"""
+import threading
+from collections import deque
+from typing import Dict, List
+
+MAX_SAMPLES_PER_MODE = 500
+
+_samples: Dict[str, deque] = {}
+_lock = threading.Lock()
+
+
+def record_pipeline_latency(mode: str, timings: Dict[str, float]) -> None:
+    """
+    Record one pipeline run.
+    
+    Args:
+        mode: Pipeline mode that actually ran (e.g. staged, fused, fused_fallback)
+        timings: Seconds per phase, including a 'total' entry
+    """
+    with _lock:
+        _samples.setdefault(mode, deque(maxlen=MAX_SAMPLES_PER_MODE)).append(dict(timings))
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def get_pipeline_latency_stats() -> Dict[str, Dict]:
+    """Summarize recorded runs: count plus mean/p50/p95 seconds per phase and mode."""
+    with _lock:
+        snapshot = {mode: list(samples) for mode, samples in _samples.items()}
+    
+    stats = {}
+    for mode, runs in snapshot.items():
+        phases = {}
+        for phase in sorted({phase for run in runs for phase in run}):
+            values = [run[phase] for run in runs if phase in run]
+            phases[phase] = {
+                "mean": round(sum(values) / len(values), 3),
+                "p50": round(_percentile(values, 0.5), 3),
+                "p95": round(_percentile(values, 0.95), 3),
+            }
+        stats[mode] = {"runs": len(runs), "seconds": phases}
+    return stats
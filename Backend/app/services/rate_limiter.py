@@ -0,0 +1,57 @@
+"""
+Provider rate limiting
+----------------------
+Token-bucket limiters that keep concurrent work (bulk story creation, parallel
+pipeline stages) under each AI provider's requests-per-minute quota instead of
+tripping 429s.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+from app.config import settings
+
+
+class AsyncTokenBucket:
+    """Requests-per-minute token bucket shared by all callers in the process"""
+    
+    def __init__(self, requests_per_minute: int, burst: Optional[int] = None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1, requests_per_minute // 10))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self) -> float:
+        """Take a token if available; otherwise return seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+_limiters: Dict[str, Optional[AsyncTokenBucket]] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_provider_rate_limiter(model_key: str) -> Optional[AsyncTokenBucket]:
+    """Limiter for a model provider from LLM_RATE_LIMIT_<KEY>; None when unlimited."""
+    if model_key not in _limiters:
+        with _limiters_lock:
+            if model_key not in _limiters:
+                requests_per_minute = int(getattr(settings, f"llm_rate_limit_{model_key}", 0) or 0)
+                _limiters[model_key] = AsyncTokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+    return _limiters[model_key]
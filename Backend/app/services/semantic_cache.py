@@ -0,0 +1,227 @@
+"""
+Semantic cache for AI results
+-----------------------------
+Reuses a previous generation/estimation result when a new prompt is a
+near-duplicate of one already answered ("add login with Google" vs
+"add Google login"). Prompts are normalized, embedded with the same
+machinery as VectorService and matched by cosine similarity.
+
+The NumPy and memmap vector stores rewrite a collection on every write, so
+with those backends new entries are buffered and written in one upsert once
+enough are pending or the flush interval has passed.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_COLLECTION = "llm_semantic_cache"
+
+
+class SemanticCache:
+    """Embedding-similarity cache backed by a dedicated vector collection"""
+    
+    def __init__(
+        self,
+        vector_service,
+        threshold: float = 0.95,
+        ttl: int = 86400,
+        flush_size: int = 50,
+        flush_interval: float = 30
+    ):
+        self.vector_service = vector_service
+        self.threshold = threshold
+        self.ttl = ttl
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.collection = vector_service.get_collection(
+            SEMANTIC_CACHE_COLLECTION,
+            metadata={"hnsw:space": "cosine", "description": "Semantic cache of AI results"}
+        )
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "flushes": 0}
+        self._recent_similarities = deque(maxlen=200)
+        
+        # Buffer writes to collections that rewrite themselves per write (numpy/memmap)
+        self._buffered = bool(self.collection is not None and hasattr(self.collection, "batch") and flush_size > 1)
+        self._pending: Dict[str, Dict] = {}
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        if self._buffered:
+            atexit.register(self.flush)
+        
+        if not self.collection:
+            logger.warning("Vector store not available, semantic cache disabled")
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace."""
+        text = re.sub(r"[^\w\s]", " ", (text or "").lower())
+        return re.sub(r"\s+", " ", text).strip()
+    
+    @staticmethod
+    def _entry_id(operation: str, model_key: str, normalized: str) -> str:
+        return hashlib.sha256(f"{operation}:{model_key}:{normalized}".encode("utf-8")).hexdigest()
+    
+    def lookup(self, operation: str, model_key: str, text: str) -> Optional[Dict]:
+        """
+        Find a cached result for a semantically similar prompt.
+        
+        Returns:
+            {"result": {...}, "similarity": 0.97} on a hit, otherwise None
+        """
+        if not self.collection:
+            return None
+        
+        normalized = self.normalize(text)
+        embedding = self.vector_service.generate_embedding(normalized)
+        if not embedding:
+            return None
+        
+        best = self._match_pending(operation, model_key, embedding)
+        try:
+            results = self.collection.query(
+                query_embeddings=[embedding],
+                n_results=1,
+                where={"$and": [{"operation": operation}, {"model_key": model_key}]}
+            )
+        except Exception as e:
+            # Empty collections raise on query in some ChromaDB versions
+            logger.debug(f"Semantic cache query failed: {e}")
+            results = None
+        
+        if results and results["ids"] and results["ids"][0]:
+            similarity = 1 - results["distances"][0][0]  # Cosine distance to similarity
+            if best is None or similarity > best[0]:
+                best = (similarity, results["metadatas"][0][0])
+        
+        if best:
+            similarity, metadata = best
+            fresh = metadata.get("created_at", 0) + self.ttl > time.time()
+            
+            if similarity >= self.threshold and fresh:
+                self._stats["hits"] += 1
+                self._recent_similarities.append(round(similarity, 4))
+                logger.info(f"Semantic cache hit for {operation} (similarity: {similarity:.3f})")
+                return {
+                    "result": json.loads(metadata["result"]),
+                    "similarity": round(similarity, 4)
+                }
+        
+        self._stats["misses"] += 1
+        return None
+    
+    def store(self, operation: str, model_key: str, text: str, result: Dict) -> None:
+        """Cache a result under the embedding of its normalized prompt."""
+        if not self.collection:
+            return
+        
+        normalized = self.normalize(text)
+        embedding = self.vector_service.generate_embedding(normalized)
+        if not embedding:
+            return
+        
+        entry_id = self._entry_id(operation, model_key, normalized)
+        metadata = {
+            "operation": operation,
+            "model_key": model_key,
+            "result": json.dumps(result),
+            "created_at": time.time()
+        }
+        self._stats["stores"] += 1
+        
+        if not self._buffered:
+            self.collection.upsert(ids=[entry_id], embeddings=[embedding], documents=[normalized], metadatas=[metadata])
+            return
+        
+        with self._pending_lock:
+            self._pending[entry_id] = {"embedding": embedding, "document": normalized, "metadata": metadata}
+            due = len(self._pending) >= self.flush_size or time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+    
+    def flush(self) -> int:
+        """Write buffered entries to the collection in one upsert; returns entries written."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        
+        try:
+            self.collection.upsert(
+                ids=list(pending),
+                embeddings=[entry["embedding"] for entry in pending.values()],
+                documents=[entry["document"] for entry in pending.values()],
+                metadatas=[entry["metadata"] for entry in pending.values()]
+            )
+        except Exception as e:
+            logger.error(f"Error writing {len(pending)} semantic cache entries: {e}")
+            return 0
+        self._stats["flushes"] += 1
+        return len(pending)
+    
+    def _match_pending(self, operation: str, model_key: str, embedding) -> Optional[Tuple[float, Dict]]:
+        """Most similar buffered entry for the same operation and model, as (similarity, metadata)."""
+        with self._pending_lock:
+            candidates = [
+                entry for entry in self._pending.values()
+                if entry["metadata"]["operation"] == operation and entry["metadata"]["model_key"] == model_key
+            ]
+        if not candidates:
+            return None
+        
+        import numpy as np
+        
+        matrix = np.asarray([entry["embedding"] for entry in candidates], dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        norms[norms == 0] = 1.0
+        similarities = (matrix @ query) / norms
+        best = int(np.argmax(similarities))
+        return float(similarities[best]), candidates[best]["metadata"]
+    
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and the similarity of recent hits."""
+        similarities = list(self._recent_similarities)
+        return {
+            **self._stats,
+            "threshold": self.threshold,
+            "enabled": self.collection is not None,
+            "pending_writes": len(self._pending),
+            "recent_hit_similarities": similarities,
+            "average_hit_similarity": round(sum(similarities) / len(similarities), 4) if similarities else None
+        }
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Return the process-wide semantic cache, or None when disabled."""
+    global _semantic_cache
+    
+    if not settings.semantic_cache_enabled:
+        return None
+    
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                from app.services.vector_service import get_vector_service
+                _semantic_cache = SemanticCache(
+                    get_vector_service(),
+                    threshold=settings.semantic_cache_threshold,
+                    ttl=settings.semantic_cache_ttl,
+                    flush_size=settings.semantic_cache_flush_size,
+                    flush_interval=settings.semantic_cache_flush_interval
+                )
+    return _semantic_cache
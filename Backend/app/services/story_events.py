@@ -0,0 +1,172 @@
+"""
+Story pipeline events
+---------------------
+Publish/subscribe channel for story creation stage transitions so clients can
+be pushed progress instead of polling /story-status. Events are delivered
+in-process through asyncio queues; with Redis enabled they are fanned out over
+Redis pub/sub so a subscriber connected to one API worker sees stages published
+by any other worker (or a Celery worker).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL_PREFIX = "story-events:"
+REDIS_LAST_EVENT_PREFIX = "story-events-last:"
+LAST_EVENT_TTL = 3600
+MAX_TRACKED_REQUESTS = 1000
+
+# Stages after which no further events are published for a request
+TERMINAL_STAGES = {"completed", "failed"}
+
+
+class StoryEventBus:
+    """In-process pub/sub of story stage events with optional Redis fan-out"""
+    
+    def __init__(self, redis_url: Optional[str] = None):
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._last_events: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url)
+                threading.Thread(target=self._listen_redis, name="story-events-redis", daemon=True).start()
+                logger.info("Story events Redis fan-out enabled")
+            except Exception as e:
+                logger.warning(f"Story events Redis fan-out unavailable, using in-process delivery only: {e}")
+                self._redis = None
+    
+    def publish(self, request_id, stage: str, **data) -> Dict:
+        """
+        Publish a stage transition for a story request.
+        
+        Safe to call from the event loop or from worker threads.
+        """
+        event = {
+            "request_id": str(request_id),
+            "stage": stage,
+            "timestamp": time.time(),
+            **data
+        }
+        
+        if self._redis:
+            try:
+                payload = json.dumps(event, default=str)
+                self._redis.setex(REDIS_LAST_EVENT_PREFIX + event["request_id"], LAST_EVENT_TTL, payload)
+                # The listener thread delivers to local subscribers, including this process's
+                self._redis.publish(REDIS_CHANNEL_PREFIX + event["request_id"], payload)
+                return event
+            except Exception as e:
+                logger.warning(f"Story events Redis publish failed, delivering locally: {e}")
+        
+        self._deliver(event)
+        return event
+    
+    def _deliver(self, event: Dict) -> None:
+        request_id = event["request_id"]
+        with self._lock:
+            self._last_events[request_id] = event
+            self._last_events.move_to_end(request_id)
+            while len(self._last_events) > MAX_TRACKED_REQUESTS:
+                self._last_events.popitem(last=False)
+            subscribers = list(self._subscribers.get(request_id, []))
+        
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Subscriber's loop already closed
+                pass
+    
+    def _listen_redis(self) -> None:
+        """Relay events published by any worker to local subscribers."""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(REDIS_CHANNEL_PREFIX + "*")
+                for message in pubsub.listen():
+                    if message.get("type") == "pmessage":
+                        self._deliver(json.loads(message["data"]))
+            except Exception as e:
+                logger.warning(f"Story events Redis listener error, reconnecting: {e}")
+                time.sleep(1)
+    
+    def get_last_event(self, request_id) -> Optional[Dict]:
+        """Most recent event published for a request, if any."""
+        request_id = str(request_id)
+        with self._lock:
+            event = self._last_events.get(request_id)
+        if event or not self._redis:
+            return event
+        
+        try:
+            raw = self._redis.get(REDIS_LAST_EVENT_PREFIX + request_id)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"Story events Redis lookup failed: {e}")
+            return None
+    
+    async def subscribe(self, request_id, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict]]:
+        """
+        Yield events for a request until it reaches a terminal stage.
+        
+        Yields None every `heartbeat` seconds without events so callers can
+        keep idle connections alive.
+        """
+        request_id = str(request_id)
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(request_id, []).append(entry)
+        
+        try:
+            # Catch a request that finished before we subscribed
+            last_event = await asyncio.to_thread(self.get_last_event, request_id)
+            if last_event and last_event["stage"] in TERMINAL_STAGES:
+                yield last_event
+                return
+            
+            queue = entry[1]
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["stage"] in TERMINAL_STAGES:
+                    return
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(request_id, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    self._subscribers.pop(request_id, None)
+
+
+_story_event_bus: Optional[StoryEventBus] = None
+_story_event_bus_lock = threading.Lock()
+
+
+def get_story_event_bus() -> StoryEventBus:
+    """Return the process-wide story event bus."""
+    global _story_event_bus
+    
+    if _story_event_bus is None:
+        with _story_event_bus_lock:
+            if _story_event_bus is None:
+                _story_event_bus = StoryEventBus(
+                    redis_url=settings.redis_url if settings.story_events_redis_enabled else None
+                )
+    return _story_event_bus
@@ -1,25 +1,49 @@
 from sqlalchemy.orm import Session
 from uuid import UUID
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import functools
 import logging
+import time
 from datetime import datetime
 
 from app import models, schemas
-from app.services.ai_service import AIService
-from app.services.jira_service import JiraService
+from app.config import settings
+from app.database import SessionLocal
+from app.services.ai_service import get_ai_service
+from app.services.jira_service import JiraService, get_jira_executor
 from app.services.assignment_service import AssignmentService
+from app.services.pipeline_metrics import record_pipeline_latency
+from app.services.story_events import get_story_event_bus
 
 logger = logging.getLogger(__name__)
 
+# Stories above this many points are broken down into subtasks
+BREAKDOWN_POINT_THRESHOLD = 5
+
+# Durable pipeline stages in order; StoryRequest.pipeline_stage records the last one completed
+PIPELINE_STAGES = ["generate", "estimate", "create_issue", "breakdown", "create_subtasks", "assign"]
+
 class StoryService:
     """Service for story/ticket creation and management"""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        ai_service=None,
+        jira_service: Optional[JiraService] = None
+    ):
         self.db = db
-        self.ai_service = AIService()
-        self.jira_service = JiraService()
+        self.ai_service = ai_service or get_ai_service()
+        self.jira_service = jira_service or JiraService()
         self.assignment_service = AssignmentService(db)
+        self.events = get_story_event_bus()
     
-    def create_story_request(self, request: schemas.StoryCreateRequest) -> models.StoryRequest:
+    def create_story_request(
+        self,
+        request: schemas.StoryCreateRequest,
+        batch_id: Optional[UUID] = None
+    ) -> models.StoryRequest:
         """Create initial story request record"""
         story_request = models.StoryRequest(
             user_prompt=request.prompt,
@@ -28,7 +52,9 @@ class StoryService:
             project_key=request.project_key,
             epic_key=None,  # Removed epic_key, using sprint_id instead
             labels=request.labels,
-            status="pending"
+            status="pending",
+            batch_id=batch_id,
+            pipeline_options=request.model_dump(mode="json")
         )
         self.db.add(story_request)
         self.db.commit()
@@ -40,7 +66,24 @@ class StoryService:
         request_id: UUID,
         request: schemas.StoryCreateRequest
     ):
-        """Process story creation (runs in background)"""
+        """
+        Process story creation (runs in background)
+        
+        Pipeline modes (request.pipeline_mode, default STORY_PIPELINE_MODE):
+        - staged: generate, estimate and break down with separate LLM calls
+        - fused: one combined LLM call, falling back to staged if its
+          response does not validate
+        - speculative: after generation, estimation, breakdown and Jira issue
+          creation run concurrently; the breakdown is discarded if the story
+          turns out small enough
+        
+        Stage transitions (generating, estimating, jira_created,
+        subtasks_created, assigned, completed/failed) are published on the
+        story event bus as they happen.
+        """
+        story_request = None
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
         try:
             # Get story request
             story_request = self.db.query(models.StoryRequest).filter(
@@ -54,168 +97,743 @@ class StoryService:
             # Update status
             story_request.status = "processing"
             self.db.commit()
+            self._publish(request_id, "generating")
             
-            # Step 1: Generate story details using AI
-            logger.info(f"Generating story for request {request_id}")
-            generated_story = await self.ai_service.generate_story(request.prompt)
+            mode = request.pipeline_mode or settings.story_pipeline_mode
+            subtasks: Optional[List[Dict]] = None
             
-            story_request.generated_title = generated_story["title"]
-            story_request.generated_description = generated_story["description"]
-            story_request.acceptance_criteria = generated_story["acceptance_criteria"]
-            story_request.technical_requirements = generated_story.get("technical_requirements")
-            story_request.required_skills = generated_story.get("required_skills", [])
-            self.db.commit()
+            # Steps 1-2 (fused): generate, estimate and break down in one call
+            if mode == "fused" and request.auto_estimate:
+                subtasks = await self._generate_fused(story_request, request, timings)
+                if subtasks is None:
+                    mode = "fused_fallback"
+            elif mode == "fused":
+                mode = "staged"
             
-            # Step 2: Estimate story points (if enabled)
-            if request.auto_estimate:
-                logger.info(f"Estimating story points for request {request_id}")
-                estimation = await self.ai_service.estimate_story_points(
-                    generated_story["title"],
-                    generated_story["description"]
-                )
-                story_request.estimated_points = estimation["points"]
-                self.db.commit()
+            if mode == "speculative":
+                # Step 1: Generate story details using AI
+                await self._generate_story(story_request, request, timings)
+                
+                # Steps 2-4 (speculative): estimate, break down and create the ticket concurrently
+                self._publish(request_id, "estimating")
+                jira_issue_key, subtasks = await self._run_speculative(story_request, request, timings)
+            else:
+                if subtasks is None:
+                    # Step 1: Generate story details using AI
+                    await self._generate_story(story_request, request, timings)
+                    
+                    # Step 2: Estimate story points (if enabled)
+                    if request.auto_estimate:
+                        self._publish(request_id, "estimating")
+                        await self._estimate_story(story_request, timings)
+                
+                # Step 3: Create ticket in Jira
+                jira_issue_key = self._create_jira_issue(story_request, request)
             
-            # Step 3: Create ticket in Jira
-            logger.info(f"Creating Jira ticket for request {request_id}")
-            jira_issue = self.jira_service.create_issue(
-                project_key=request.project_key,
-                issue_type=request.issue_type,
-                summary=story_request.generated_title,
-                description=story_request.generated_description,
-                priority=request.priority,
-                story_points=story_request.estimated_points,
-                labels=request.labels,
-                epic_key=None  # Removed epic support, using sprint_id instead
+            self._publish(
+                request_id,
+                "jira_created",
+                jira_issue_key=jira_issue_key,
+                estimated_points=story_request.estimated_points
             )
             
-            story_request.jira_issue_key = jira_issue.key
-            self.db.commit()
-            
             # Step 4: Break down into subtasks (if enabled and points > 5)
-            subtasks = []
             created_subtask_keys = []
-            if request.auto_breakdown and story_request.estimated_points and story_request.estimated_points > 5:
-                logger.info(f"Breaking down story {jira_issue.key} into subtasks (estimated points: {story_request.estimated_points})")
+            if self._needs_breakdown(story_request, request):
+                logger.info(f"Breaking down story {jira_issue_key} into subtasks (estimated points: {story_request.estimated_points})")
                 try:
-                    subtasks = await self.ai_service.breakdown_story(
-                        generated_story["title"],
-                        generated_story["description"],
-                        story_request.estimated_points
+                    if subtasks is None:
+                        subtasks = await self._breakdown_story(story_request, timings)
+                    created_subtask_keys = await self._create_subtasks(jira_issue_key, subtasks)
+                    self._publish(
+                        request_id,
+                        "subtasks_created",
+                        subtasks=[subtask["key"] for subtask in created_subtask_keys]
                     )
-                    
-                    logger.info(f"AI generated {len(subtasks)} subtasks")
-                    
-                    # Create subtasks in Jira
-                    for idx, subtask in enumerate(subtasks, 1):
-                        try:
-                            logger.info(f"Creating subtask {idx}/{len(subtasks)}: {subtask.get('title', 'N/A')}")
-                            subtask_issue = self.jira_service.create_subtask(
-                                parent_key=jira_issue.key,
-                                summary=subtask["title"],
-                                description=subtask.get("description", ""),
-                                story_points=subtask.get("points")
-                            )
-                            if subtask_issue:
-                                created_subtask_keys.append({
-                                    "key": subtask_issue.key,
-                                    "points": subtask.get("points", 1),
-                                    "category": subtask.get("category", "General")
-                                })
-                        except Exception as e:
-                            logger.error(f"Failed to create subtask {idx}: {e}")
-                            # Continue with other subtasks
-                    
-                    logger.info(f"Successfully created {len(created_subtask_keys)} subtasks for {jira_issue.key}")
                 except Exception as e:
                     logger.error(f"Error during story breakdown: {e}", exc_info=True)
                     # Continue with assignment even if breakdown fails
-            else:
-                if not request.auto_breakdown:
-                    logger.info(f"Auto-breakdown disabled for {jira_issue.key}")
-                elif not story_request.estimated_points:
-                    logger.info(f"No story points estimated for {jira_issue.key}, skipping breakdown")
-                elif story_request.estimated_points <= 5:
-                    logger.info(f"Story points ({story_request.estimated_points}) <= 5 for {jira_issue.key}, skipping breakdown")
+            elif subtasks:
+                logger.info(f"Discarding {len(subtasks)} speculative subtasks for {jira_issue_key}")
             
             # Step 5: Assign to team member (if enabled)
             if request.auto_assign:
-                logger.info(f"Assigning ticket {jira_issue.key}")
-                assignment = await self.assignment_service.assign_ticket(
-                    issue_key=jira_issue.key,
-                    priority=request.priority,
-                    estimated_points=story_request.estimated_points or 5,
-                    required_skills=story_request.required_skills or []
-                )
-                
-                if assignment:
-                    assignee_username = assignment["assigned_to"]
-                    assignee_display = assignment.get("display_name", assignee_username)
-                    
-                    logger.info(f"Assignment service selected: {assignee_display} ({assignee_username})")
-                    story_request.assigned_to = assignee_username
-                    
-                    # Update assignee in Jira using account ID
-                    try:
-                        self.jira_service.assign_issue(jira_issue.key, assignee_username)
-                        logger.info(f"Successfully assigned {jira_issue.key} to {assignee_display}")
-                        
-                        # Add to sprint (uses provided sprint_id or active sprint if not provided)
-                        sprint_added = self.jira_service.add_issue_to_sprint(
-                            jira_issue.key, 
-                            sprint_id=request.sprint_id
-                        )
-                        if sprint_added:
-                            sprint_msg = f"sprint {request.sprint_id}" if request.sprint_id else "active sprint"
-                            logger.info(f"Added {jira_issue.key} to {sprint_msg}")
-                        else:
-                            logger.warning(f"Could not add {jira_issue.key} to sprint (no active sprint or API error)")
-                    except Exception as e:
-                        logger.error(f"Failed to assign in Jira: {e}")
-                        # Continue even if assignment fails
-                    
-                    self.db.commit()
-                else:
-                    logger.warning(f"No suitable assignee found for {jira_issue.key}, added to queue")
+                await self._assign_story(story_request, request, jira_issue_key)
                 
                 # Step 5b: Assign subtasks (if any were created)
-                if created_subtask_keys and request.auto_assign:
-                    logger.info(f"Assigning {len(created_subtask_keys)} subtasks for {jira_issue.key}")
-                    for subtask_info in created_subtask_keys:
-                        try:
-                            subtask_key = subtask_info["key"]
-                            subtask_points = subtask_info["points"]
-                            
-                            # Assign subtask
-                            subtask_assignment = await self.assignment_service.assign_ticket(
-                                issue_key=subtask_key,
-                                priority=request.priority,
-                                estimated_points=subtask_points,
-                                required_skills=story_request.required_skills or []
-                            )
-                            
-                            if subtask_assignment:
-                                subtask_assignee = subtask_assignment["assigned_to"]
-                                self.jira_service.assign_issue(subtask_key, subtask_assignee)
-                                logger.info(f"Assigned subtask {subtask_key} to {subtask_assignee}")
-                                
-                                # Add subtask to sprint (same sprint as parent)
-                                self.jira_service.add_issue_to_sprint(subtask_key, sprint_id=request.sprint_id)
-                            else:
-                                logger.warning(f"No assignee found for subtask {subtask_key}")
-                        except Exception as e:
-                            logger.error(f"Failed to assign subtask {subtask_key}: {e}")
-                            # Continue with other subtasks
+                if created_subtask_keys:
+                    await self._assign_subtasks(story_request, request, jira_issue_key, created_subtask_keys)
+                
+                self._publish(request_id, "assigned", assigned_to=story_request.assigned_to)
             
             # Mark as completed
             story_request.status = "completed"
             story_request.updated_at = datetime.utcnow()
             self.db.commit()
+            self._publish(request_id, "completed", jira_issue_key=jira_issue_key)
             
-            logger.info(f"Successfully created story {jira_issue.key} for request {request_id}")
-            
+            timings["total"] = time.perf_counter() - started
+            record_pipeline_latency(mode, timings)
+            logger.info(
+                f"Successfully created story {jira_issue_key} for request {request_id} "
+                f"({mode} pipeline, {timings['total']:.2f}s)"
+            )
+        
         except Exception as e:
             logger.error(f"Error processing story creation for {request_id}: {e}")
+            if story_request:
+                story_request.status = "failed"
+                story_request.error_message = str(e)
+                self.db.commit()
+            self._publish(request_id, "failed", error_message=str(e))
+    
+    # =========================================================================
+    # DURABLE PIPELINE (checkpointed stages, used by Celery and resume)
+    # =========================================================================
+    
+    async def run_pipeline(self, request_id: UUID):
+        """Run every remaining durable stage in-process"""
+        try:
+            for stage in PIPELINE_STAGES:
+                if not await self.run_pipeline_stage(request_id, stage):
+                    return
+        except Exception as e:
+            logger.error(f"Error processing story creation for {request_id}: {e}")
+            self.fail_story_request(request_id, e)
+    
+    async def run_pipeline_stage(self, request_id: UUID, stage: str) -> bool:
+        """
+        Run one durable pipeline stage from its checkpoint
+        
+        Each stage persists its output on the StoryRequest before recording
+        itself in pipeline_stage, and stages already recorded are skipped, so a
+        retried or re-enqueued pipeline resumes from the last completed stage.
+        The fused mode is honoured; speculative runs as staged, since its
+        concurrent branches cannot be checkpointed independently.
+        
+        Returns:
+            False if the request is missing or already finished, True otherwise
+        """
+        story_request = self.db.query(models.StoryRequest).filter(
+            models.StoryRequest.request_id == request_id
+        ).first()
+        
+        if not story_request:
+            logger.error(f"Story request {request_id} not found")
+            return False
+        if story_request.status in ("completed", "failed"):
+            logger.info(f"Story request {request_id} already {story_request.status}, stopping pipeline")
+            return False
+        if self._stage_completed(story_request, stage):
+            logger.info(f"Skipping {stage} for {request_id}, already checkpointed")
+            return True
+        
+        request = schemas.StoryCreateRequest(**story_request.pipeline_options)
+        timings: Dict[str, float] = {}
+        
+        if story_request.status != "processing":
+            story_request.status = "processing"
+            self.db.commit()
+        
+        if stage == "generate":
+            self._publish(request_id, "generating")
+            subtasks = None
+            mode = request.pipeline_mode or settings.story_pipeline_mode
+            if mode == "speculative":
+                # Stages are checkpointed one after another, so there is nothing to overlap
+                logger.info(f"Speculative mode runs as staged in the durable pipeline ({request_id})")
+            if mode == "fused" and request.auto_estimate:
+                subtasks = await self._generate_fused(story_request, request, timings)
+            if subtasks is None:
+                await self._generate_story(story_request, request, timings)
+            else:
+                story_request.generated_subtasks = subtasks
+        
+        elif stage == "estimate":
+            # A fused generation already produced the estimate
+            if request.auto_estimate and story_request.estimated_points is None:
+                self._publish(request_id, "estimating")
+                await self._estimate_story(story_request, timings)
+        
+        elif stage == "create_issue":
+            if not story_request.jira_issue_key:
+                self._create_jira_issue(story_request, request)
+            self._publish(
+                request_id,
+                "jira_created",
+                jira_issue_key=story_request.jira_issue_key,
+                estimated_points=story_request.estimated_points
+            )
+        
+        elif stage == "breakdown":
+            if self._needs_breakdown(story_request, request) and story_request.generated_subtasks is None:
+                logger.info(f"Breaking down story {story_request.jira_issue_key} into subtasks (estimated points: {story_request.estimated_points})")
+                story_request.generated_subtasks = await self._breakdown_story(story_request, timings)
+        
+        elif stage == "create_subtasks":
+            if self._needs_breakdown(story_request, request) and story_request.generated_subtasks:
+                await self._create_subtasks_checkpointed(story_request)
+                self._publish(
+                    request_id,
+                    "subtasks_created",
+                    subtasks=[subtask["key"] for subtask in story_request.created_subtasks or []]
+                )
+        
+        elif stage == "assign":
+            if request.auto_assign:
+                if not story_request.assigned_to:
+                    await self._assign_story(story_request, request, story_request.jira_issue_key)
+                
+                created_subtasks = [dict(subtask) for subtask in story_request.created_subtasks or []]
+                if created_subtasks:
+                    await self._assign_subtasks(story_request, request, story_request.jira_issue_key, created_subtasks)
+                    story_request.created_subtasks = created_subtasks
+                
+                self._publish(request_id, "assigned", assigned_to=story_request.assigned_to)
+            
+            story_request.status = "completed"
+            story_request.updated_at = datetime.utcnow()
+        
+        else:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+        
+        story_request.pipeline_stage = stage
+        self.db.commit()
+        
+        if stage == "assign":
+            self._publish(request_id, "completed", jira_issue_key=story_request.jira_issue_key)
+            logger.info(f"Successfully created story {story_request.jira_issue_key} for request {request_id} (durable pipeline)")
+        return True
+    
+    def fail_story_request(self, request_id: UUID, error: Exception):
+        """Mark a request failed after its pipeline gave up"""
+        self.db.rollback()
+        story_request = self.db.query(models.StoryRequest).filter(
+            models.StoryRequest.request_id == request_id
+        ).first()
+        if story_request:
             story_request.status = "failed"
-            story_request.error_message = str(e)
+            story_request.error_message = str(error)
+            self.db.commit()
+        self._publish(request_id, "failed", error_message=str(error))
+    
+    async def create_jira_issues_bulk(self, request_ids: List[UUID]):
+        """
+        Durable create_issue stage for many requests at once
+        
+        Parents are created with Jira bulk requests; requests Jira rejects are
+        marked failed with the per-issue error. Requests whose whole chunk
+        failed (transport error, no per-issue answer) stay in processing
+        without a ticket, so the per-story create_issue stage retries them.
+        """
+        story_requests = self.db.query(models.StoryRequest).filter(
+            models.StoryRequest.request_id.in_(request_ids),
+            models.StoryRequest.status == "processing",
+            models.StoryRequest.jira_issue_key.is_(None)
+        ).all()
+        if not story_requests:
+            return
+        
+        issues = []
+        for story_request in story_requests:
+            request = schemas.StoryCreateRequest(**story_request.pipeline_options)
+            issues.append(self.jira_service.build_issue_fields(
+                project_key=request.project_key,
+                issue_type=request.issue_type,
+                summary=story_request.generated_title,
+                description=story_request.generated_description,
+                priority=request.priority,
+                story_points=story_request.estimated_points,
+                labels=request.labels
+            ))
+        
+        logger.info(f"Bulk creating {len(issues)} Jira tickets")
+        results = await self._run_jira(self.jira_service.create_issues_bulk, issues)
+        
+        retry = set()
+        for story_request, result in zip(story_requests, results):
+            if "key" in result:
+                story_request.jira_issue_key = result["key"]
+                story_request.pipeline_stage = "create_issue"
+            elif result.get("retryable"):
+                retry.add(story_request.request_id)
+            else:
+                story_request.status = "failed"
+                story_request.error_message = f"Jira issue creation failed: {result.get('error')}"
+        self.db.commit()
+        
+        if retry:
+            logger.warning(f"Bulk Jira creation did not reach Jira for {len(retry)} stories, leaving them to create_issue")
+        
+        for story_request in story_requests:
+            if story_request.request_id in retry:
+                continue
+            if story_request.jira_issue_key:
+                self._publish(
+                    story_request.request_id,
+                    "jira_created",
+                    jira_issue_key=story_request.jira_issue_key,
+                    estimated_points=story_request.estimated_points
+                )
+            else:
+                self._publish(story_request.request_id, "failed", error_message=story_request.error_message)
+    
+    def reset_for_resume(self, story_request: models.StoryRequest):
+        """Reopen a failed request so its pipeline continues from the last checkpoint"""
+        story_request.status = "processing"
+        story_request.error_message = None
+        self.db.commit()
+    
+    @staticmethod
+    def _stage_completed(story_request: models.StoryRequest, stage: str) -> bool:
+        if not story_request.pipeline_stage:
+            return False
+        return PIPELINE_STAGES.index(story_request.pipeline_stage) >= PIPELINE_STAGES.index(stage)
+    
+    async def _create_subtasks_checkpointed(self, story_request: models.StoryRequest):
+        """Bulk create generated subtasks not created yet and checkpoint the ones that landed"""
+        created = [dict(subtask) for subtask in story_request.created_subtasks or []]
+        done = {subtask["index"] for subtask in created}
+        
+        pending = [
+            (idx, subtask)
+            for idx, subtask in enumerate(story_request.generated_subtasks)
+            if idx not in done
+        ]
+        if pending:
+            results = await self._create_subtasks_bulk(
+                story_request.jira_issue_key,
+                [subtask for _, subtask in pending]
+            )
+            for (idx, _), created_subtask in zip(pending, results):
+                if created_subtask:
+                    created.append({**created_subtask, "index": idx})
+            story_request.created_subtasks = sorted(created, key=lambda subtask: subtask["index"])
             self.db.commit()
+        
+        logger.info(f"{len(created)} subtasks created for {story_request.jira_issue_key}")
+    
+    def _publish(self, request_id: UUID, stage: str, **data):
+        """Publish a pipeline stage transition; never fails the pipeline"""
+        try:
+            self.events.publish(request_id, stage, **data)
+        except Exception as e:
+            logger.warning(f"Failed to publish {stage} event for {request_id}: {e}")
+    
+    # =========================================================================
+    # PIPELINE STAGES
+    # =========================================================================
+    
+    async def _generate_fused(
+        self,
+        story_request: models.StoryRequest,
+        request: schemas.StoryCreateRequest,
+        timings: Dict[str, float]
+    ) -> Optional[List[Dict]]:
+        """Generate story, estimate and subtasks in one LLM call; None if it failed validation"""
+        logger.info(f"Generating fused story bundle for request {story_request.request_id}")
+        started = time.perf_counter()
+        try:
+            bundle = await self.ai_service.generate_story_bundle(
+                request.prompt,
+                breakdown_threshold=BREAKDOWN_POINT_THRESHOLD if request.auto_breakdown else None
+            )
+        except Exception as e:
+            logger.warning(f"Fused generation failed, falling back to staged pipeline: {e}")
+            return None
+        finally:
+            timings["fused"] = time.perf_counter() - started
+        
+        self._apply_generated_story(story_request, bundle)
+        story_request.estimated_points = bundle["points"]
+        self.db.commit()
+        return bundle["subtasks"]
+    
+    async def _generate_story(
+        self,
+        story_request: models.StoryRequest,
+        request: schemas.StoryCreateRequest,
+        timings: Dict[str, float]
+    ):
+        """Generate story details from the prompt"""
+        logger.info(f"Generating story for request {story_request.request_id}")
+        started = time.perf_counter()
+        generated_story = await self.ai_service.generate_story(request.prompt)
+        timings["generate"] = time.perf_counter() - started
+        
+        self._apply_generated_story(story_request, generated_story)
+        self.db.commit()
+    
+    def _apply_generated_story(self, story_request: models.StoryRequest, generated_story: Dict):
+        """Copy generated story fields onto the request record"""
+        story_request.generated_title = generated_story["title"]
+        story_request.generated_description = generated_story["description"]
+        story_request.acceptance_criteria = generated_story["acceptance_criteria"]
+        story_request.technical_requirements = generated_story.get("technical_requirements")
+        story_request.required_skills = generated_story.get("required_skills", [])
+    
+    async def _estimate_story(self, story_request: models.StoryRequest, timings: Dict[str, float]):
+        """Estimate story points for the generated story"""
+        logger.info(f"Estimating story points for request {story_request.request_id}")
+        started = time.perf_counter()
+        estimation = await self.ai_service.estimate_story_points(
+            story_request.generated_title,
+            story_request.generated_description
+        )
+        timings["estimate"] = time.perf_counter() - started
+        
+        story_request.estimated_points = estimation["points"]
+        self.db.commit()
+    
+    def _create_jira_issue(
+        self,
+        story_request: models.StoryRequest,
+        request: schemas.StoryCreateRequest
+    ) -> str:
+        """Create the parent ticket in Jira"""
+        logger.info(f"Creating Jira ticket for request {story_request.request_id}")
+        jira_issue = self.jira_service.create_issue(
+            project_key=request.project_key,
+            issue_type=request.issue_type,
+            summary=story_request.generated_title,
+            description=story_request.generated_description,
+            priority=request.priority,
+            story_points=story_request.estimated_points,
+            labels=request.labels,
+            epic_key=None  # Removed epic support, using sprint_id instead
+        )
+        
+        story_request.jira_issue_key = jira_issue.key
+        self.db.commit()
+        return jira_issue.key
+    
+    async def _run_speculative(
+        self,
+        story_request: models.StoryRequest,
+        request: schemas.StoryCreateRequest,
+        timings: Dict[str, float]
+    ) -> Tuple[str, Optional[List[Dict]]]:
+        """
+        Estimate, break down and create the Jira issue concurrently.
+        
+        Breakdown only needs the title and description, so it starts before
+        the points are known. The issue is created without points, which are
+        set once estimation returns.
+        
+        Returns:
+            (jira_issue_key, speculative subtasks or None)
+        """
+        title = story_request.generated_title
+        description = story_request.generated_description
+        logger.info(f"Running estimation, breakdown and Jira creation concurrently for request {story_request.request_id}")
+        
+        async def estimate():
+            if not request.auto_estimate:
+                return None
+            return await self._timed(self.ai_service.estimate_story_points(title, description), timings, "estimate")
+        
+        async def breakdown():
+            if not request.auto_breakdown:
+                return None
+            return await self._timed(self.ai_service.breakdown_story(title, description), timings, "breakdown")
+        
+        create_issue = self._run_jira(
+            self.jira_service.create_issue,
+            project_key=request.project_key,
+            issue_type=request.issue_type,
+            summary=title,
+            description=description,
+            priority=request.priority,
+            story_points=None,
+            labels=request.labels,
+            epic_key=None
+        )
+        
+        started = time.perf_counter()
+        estimate_task = asyncio.create_task(estimate())
+        breakdown_task = asyncio.create_task(breakdown())
+        create_task = asyncio.create_task(self._timed(create_issue, timings, "jira_create"))
+        tasks = [estimate_task, breakdown_task, create_task]
+        
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        failed = next((task for task in done if not task.cancelled() and task.exception()), None)
+        if failed:
+            await self._cancel_speculative(tasks, create_task)
+            raise failed.exception()
+        timings["speculative"] = time.perf_counter() - started
+        
+        estimation, subtasks, jira_issue = estimate_task.result(), breakdown_task.result(), create_task.result()
+        
+        story_request.jira_issue_key = jira_issue.key
+        if estimation:
+            story_request.estimated_points = estimation["points"]
+        self.db.commit()
+        
+        if story_request.estimated_points:
+            try:
+                await self._run_jira(self.jira_service.set_story_points, jira_issue.key, story_request.estimated_points)
+            except Exception as e:
+                logger.error(f"Failed to set story points on {jira_issue.key}: {e}")
+        
+        return jira_issue.key, subtasks
+    
+    async def _cancel_speculative(self, tasks: List[asyncio.Task], create_task: asyncio.Task):
+        """Stop the remaining speculative branches after one failed"""
+        for task in tasks:
+            if task is not create_task:
+                task.cancel()
+        
+        # A Jira call already running in the pool cannot be interrupted; wait
+        # for it and delete the issue so the failed request leaves no orphan
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        jira_issue = results[tasks.index(create_task)]
+        if jira_issue is not None and not isinstance(jira_issue, BaseException):
+            try:
+                await self._run_jira(jira_issue.delete)
+                logger.info(f"Deleted speculative issue {jira_issue.key} after a failed branch")
+            except Exception as e:
+                logger.error(f"Failed to delete speculative issue {jira_issue.key}: {e}")
+    
+    @staticmethod
+    async def _timed(awaitable, timings: Dict[str, float], phase: str):
+        """Await and record how long it took under the given phase"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[phase] = time.perf_counter() - started
+    
+    def _needs_breakdown(
+        self,
+        story_request: models.StoryRequest,
+        request: schemas.StoryCreateRequest
+    ) -> bool:
+        """Whether the story should be broken down into subtasks"""
+        if not request.auto_breakdown:
+            logger.info(f"Auto-breakdown disabled for request {story_request.request_id}")
+            return False
+        if not story_request.estimated_points:
+            logger.info(f"No story points estimated for request {story_request.request_id}, skipping breakdown")
+            return False
+        if story_request.estimated_points <= BREAKDOWN_POINT_THRESHOLD:
+            logger.info(
+                f"Story points ({story_request.estimated_points}) <= {BREAKDOWN_POINT_THRESHOLD} "
+                f"for request {story_request.request_id}, skipping breakdown"
+            )
+            return False
+        return True
+    
+    async def _breakdown_story(self, story_request: models.StoryRequest, timings: Dict[str, float]) -> List[Dict]:
+        """Break the story down into subtasks with AI"""
+        started = time.perf_counter()
+        subtasks = await self.ai_service.breakdown_story(
+            story_request.generated_title,
+            story_request.generated_description,
+            story_request.estimated_points
+        )
+        timings["breakdown"] = time.perf_counter() - started
+        
+        logger.info(f"AI generated {len(subtasks)} subtasks")
+        return subtasks
+    
+    async def _run_jira(self, func, *args, **kwargs):
+        """Run a blocking Jira call in the bounded Jira thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_jira_executor(), functools.partial(func, *args, **kwargs))
+    
+    async def _create_subtasks(self, parent_key: str, subtasks: List[Dict]) -> List[Dict]:
+        """Create subtasks in Jira, skipping any that fail"""
+        logger.info(f"Creating {len(subtasks)} subtasks for {parent_key}")
+        results = await self._create_subtasks_bulk(parent_key, subtasks)
+        created_subtask_keys = [created_subtask for created_subtask in results if created_subtask]
+        
+        logger.info(f"Successfully created {len(created_subtask_keys)} subtasks for {parent_key}")
+        return created_subtask_keys
+    
+    async def _create_subtasks_bulk(self, parent_key: str, subtasks: List[Dict]) -> List[Optional[Dict]]:
+        """Create subtasks with Jira bulk requests; one entry per subtask, None where it failed"""
+        try:
+            results = await self._run_jira(self.jira_service.create_subtasks_bulk, parent_key, subtasks)
+        except Exception as e:
+            logger.error(f"Failed to create subtasks for {parent_key}: {e}")
+            return [None] * len(subtasks)
+        
+        created = []
+        for subtask, result in zip(subtasks, results):
+            if "key" not in result:
+                logger.error(f"Failed to create subtask '{subtask.get('title', 'N/A')}': {result.get('error')}")
+                created.append(None)
+                continue
+            created.append({
+                "key": result["key"],
+                "points": subtask.get("points", 1),
+                "category": subtask.get("category", "General")
+            })
+        return created
+    
+    async def _assign_story(
+        self,
+        story_request: models.StoryRequest,
+        request: schemas.StoryCreateRequest,
+        jira_issue_key: str
+    ):
+        """Assign the parent ticket to the best-fit team member"""
+        logger.info(f"Assigning ticket {jira_issue_key}")
+        assignment = await self.assignment_service.assign_ticket(
+            issue_key=jira_issue_key,
+            priority=request.priority,
+            estimated_points=story_request.estimated_points or 5,
+            required_skills=story_request.required_skills or []
+        )
+        
+        if not assignment:
+            logger.warning(f"No suitable assignee found for {jira_issue_key}, added to queue")
+            return
+        
+        assignee_username = assignment["assigned_to"]
+        assignee_display = assignment.get("display_name", assignee_username)
+        
+        logger.info(f"Assignment service selected: {assignee_display} ({assignee_username})")
+        story_request.assigned_to = assignee_username
+        
+        # Update assignee in Jira using account ID
+        try:
+            await self._run_jira(self.jira_service.assign_issue, jira_issue_key, assignee_username)
+            logger.info(f"Successfully assigned {jira_issue_key} to {assignee_display}")
+            
+            # Add to sprint (uses provided sprint_id or active sprint if not provided)
+            sprint_added = await self._run_jira(
+                self.jira_service.add_issue_to_sprint,
+                jira_issue_key,
+                sprint_id=request.sprint_id
+            )
+            if sprint_added:
+                sprint_msg = f"sprint {request.sprint_id}" if request.sprint_id else "active sprint"
+                logger.info(f"Added {jira_issue_key} to {sprint_msg}")
+            else:
+                logger.warning(f"Could not add {jira_issue_key} to sprint (no active sprint or API error)")
+        except Exception as e:
+            logger.error(f"Failed to assign in Jira: {e}")
+            # Continue even if assignment fails
+        
+        self.db.commit()
+    
+    async def _assign_subtasks(
+        self,
+        story_request: models.StoryRequest,
+        request: schemas.StoryCreateRequest,
+        jira_issue_key: str,
+        created_subtask_keys: List[Dict]
+    ):
+        """
+        Assign each created subtask and add them to the parent's sprint
+        
+        Assignee selection runs serially since it shares this request's DB
+        session; the Jira assignments then run concurrently and all subtasks
+        go to the sprint in one agile API call.
+        """
+        logger.info(f"Assigning {len(created_subtask_keys)} subtasks for {jira_issue_key}")
+        
+        # Pick assignees (DB work, serial)
+        selected = []
+        for subtask_info in created_subtask_keys:
+            subtask_key = subtask_info["key"]
+            if subtask_info.get("assigned_to"):
+                continue  # Already assigned on an earlier attempt
+            try:
+                subtask_assignment = await self.assignment_service.assign_ticket(
+                    issue_key=subtask_key,
+                    priority=request.priority,
+                    estimated_points=subtask_info["points"],
+                    required_skills=story_request.required_skills or []
+                )
+                if subtask_assignment:
+                    selected.append((subtask_info, subtask_assignment["assigned_to"]))
+                else:
+                    logger.warning(f"No assignee found for subtask {subtask_key}")
+            except Exception as e:
+                logger.error(f"Failed to assign subtask {subtask_key}: {e}")
+                # Continue with other subtasks
+        
+        if not selected:
+            return
+        
+        # Update assignees in Jira concurrently
+        async def assign_in_jira(subtask_info: Dict, subtask_assignee: str):
+            try:
+                await self._run_jira(self.jira_service.assign_issue, subtask_info["key"], subtask_assignee)
+                subtask_info["assigned_to"] = subtask_assignee
+                logger.info(f"Assigned subtask {subtask_info['key']} to {subtask_assignee}")
+            except Exception as e:
+                logger.error(f"Failed to assign subtask {subtask_info['key']} in Jira: {e}")
+        
+        await asyncio.gather(*(assign_in_jira(subtask_info, assignee) for subtask_info, assignee in selected))
+        
+        # Add subtasks to sprint (same sprint as parent) in one call
+        assigned_keys = [subtask_info["key"] for subtask_info, _ in selected if subtask_info.get("assigned_to")]
+        if assigned_keys:
+            await self._run_jira(
+                self.jira_service.add_issues_to_sprint,
+                assigned_keys,
+                sprint_id=request.sprint_id
+            )
+
+
+
+async def process_story_batch(request_ids: List[UUID], concurrency: int):
+    """
+    Run the story pipeline for a batch in three phases
+    
+    1. Generate and estimate every story (bounded concurrency)
+    2. Create all parent tickets with Jira bulk requests
+    3. Break down, create subtasks and assign (bounded concurrency)
+    
+    Phases use the durable, checkpointed stages. One AIService and JiraService
+    are shared by the whole batch; each story gets its own DB session since
+    sessions are not safe to share between interleaved pipelines.
+    """
+    ai_service = get_ai_service()
+    jira_service = JiraService()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def run_stages(request_id: UUID, stages: List[str]) -> bool:
+        async with semaphore:
+            db = SessionLocal()
+            try:
+                story_service = StoryService(db, ai_service=ai_service, jira_service=jira_service)
+                try:
+                    for stage in stages:
+                        if not await story_service.run_pipeline_stage(request_id, stage):
+                            return False
+                    return True
+                except Exception as e:
+                    logger.error(f"Error processing story creation for {request_id}: {e}")
+                    story_service.fail_story_request(request_id, e)
+                    return False
+            finally:
+                db.close()
+    
+    started = time.perf_counter()
+    
+    # Phase 1: generate and estimate
+    prepared = await asyncio.gather(*(
+        run_stages(request_id, ["generate", "estimate"]) for request_id in request_ids
+    ))
+    ready = [request_id for request_id, ok in zip(request_ids, prepared) if ok]
+    
+    # Phase 2: create parent tickets in bulk
+    db = SessionLocal()
+    try:
+        story_service = StoryService(db, ai_service=ai_service, jira_service=jira_service)
+        try:
+            await story_service.create_jira_issues_bulk(ready)
+        except Exception as e:
+            # Stories without a ticket fall back to the per-story create_issue stage
+            logger.error(f"Bulk Jira creation failed, creating tickets one by one: {e}")
+            db.rollback()
+    finally:
+        db.close()
+    
+    # Phase 3: remaining stages (checkpointed stages are skipped)
+    await asyncio.gather(*(run_stages(request_id, PIPELINE_STAGES) for request_id in ready))
+    logger.info(f"Processed batch of {len(request_ids)} stories in {time.perf_counter() - started:.2f}s")
@@ -1,11 +1,15 @@
 """
 Vector database service for RAG (Retrieval Augmented Generation)
-Uses ChromaDB for similarity search
+Uses ChromaDB (or the in-process NumPy index) for similarity search and a
+pluggable embedding backend
 """
 import logging
+import threading
+from contextlib import nullcontext
 from typing import List, Dict, Optional
-import openai
 from app.config import settings
+from app.services.embedding_backends import get_embedding_backend
+from app.services.embedding_cache import get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -18,21 +22,35 @@ except ImportError:
     CHROMADB_AVAILABLE = False
     logger.warning("ChromaDB not installed. RAG features will be disabled.")
 
-# Configure OpenAI for embeddings
-openai.api_key = settings.openai_api_key
-if hasattr(settings, 'openai_api_base') and settings.openai_api_base:
-    openai.base_url = settings.openai_api_base
-
 
 class VectorService:
     """Service for vector embeddings and similarity search"""
     
     def __init__(self):
-        self.embedding_model = settings.openai_embedding_model
+        self.embedding_backend = get_embedding_backend()
+        self.embedding_model = self.embedding_backend.name
         self.client = None
         self.collection = None
         
-        if CHROMADB_AVAILABLE:
+        if settings.vector_store_backend in ("numpy", "memmap"):
+            try:
+                from app.services.numpy_vector_index import NumpyVectorStore
+                self.client = NumpyVectorStore(
+                    settings.vector_store_path,
+                    memory_mapped=settings.vector_store_backend == "memmap"
+                )
+                self.collection = self.client.get_or_create_collection(
+                    name=self.collection_name("jira_stories"),
+                    metadata={"description": "Jira story embeddings for RAG"}
+                )
+                
+                logger.info(f"NumPy vector index initialized successfully ({settings.vector_store_backend})")
+            except Exception as e:
+                logger.error(f"Failed to initialize NumPy vector index: {e}")
+                self.client = None
+                self.collection = None
+        
+        elif CHROMADB_AVAILABLE:
             try:
                 # Initialize ChromaDB client
                 self.client = chromadb.Client(ChromaSettings(
@@ -42,7 +60,7 @@ class VectorService:
                 
                 # Get or create collection
                 self.collection = self.client.get_or_create_collection(
-                    name="jira_stories",
+                    name=self.collection_name("jira_stories"),
                     metadata={"description": "Jira story embeddings for RAG"}
                 )
                 
@@ -51,17 +69,122 @@ class VectorService:
                 logger.error(f"Failed to initialize ChromaDB: {e}")
                 self.client = None
     
+    def collection_name(self, name: str) -> str:
+        """Collection name for the active embedding backend (vector spaces differ per backend)"""
+        suffix = self.embedding_backend.collection_suffix
+        return f"{name}_{suffix}" if suffix else name
+    
+    def get_collection(self, name: str, metadata: Optional[Dict] = None):
+        """Get or create another collection on the shared vector store client"""
+        if not self.client:
+            return None
+        
+        try:
+            return self.client.get_or_create_collection(name=self.collection_name(name), metadata=metadata)
+        except Exception as e:
+            logger.error(f"Failed to open collection {name}: {e}")
+            return None
+    
     def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using OpenAI"""
+        """Generate embedding for text (served from the embedding cache when possible)"""
+        return self.generate_embeddings([text])[0]
+    
+    def generate_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Generate embeddings for many texts with one request per batch
+        
+        Texts already in the embedding cache are not sent to the provider;
+        local backends are computed directly.
+        
+        Returns:
+            One embedding per input text ([] for texts whose batch failed)
+        """
+        cache = get_embedding_cache() if self.embedding_backend.remote else None
+        if not cache:
+            return self.embedding_backend.embed(texts, batch_size)
+        
+        embeddings = cache.get_many(self.embedding_model, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            generated = self.embedding_backend.embed([texts[i] for i in missing], batch_size)
+            cache.put_many(self.embedding_model, [texts[i] for i in missing], generated)
+            for i, embedding in zip(missing, generated):
+                embeddings[i] = embedding
+        return embeddings
+    
+    @staticmethod
+    def _story_record(
+        issue_key: str,
+        title: str,
+        description: str,
+        estimated_points: int,
+        actual_points: Optional[int] = None,
+        completion_time_days: Optional[float] = None
+    ) -> Dict:
+        """Document text and metadata stored for a story"""
+        return {
+            "id": issue_key,
+            "document": f"{title}\n\n{description}",
+            "metadata": {
+                "title": title,
+                "estimated_points": estimated_points,
+                "actual_points": actual_points or estimated_points,
+                "completion_time_days": completion_time_days or 0
+            }
+        }
+    
+    def add_stories_bulk(
+        self,
+        stories: List[Dict],
+        embedding_batch_size: Optional[int] = None,
+        upsert_batch_size: Optional[int] = None
+    ) -> int:
+        """
+        Embed and upsert many stories
+        
+        Args:
+            stories: Dicts with the add_story arguments (issue_key, title, description, ...)
+            embedding_batch_size: Texts per embedding request
+            upsert_batch_size: Stories per collection upsert
+        
+        Returns:
+            Number of stories stored
+        """
+        if not self.collection:
+            logger.warning("Vector store not available, skipping add_stories_bulk")
+            return 0
+        
+        upsert_batch_size = upsert_batch_size or settings.vector_upsert_batch_size
+        records = [self._story_record(**story) for story in stories]
+        embeddings = self.generate_embeddings([record["document"] for record in records], embedding_batch_size)
+        
+        embedded = [(record, embedding) for record, embedding in zip(records, embeddings) if embedding]
+        if len(embedded) < len(records):
+            logger.error(f"Failed to generate embeddings for {len(records) - len(embedded)} stories")
+        
+        stored = 0
+        # The NumPy indexes rewrite the collection per write; batch() persists all chunks once
+        batch = getattr(self.collection, "batch", None)
         try:
-            response = openai.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
-            return response.data[0].embedding
+            with batch() if batch else nullcontext():
+                for start in range(0, len(embedded), upsert_batch_size):
+                    chunk = embedded[start:start + upsert_batch_size]
+                    try:
+                        self.collection.upsert(
+                            ids=[record["id"] for record, _ in chunk],
+                            embeddings=[embedding for _, embedding in chunk],
+                            documents=[record["document"] for record, _ in chunk],
+                            metadatas=[record["metadata"] for record, _ in chunk]
+                        )
+                        stored += len(chunk)
+                    except Exception as e:
+                        logger.error(f"Error upserting {len(chunk)} stories to vector DB: {e}")
         except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
-            return []
+            logger.error(f"Error saving {stored} stories to vector DB: {e}")
+            stored = 0
+        
+        logger.info(f"Added {stored} of {len(stories)} stories to vector DB")
+        return stored
     
     def add_story(
         self,
@@ -74,7 +197,7 @@ class VectorService:
     ):
         """Add story to vector database"""
         if not self.collection:
-            logger.warning("ChromaDB not available, skipping add_story")
+            logger.warning("Vector store not available, skipping add_story")
             return
         
         try:
@@ -114,7 +237,7 @@ class VectorService:
     ) -> List[Dict]:
         """Find similar stories using vector similarity search"""
         if not self.collection:
-            logger.warning("ChromaDB not available, returning empty results")
+            logger.warning("Vector store not available, returning empty results")
             return []
         
         try:
@@ -175,3 +298,18 @@ class VectorService:
         except Exception as e:
             logger.error(f"Error getting collection stats: {e}")
             return {"status": "error", "count": 0}
+
+
+_shared_vector_service: Optional[VectorService] = None
+_shared_vector_service_lock = threading.Lock()
+
+
+def get_vector_service() -> VectorService:
+    """Return the process-wide VectorService, opening ChromaDB on first use."""
+    global _shared_vector_service
+    
+    if _shared_vector_service is None:
+        with _shared_vector_service_lock:
+            if _shared_vector_service is None:
+                _shared_vector_service = VectorService()
+    return _shared_vector_service
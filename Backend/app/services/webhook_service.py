@@ -0,0 +1,457 @@
+"""
+Jira webhook processing
+-----------------------
+Learning (estimation feedback, reassignments) and open-issue ledger updates
+for Jira issue webhooks. Every event is appended to the webhook_events log.
+Inline mode applies it within the request; queued mode only stores it and
+process_pending applies stored events in micro-batches, dropping Jira retries
+and coalescing bursts of updates to the same issue into one ledger change.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.capacity_sync_service import CapacitySyncService
+
+logger = logging.getLogger(__name__)
+
+# Events that can change the open sprint issue ledger
+CAPACITY_EVENTS = {"jira:issue_created", "jira:issue_updated", "jira:issue_deleted"}
+
+# Events carrying human changes the assistant learns from
+LEARNING_EVENTS = {"jira:issue_updated"}
+
+
+def payload_changelog_id(payload: Dict) -> Optional[str]:
+    """Jira changelog id of an update event (shared by retries of the same change)"""
+    changelog_id = (payload.get("changelog") or {}).get("id")
+    return str(changelog_id) if changelog_id is not None else None
+
+
+def dedupe_key(event: models.WebhookEvent) -> Tuple:
+    """Identity of a webhook delivery; Jira retries map to the same key"""
+    if event.changelog_id:
+        return (event.issue_key, event.changelog_id)
+    return (event.issue_key, event.webhook_event, (event.payload or {}).get("timestamp"))
+
+
+class WebhookService:
+    """Store and apply Jira issue webhooks"""
+    
+    def __init__(self, db: Session, capacity_service: Optional[CapacitySyncService] = None):
+        self.db = db
+        self._capacity_service = capacity_service
+        self.replay_cursor: Optional[Tuple[str, int]] = None  # Last committed (issue key, event id) of a replay
+    
+    @property
+    def capacity_service(self) -> CapacitySyncService:
+        # Created on first use: connecting to Jira is not needed to store events
+        if self._capacity_service is None:
+            self._capacity_service = CapacitySyncService(self.db)
+        return self._capacity_service
+    
+    def record_event(self, payload: Dict) -> models.WebhookEvent:
+        """Append a raw payload to the event log (flushed, not committed)"""
+        event = models.WebhookEvent(
+            webhook_event=payload.get("webhookEvent") or "unknown",
+            issue_key=(payload.get("issue") or {}).get("key"),
+            changelog_id=payload_changelog_id(payload),
+            payload=payload
+        )
+        self.db.add(event)
+        self.db.flush()
+        return event
+    
+    def process_event(self, payload: Dict) -> models.WebhookEvent:
+        """Record and apply a single event in one transaction (inline mode)"""
+        event = self.record_event(payload)
+        
+        # Ledger failures (e.g. Jira unreachable) are left to the polling sync
+        # and must not lose the learning changes
+        try:
+            with self.db.begin_nested():
+                affected = self._apply_capacity(event.webhook_event, payload.get("issue") or {}, payload.get("changelog"))
+                if affected:
+                    self.capacity_service.recompute_members(affected)
+        except Exception as e:
+            logger.error(f"Error updating capacity from webhook: {e}")
+            event.error = str(e)
+        
+        if event.webhook_event in LEARNING_EVENTS:
+            self.apply_learning(payload, event_id=event.id)
+        
+        event.processed_at = datetime.utcnow()
+        self.db.commit()
+        return event
+    
+    def process_pending(self, batch_size: int = 500) -> Dict:
+        """
+        Apply the oldest queued events in one transaction
+        
+        Retries are dropped by (issue key, changelog id), every distinct change
+        is applied for learning, and each issue's ledger row is updated once
+        from its latest event.
+        
+        Returns:
+            Batch statistics (events, duplicates, issues, members_updated)
+        """
+        events = self.db.query(models.WebhookEvent).filter(
+            models.WebhookEvent.processed_at.is_(None)
+        ).order_by(models.WebhookEvent.id).limit(batch_size).with_for_update(skip_locked=True).all()
+        
+        if not events:
+            return {"events": 0, "duplicates": 0, "issues": 0, "members_updated": 0}
+        
+        unique = self._dedupe(events)
+        try:
+            stats = self._apply_batch(unique)
+            processed_at = datetime.utcnow()
+            for event in events:
+                event.processed_at = processed_at
+            self.db.commit()
+        except Exception as e:
+            # One bad event must not block the queue: retry the batch event by event
+            self.db.rollback()
+            logger.error(f"Webhook batch of {len(events)} events failed, applying individually: {e}")
+            stats = self._apply_individually([event.id for event in events], {event.id for event in unique})
+        
+        stats.update({"events": len(events), "duplicates": len(events) - len(unique)})
+        logger.info(
+            f"Processed {stats['events']} webhook events ({stats['duplicates']} duplicates, "
+            f"{stats['issues']} issues, {stats['members_updated']} members updated)"
+        )
+        return stats
+    
+    def _dedupe(self, events: List[models.WebhookEvent]) -> List[models.WebhookEvent]:
+        """Drop retries within the batch and of changes already processed"""
+        changes = {(event.issue_key, event.changelog_id) for event in events if event.changelog_id}
+        seen = set()
+        if changes:
+            # Plain IN lists on both columns use ix_webhook_events_issue_key_changelog_id
+            # on every backend; the log has no retention, so this must not scan it
+            seen = {
+                (issue_key, changelog_id)
+                for issue_key, changelog_id in self.db.query(
+                    models.WebhookEvent.issue_key, models.WebhookEvent.changelog_id
+                ).filter(
+                    models.WebhookEvent.issue_key.in_({issue_key for issue_key, _ in changes}),
+                    models.WebhookEvent.changelog_id.in_({changelog_id for _, changelog_id in changes}),
+                    models.WebhookEvent.processed_at.isnot(None)
+                )
+            } & changes
+        
+        unique = []
+        for event in events:
+            key = dedupe_key(event)
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(event)
+        return unique
+    
+    def _apply_batch(self, events: List[models.WebhookEvent]) -> Dict:
+        """Apply deduplicated events in order, coalescing ledger changes per issue"""
+        latest: Dict[str, models.WebhookEvent] = {}
+        changed: Set[str] = set()
+        
+        for event in events:
+            payload = event.payload or {}
+            if event.webhook_event in LEARNING_EVENTS:
+                self.apply_learning(payload, event_id=event.id)
+            if event.webhook_event in CAPACITY_EVENTS and event.issue_key:
+                latest[event.issue_key] = event
+                changelog = payload.get("changelog")
+                if event.webhook_event != "jira:issue_updated" or not changelog or CapacitySyncService.touches_workload(changelog):
+                    changed.add(event.issue_key)
+        
+        # The latest payload holds the issue's current state, so earlier changes
+        # are covered even when the latest event itself touched no workload field
+        affected: Set[str] = set()
+        for issue_key in changed:
+            event = latest[issue_key]
+            affected |= self._apply_capacity(event.webhook_event, event.payload.get("issue") or {})
+        
+        members_updated = self.capacity_service.recompute_members(affected) if affected else 0
+        return {"issues": len(changed), "members_updated": members_updated}
+    
+    def _apply_individually(self, event_ids: List[int], unique_ids: Set[int]) -> Dict:
+        """Fallback for a failed batch: one transaction per event, recording failures"""
+        stats = {"issues": 0, "members_updated": 0}
+        for event_id in event_ids:
+            event = self.db.get(models.WebhookEvent, event_id)
+            try:
+                if event_id in unique_ids:
+                    result = self._apply_batch([event])
+                    stats["issues"] += result["issues"]
+                    stats["members_updated"] += result["members_updated"]
+                event.processed_at = datetime.utcnow()
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Error applying webhook event {event_id}: {e}")
+                event = self.db.get(models.WebhookEvent, event_id)
+                event.processed_at = datetime.utcnow()
+                event.error = str(e)
+                self.db.commit()
+        return stats
+    
+    def _apply_capacity(self, webhook_event: str, issue: Dict, changelog: Optional[Dict] = None) -> Set[str]:
+        if webhook_event not in CAPACITY_EVENTS:
+            return set()
+        return self.capacity_service.apply_issue_change(webhook_event, issue, changelog)
+    
+    # =========================================================================
+    # LEARNING
+    # =========================================================================
+    
+    def apply_learning(
+        self,
+        payload: Dict,
+        story_requests: Optional[Dict[str, models.StoryRequest]] = None,
+        assignments: Optional[Dict[str, models.AssignmentHistory]] = None,
+        event_id: Optional[int] = None
+    ) -> int:
+        """
+        Capture human estimation changes and reassignments (not committed)
+        
+        Args:
+            payload: Webhook payload
+            story_requests: Preloaded story requests by issue key (replay)
+            assignments: Preloaded first assignment record by issue key (replay)
+            event_id: Stored WebhookEvent the payload came from, recorded on
+                what it produces so a replay can reset exactly that
+        
+        Returns:
+            Number of changes captured
+        """
+        issue_key = (payload.get("issue") or {}).get("key")
+        changelog = payload.get("changelog") or {}
+        captured = 0
+        
+        for item in changelog.get("items", []):
+            field = item.get("field")
+            
+            # Story points changed
+            if field == "Story Points":
+                from_value = item.get("fromString")
+                to_value = item.get("toString")
+                
+                if story_requests is not None:
+                    story_request = story_requests.get(issue_key)
+                else:
+                    story_request = self.db.query(models.StoryRequest).filter(
+                        models.StoryRequest.jira_issue_key == issue_key
+                    ).first()
+                
+                if story_request:
+                    feedback = models.FeedbackEstimation(
+                        issue_key=issue_key,
+                        ai_estimated_points=story_request.estimated_points,
+                        human_estimated_points=int(to_value) if to_value else None,
+                        estimation_error=abs(story_request.estimated_points - int(to_value)) if to_value else 0,
+                        was_accepted=False,
+                        webhook_event_id=event_id
+                    )
+                    self.db.add(feedback)
+                    captured += 1
+                    logger.info(f"Captured estimation change for {issue_key}: {from_value} -> {to_value}")
+            
+            # Assignee changed
+            elif field == "assignee":
+                from_user = item.get("from")
+                to_user = item.get("to")
+                
+                if assignments is not None:
+                    assignment = assignments.get(issue_key)
+                else:
+                    assignment = self.db.query(models.AssignmentHistory).filter(
+                        models.AssignmentHistory.issue_key == issue_key
+                    ).first()
+                
+                # A replayed older event must not overwrite a newer reassignment
+                newer_recorded = (
+                    assignment is not None and event_id is not None
+                    and (assignment.reassignment_event_id or 0) > event_id
+                )
+                if assignment and from_user != to_user and not newer_recorded:
+                    assignment.was_reassigned = True
+                    assignment.reassignment_reason = f"Manually reassigned from {from_user} to {to_user}"
+                    assignment.reassignment_event_id = event_id
+                    captured += 1
+                    logger.info(f"Captured reassignment for {issue_key}: {from_user} -> {to_user}")
+        
+        return captured
+    
+    # =========================================================================
+    # REPLAY
+    # =========================================================================
+    
+    def replay(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        event_types: Optional[Iterable[str]] = None,
+        chunk_size: int = 2000,
+        progress: Optional[Callable[[Dict], None]] = None,
+        resume_after: Optional[Tuple[str, int]] = None
+    ) -> Dict:
+        """
+        Rebuild learning and workload state from the stored event log
+        
+        Events are read in (issue key, id) order with keyset pagination, so
+        each issue's events are contiguous: the feedback records and
+        reassignment flags produced by the replayed events are reset, the
+        events are reapplied in order with retries dropped, and the issue's
+        ledger row is set from its latest event. Learning from events outside
+        the filter, or recorded before the event log existed, is untouched.
+        The ledger is only rebuilt by replays that run to the end of the log
+        over every issue event type; a snapshot older than the ledger row
+        never overwrites or removes it.
+        
+        Work is committed per chunk and replay_cursor tracks the last
+        committed (issue key, event id); pass it as resume_after to continue
+        an interrupted replay. Resetting by event id makes re-running a chunk
+        harmless.
+        
+        Args:
+            since: Only events received at or after this time
+            until: Only events received before this time
+            event_types: Webhook events to replay (default: all issue events)
+            chunk_size: Events read and committed per chunk
+            progress: Called with the running statistics after each chunk
+            resume_after: Continue after this (issue key, event id) cursor
+        
+        Returns:
+            Replay statistics, including events_per_second and cursor
+        """
+        event_types = set(event_types or CAPACITY_EVENTS)
+        rebuild_learning = bool(event_types & LEARNING_EVENTS)
+        # The ledger is set from each issue's latest replayed event, which is only
+        # its current state when no later events or event types are left out
+        rebuild_capacity = until is None and CAPACITY_EVENTS <= event_types
+        if not rebuild_capacity and event_types & CAPACITY_EVENTS:
+            logger.info("Replay bounded by 'until' or event type: leaving the open issue ledger unchanged")
+        
+        Event = models.WebhookEvent
+        query = self.db.query(
+            Event.id, Event.issue_key, Event.webhook_event, Event.changelog_id, Event.payload
+        ).filter(
+            Event.issue_key.isnot(None),
+            Event.webhook_event.in_(event_types)
+        )
+        if since:
+            query = query.filter(Event.received_at >= since)
+        if until:
+            query = query.filter(Event.received_at < until)
+        
+        stats = {"events": 0, "duplicates": 0, "issues": 0, "changes_captured": 0, "members_updated": 0}
+        started = time.perf_counter()
+        pending: List = []  # Events of the issue that may continue in the next chunk
+        last = tuple(resume_after) if resume_after else None
+        self.replay_cursor = last
+        
+        while True:
+            chunk_query = query
+            if last:
+                chunk_query = chunk_query.filter(tuple_(Event.issue_key, Event.id) > tuple_(*last))
+            rows = chunk_query.order_by(Event.issue_key, Event.id).limit(chunk_size).all()
+            if not rows:
+                break
+            last = (rows[-1].issue_key, rows[-1].id)
+            stats["events"] += len(rows)
+            
+            rows = pending + rows
+            # Issues whose events all arrived; the last one may continue in the next chunk
+            complete = [row for row in rows if row.issue_key != last[0]]
+            pending = [row for row in rows if row.issue_key == last[0]]
+            
+            self._replay_rows(complete, rebuild_learning, rebuild_capacity, stats)
+            self.db.commit()
+            if complete:
+                self.replay_cursor = (complete[-1].issue_key, complete[-1].id)
+            
+            if progress:
+                progress(self._throughput(stats, started))
+        
+        self._replay_rows(pending, rebuild_learning, rebuild_capacity, stats)
+        if rebuild_capacity:
+            # Recompute everyone from the ledger, not only members touched by the log
+            stats["members_updated"] = self.capacity_service.recompute_members()
+        self.db.commit()
+        if pending:
+            self.replay_cursor = (pending[-1].issue_key, pending[-1].id)
+        
+        stats = self._throughput(stats, started)
+        stats["cursor"] = list(self.replay_cursor) if self.replay_cursor else None
+        logger.info(
+            f"Replayed {stats['events']} webhook events for {stats['issues']} issues in "
+            f"{stats['seconds']}s ({stats['events_per_second']} events/s)"
+        )
+        return stats
+    
+    @staticmethod
+    def _throughput(stats: Dict, started: float) -> Dict:
+        elapsed = time.perf_counter() - started
+        return {
+            **stats,
+            "seconds": round(elapsed, 2),
+            "events_per_second": round(stats["events"] / elapsed, 1) if elapsed > 0 else 0.0
+        }
+    
+    def _replay_rows(self, rows: List, rebuild_learning: bool, rebuild_capacity: bool, stats: Dict) -> None:
+        """Reset and reapply complete per-issue event groups (rows sorted by issue key)"""
+        if not rows:
+            return
+        
+        issue_keys = list(dict.fromkeys(row.issue_key for row in rows))
+        stats["issues"] += len(issue_keys)
+        
+        story_requests: Dict[str, models.StoryRequest] = {}
+        assignments: Dict[str, models.AssignmentHistory] = {}
+        if rebuild_learning:
+            # Only undo what these events produced
+            event_ids = [row.id for row in rows if row.webhook_event in LEARNING_EVENTS]
+            self.db.query(models.FeedbackEstimation).filter(
+                models.FeedbackEstimation.webhook_event_id.in_(event_ids)
+            ).delete(synchronize_session=False)
+            self.db.query(models.AssignmentHistory).filter(
+                models.AssignmentHistory.reassignment_event_id.in_(event_ids)
+            ).update(
+                {"was_reassigned": False, "reassignment_reason": None, "reassignment_event_id": None},
+                synchronize_session=False
+            )
+            
+            story_requests = {
+                story_request.jira_issue_key: story_request
+                for story_request in self.db.query(models.StoryRequest).filter(
+                    models.StoryRequest.jira_issue_key.in_(issue_keys)
+                )
+            }
+            for assignment in self.db.query(models.AssignmentHistory).filter(
+                models.AssignmentHistory.issue_key.in_(issue_keys)
+            ).order_by(models.AssignmentHistory.id).populate_existing():
+                assignments.setdefault(assignment.issue_key, assignment)
+        
+        seen = set()
+        latest: Dict[str, Tuple[str, Dict]] = {}
+        for row in rows:
+            payload = row.payload or {}
+            key = (row.issue_key, row.changelog_id or (row.webhook_event, payload.get("timestamp")))
+            if key in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(key)
+            
+            if rebuild_learning and row.webhook_event in LEARNING_EVENTS:
+                stats["changes_captured"] += self.apply_learning(payload, story_requests, assignments, event_id=row.id)
+            latest[row.issue_key] = (row.webhook_event, payload.get("issue") or {})
+        
+        # Members are recomputed once at the end of the replay
+        if rebuild_capacity:
+            for webhook_event, issue in latest.values():
+                self._apply_capacity(webhook_event, issue)
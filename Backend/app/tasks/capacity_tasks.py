@@ -8,6 +8,7 @@ import logging
 
 from app.database import SessionLocal
 from app.services.jira_service import JiraService
+from app.services.capacity_sync_service import CapacitySyncService
 from app import models
 
 logger = logging.getLogger(__name__)
@@ -17,50 +18,24 @@ logger = logging.getLogger(__name__)
 def sync_team_capacity():
     """
     Sync team capacity from Jira
-    Runs every 15 minutes via Celery Beat
+    Runs every 15 minutes via Celery Beat; only issues changed since the
+    previous sync are fetched, with a periodic full reconciliation
     """
     db = SessionLocal()
     try:
         logger.info("Starting automatic capacity sync from Jira")
         
-        jira_service = JiraService()
-        sprint_info = jira_service.get_active_sprint()
+        # Incremental (issues updated since the last sync) with periodic full reconciliation
+        result = CapacitySyncService(db).sync()
+        sprint_info = result["sprint_info"]
         
-        members = db.query(models.TeamMember).all()
-        synced_count = 0
-        
-        for member in members:
-            try:
-                # Get current workload
-                sprint_id = sprint_info.get("id") if sprint_info else None
-                workload = jira_service.get_user_workload(member.username, sprint_id)
-                
-                # Update workload
-                member.current_story_points = workload["story_points"]
-                member.current_ticket_count = workload["ticket_count"]
-                
-                # Recalculate status
-                if member.max_story_points > 0:
-                    utilization = (member.current_story_points / member.max_story_points) * 100
-                    if utilization >= 100:
-                        member.availability_status = "overloaded"
-                    elif utilization >= 75:
-                        member.availability_status = "busy"
-                    else:
-                        member.availability_status = "available"
-                
-                synced_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error syncing capacity for {member.username}: {e}")
-                continue
-        
-        db.commit()
-        logger.info(f"Capacity sync completed: {synced_count} members updated")
+        logger.info(f"Capacity sync completed ({result['mode']}): {result['members_updated']} members updated")
         
         return {
             "status": "success",
-            "synced_count": synced_count,
+            "mode": result["mode"],
+            "issues_fetched": result["issues_fetched"],
+            "synced_count": result["members_updated"],
             "sprint": sprint_info.get("name") if sprint_info else None
         }
         
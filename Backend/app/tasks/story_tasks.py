@@ -0,0 +1,108 @@
+"""
+Celery tasks for the durable story creation pipeline
+Each stage is its own task, chained generate -> estimate -> create issue ->
+breakdown -> create subtasks -> assign. Stages checkpoint their output on the
+StoryRequest, so retried tasks and re-enqueued chains resume from the last
+completed stage.
+"""
+from celery import shared_task, chain
+from celery.exceptions import Ignore
+from uuid import UUID
+import logging
+
+from app.database import SessionLocal
+from app.services.model_registry import run_async
+from app.services.story_service import StoryService, PIPELINE_STAGES
+
+logger = logging.getLogger(__name__)
+
+STAGE_TASK_OPTIONS = {
+    "bind": True,
+    "acks_late": True,  # Redeliver if the worker dies mid-stage
+    "reject_on_worker_lost": True,
+    "max_retries": 3,
+}
+
+
+def _run_stage(task, request_id: str, stage: str):
+    """Run one checkpointed stage, retrying with backoff and failing the request when exhausted"""
+    db = SessionLocal()
+    try:
+        story_service = StoryService(db)
+        try:
+            proceed = run_async(story_service.run_pipeline_stage(UUID(request_id), stage))
+        except Exception as e:
+            if task.request.retries >= task.max_retries:
+                logger.error(f"Story pipeline stage {stage} failed for {request_id}, giving up: {e}")
+                story_service.fail_story_request(UUID(request_id), e)
+                raise
+            logger.warning(f"Story pipeline stage {stage} failed for {request_id}, retrying: {e}")
+            db.rollback()
+            raise task.retry(exc=e, countdown=10 * 2 ** task.request.retries)
+    finally:
+        db.close()
+    
+    if not proceed:
+        # Request missing or already finished: stop the rest of the chain
+        raise Ignore()
+    return {"request_id": request_id, "stage": stage}
+
+
+@shared_task(name='app.tasks.story_tasks.generate_story', **STAGE_TASK_OPTIONS)
+def generate_story(self, request_id: str):
+    """Generate story details (or the fused story bundle)"""
+    return _run_stage(self, request_id, "generate")
+
+
+@shared_task(name='app.tasks.story_tasks.estimate_story', **STAGE_TASK_OPTIONS)
+def estimate_story(self, request_id: str):
+    """Estimate story points"""
+    return _run_stage(self, request_id, "estimate")
+
+
+@shared_task(name='app.tasks.story_tasks.create_issue', **STAGE_TASK_OPTIONS)
+def create_issue(self, request_id: str):
+    """Create the parent ticket in Jira"""
+    return _run_stage(self, request_id, "create_issue")
+
+
+@shared_task(name='app.tasks.story_tasks.breakdown_story', **STAGE_TASK_OPTIONS)
+def breakdown_story(self, request_id: str):
+    """Break the story down into subtasks"""
+    return _run_stage(self, request_id, "breakdown")
+
+
+@shared_task(name='app.tasks.story_tasks.create_subtasks', **STAGE_TASK_OPTIONS)
+def create_subtasks(self, request_id: str):
+    """Create the generated subtasks in Jira"""
+    return _run_stage(self, request_id, "create_subtasks")
+
+
+@shared_task(name='app.tasks.story_tasks.assign_story', **STAGE_TASK_OPTIONS)
+def assign_story(self, request_id: str):
+    """Assign the story and its subtasks, then mark the request completed"""
+    return _run_stage(self, request_id, "assign")
+
+
+STAGE_TASKS = {
+    "generate": generate_story,
+    "estimate": estimate_story,
+    "create_issue": create_issue,
+    "breakdown": breakdown_story,
+    "create_subtasks": create_subtasks,
+    "assign": assign_story,
+}
+
+
+def enqueue_story_pipeline(request_id) -> str:
+    """
+    Enqueue the pipeline chain for a story request
+    Stages already checkpointed are skipped, so this also resumes a request.
+    
+    Returns:
+        Celery id of the chain
+    """
+    signatures = [STAGE_TASKS[stage].si(str(request_id)) for stage in PIPELINE_STAGES]
+    result = chain(*signatures).apply_async()
+    logger.info(f"Enqueued story pipeline for {request_id}")
+    return result.id
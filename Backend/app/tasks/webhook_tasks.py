@@ -0,0 +1,101 @@
+"""
+Celery tasks for queued and replayed Jira webhook events
+"""
+from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from datetime import datetime
+import logging
+
+from app.database import SessionLocal
+from app.config import settings
+from app.services.webhook_service import WebhookService
+
+logger = logging.getLogger(__name__)
+
+# Replays of a large log outlive the global 30 minute task limit; each run
+# stops at the soft limit and continues from its cursor in a new task
+REPLAY_SOFT_TIME_LIMIT = 6 * 60 * 60  # 6 hours
+REPLAY_TIME_LIMIT = REPLAY_SOFT_TIME_LIMIT + 10 * 60
+
+
+@shared_task(name='app.tasks.webhook_tasks.process_webhook_events')
+def process_webhook_events(max_batches: int = 20):
+    """
+    Apply queued webhook events in micro-batches
+    Runs every WEBHOOK_BATCH_INTERVAL seconds via Celery Beat; drains up to
+    max_batches batches of WEBHOOK_BATCH_SIZE events per run
+    """
+    db = SessionLocal()
+    try:
+        service = WebhookService(db)
+        totals = {"events": 0, "duplicates": 0, "issues": 0, "members_updated": 0}
+        
+        for _ in range(max_batches):
+            stats = service.process_pending(settings.webhook_batch_size)
+            for key in totals:
+                totals[key] += stats[key]
+            if stats["events"] < settings.webhook_batch_size:
+                break
+        
+        return {"status": "success", **totals}
+    
+    except Exception as e:
+        logger.error(f"Error processing webhook events: {e}")
+        db.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+
+@shared_task(
+    bind=True,
+    name='app.tasks.webhook_tasks.replay_webhook_events',
+    time_limit=REPLAY_TIME_LIMIT,
+    soft_time_limit=REPLAY_SOFT_TIME_LIMIT
+)
+def replay_webhook_events(
+    self,
+    since: str = None,
+    until: str = None,
+    event_types: list = None,
+    chunk_size: int = 2000,
+    resume_after: list = None
+):
+    """
+    Rebuild learning and workload state from the stored webhook event log
+    Triggered manually; since/until are ISO timestamps (UTC). On the soft time
+    limit the uncommitted chunk is rolled back and the replay continues in a
+    new task after resume_after, the last committed [issue_key, event_id]
+    """
+    db = SessionLocal()
+    service = WebhookService(db)
+    try:
+        stats = service.replay(
+            since=datetime.fromisoformat(since) if since else None,
+            until=datetime.fromisoformat(until) if until else None,
+            event_types=event_types,
+            chunk_size=chunk_size,
+            resume_after=resume_after
+        )
+        return {"status": "success", **stats}
+    
+    except SoftTimeLimitExceeded:
+        db.rollback()
+        cursor = list(service.replay_cursor) if service.replay_cursor else resume_after
+        logger.warning(f"Webhook replay hit its time limit; continuing after {cursor}")
+        self.apply_async(kwargs={
+            "since": since,
+            "until": until,
+            "event_types": event_types,
+            "chunk_size": chunk_size,
+            "resume_after": cursor
+        })
+        return {"status": "continued", "cursor": cursor}
+    
+    except Exception as e:
+        logger.error(f"Error replaying webhook events: {e}")
+        db.rollback()
+        cursor = list(service.replay_cursor) if service.replay_cursor else resume_after
+        return {"status": "error", "message": str(e), "cursor": cursor}
+    finally:
+        db.close()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: CrewAI crew construction overhead
+Compares building a fresh Agent + Task + Crew per request (the previous
+behaviour) with binding inputs to a crew template that reuses cached agents.
+No LLM calls are made; only object construction is timed.
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.agents.crew_manager import (
+    AGENT_SPECS,
+    CREW_TEMPLATES,
+    CREWAI_AVAILABLE,
+    JiraAICrew,
+)
+
+ITERATIONS = 200
+
+SIMILAR_STORIES = [
+    {"title": "Add OAuth login with GitHub", "estimated_points": 5},
+    {"title": "Password reset via email", "estimated_points": 3},
+]
+
+
+def build_legacy_estimation_crew(crew_manager: JiraAICrew, title: str, description: str):
+    """Previous path: new Agent, Task and Crew on every call."""
+    from crewai import Agent, Task, Crew, Process
+    
+    agent = Agent(
+        **AGENT_SPECS["estimator"],
+        llm=crew_manager.llm,
+        verbose=True,
+        allow_delegation=False
+    )
+    inputs = crew_manager._estimation_inputs(title, description, SIMILAR_STORIES)
+    task = Task(
+        description=CREW_TEMPLATES["estimation"]["description"].format(**inputs),
+        agent=agent,
+        expected_output=CREW_TEMPLATES["estimation"]["expected_output"]
+    )
+    return Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=True)
+
+
+def time_per_call(build, iterations: int = ITERATIONS) -> float:
+    """Average milliseconds per call."""
+    build(0)  # Warm up imports and the agent cache
+    start = time.perf_counter()
+    for i in range(iterations):
+        build(i)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def run_benchmark():
+    if not CREWAI_AVAILABLE:
+        print("❌ CrewAI not installed. Install with: pip install crewai")
+        return
+    
+    crew_manager = JiraAICrew({
+        "api_key": "benchmark-key",
+        "model_name": "gpt-4o-mini",
+        "temperature": 0.5,
+        "provider": "openai"
+    })
+    
+    legacy_ms = time_per_call(
+        lambda i: build_legacy_estimation_crew(crew_manager, f"Story {i}", "Add Google login")
+    )
+    template_ms = time_per_call(
+        lambda i: crew_manager._build_crew(
+            "estimation",
+            **crew_manager._estimation_inputs(f"Story {i}", "Add Google login", SIMILAR_STORIES)
+        )
+    )
+    
+    print(f"\n{'='*60}")
+    print(f"Crew construction ({ITERATIONS} iterations)")
+    print(f"{'='*60}")
+    print(f"Legacy (new agent per call):  {legacy_ms:8.3f} ms/crew")
+    print(f"Template (cached agents):     {template_ms:8.3f} ms/crew")
+    if template_ms > 0:
+        print(f"Speedup:                      {legacy_ms / template_ms:8.2f}x")
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Jira AI Assistant - Crew Construction Benchmark")
+    print("="*60)
+    run_benchmark()
@@ -5,6 +5,8 @@ from celery import Celery
 from celery.schedules import crontab
 import os
 
+from app.config import settings
+
 # Get Redis URL from environment
 REDIS_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 
@@ -16,7 +18,9 @@ celery_app = Celery(
     include=[
         "app.tasks.capacity_tasks",
         "app.tasks.assignment_tasks",
-        "app.tasks.learning_tasks"
+        "app.tasks.learning_tasks",
+        "app.tasks.story_tasks",
+        "app.tasks.webhook_tasks"
     ]
 )
 
@@ -38,7 +42,7 @@ celery_app.conf.update(
 celery_app.conf.beat_schedule = {
     # Sync capacity every 15 minutes
     "sync-capacity-every-15-min": {
-        "task": "app.tasks.capacity_tasks.sync_capacity",
+        "task": "app.tasks.capacity_tasks.sync_team_capacity",
         "schedule": crontab(minute="*/15"),
     },
     # Process assignment queue every hour
@@ -53,5 +57,12 @@ celery_app.conf.beat_schedule = {
     },
 }
 
+# Apply queued Jira webhook events (only needed when webhooks are queued)
+if settings.webhook_ingest_mode == "queued":
+    celery_app.conf.beat_schedule["process-webhook-events"] = {
+        "task": "app.tasks.webhook_tasks.process_webhook_events",
+        "schedule": float(settings.webhook_batch_interval),
+    }
+
 if __name__ == "__main__":
     celery_app.start()
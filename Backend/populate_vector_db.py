@@ -4,6 +4,7 @@ Run this to enable RAG for better estimation
 """
 import sys
 import os
+from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.services.vector_service import VectorService
@@ -21,62 +22,65 @@ def populate_vector_db():
             print("❌ Jira client not initialized. Check your credentials in .env")
             return
         
-        # Get completed stories from last 6 months
+        # Get completed stories from last 6 months (all pages)
         jql = f'project = "{settings.jira_project_key}" AND status = Done AND resolved >= -180d'
         print(f"\nFetching stories with JQL: {jql}")
         
-        issues = jira_service.jira.search_issues(jql, maxResults=200)
-        print(f"Found {len(issues)} completed stories")
+        story_points_fields = jira_service.get_story_points_fields()
+        fields = ["summary", "description", "created", "resolutiondate"] + story_points_fields
         
-        added_count = 0
+        stories = []
         skipped_count = 0
         
-        for issue in issues:
+        for issue in jira_service.search_jql(jql, fields):
             try:
+                issue_fields = issue["fields"]
+                
                 # Get story points
-                story_points = (
-                    getattr(issue.fields, 'customfield_10016', None) or
-                    getattr(issue.fields, 'customfield_10002', None) or
-                    5  # Default
-                )
+                story_points = jira_service.issue_story_points(issue, story_points_fields) or 5  # Default
                 
                 # Get completion time
                 completion_time = None
-                if hasattr(issue.fields, 'created') and hasattr(issue.fields, 'resolutiondate'):
-                    from datetime import datetime
-                    created = datetime.fromisoformat(issue.fields.created.replace('Z', '+00:00'))
-                    resolved = datetime.fromisoformat(issue.fields.resolutiondate.replace('Z', '+00:00'))
+                if issue_fields.get("created") and issue_fields.get("resolutiondate"):
+                    created = datetime.strptime(issue_fields["created"], "%Y-%m-%dT%H:%M:%S.%f%z")
+                    resolved = datetime.strptime(issue_fields["resolutiondate"], "%Y-%m-%dT%H:%M:%S.%f%z")
                     completion_time = (resolved - created).days
                 
-                # Add to vector DB
-                vector_service.add_story(
-                    issue_key=issue.key,
-                    title=issue.fields.summary,
-                    description=issue.fields.description or issue.fields.summary,
-                    estimated_points=int(story_points) if story_points else 5,
-                    actual_points=int(story_points) if story_points else 5,
-                    completion_time_days=completion_time
-                )
-                
-                added_count += 1
-                print(f"✅ Added {issue.key}: {issue.fields.summary[:50]}... ({story_points} pts)")
-                
+                summary = issue_fields.get("summary") or ""
+                stories.append({
+                    "issue_key": issue["key"],
+                    "title": summary,
+                    "description": jira_service.adf_to_text(issue_fields.get("description")) or summary,
+                    "estimated_points": int(story_points),
+                    "actual_points": int(story_points),
+                    "completion_time_days": completion_time
+                })
+            
             except Exception as e:
-                print(f"⚠️  Skipped {issue.key}: {e}")
+                print(f"⚠️  Skipped {issue.get('key')}: {e}")
                 skipped_count += 1
                 continue
         
+        print(f"Found {len(stories)} completed stories")
+        
+        # Embed in batches and upsert in chunks
+        print(f"Embedding and storing {len(stories)} stories...")
+        started = datetime.now()
+        added_count = vector_service.add_stories_bulk(stories)
+        elapsed = (datetime.now() - started).total_seconds()
+        skipped_count += len(stories) - added_count
+        
         # Get collection stats
         stats = vector_service.get_collection_stats()
         
         print(f"\n{'='*60}")
         print(f"✅ Vector DB Population Complete!")
         print(f"{'='*60}")
-        print(f"Added: {added_count} stories")
+        print(f"Added: {added_count} stories in {elapsed:.1f}s")
         print(f"Skipped: {skipped_count} stories")
         print(f"Total in DB: {stats.get('count', 0)} stories")
         print(f"\nRAG is now enabled for better estimation!")
-        
+    
     except Exception as e:
         print(f"❌ Error populating vector DB: {e}")
         raise
@@ -0,0 +1,94 @@
+"""
+Script to replay the stored Jira webhook event log
+Rebuilds estimation feedback, reassignment flags and team workload from the
+webhook_events table, e.g. after fixing a bug in webhook handling
+
+Examples:
+    python replay_webhook_events.py
+    python replay_webhook_events.py --since 2024-01-01 --until 2024-02-01
+    python replay_webhook_events.py --event-type jira:issue_updated
+    python replay_webhook_events.py --resume-after PROJ-123:45678
+"""
+import sys
+import os
+import argparse
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.services.webhook_service import WebhookService, CAPACITY_EVENTS
+
+
+def parse_cursor(value):
+    """Parse a KEY:ID replay cursor"""
+    issue_key, _, event_id = value.rpartition(":")
+    if not issue_key or not event_id.isdigit():
+        raise argparse.ArgumentTypeError("expected ISSUE_KEY:EVENT_ID, e.g. PROJ-123:45678")
+    return issue_key, int(event_id)
+
+
+def replay_webhook_events(since=None, until=None, event_types=None, chunk_size=2000, resume_after=None):
+    """Replay stored webhook events and print throughput"""
+    db = SessionLocal()
+    service = WebhookService(db)
+    try:
+        def report(stats):
+            print(
+                f"  {stats['events']:>10} events  {stats['issues']:>8} issues  "
+                f"{stats['events_per_second']:>10} events/s"
+            )
+        
+        stats = service.replay(
+            since=since,
+            until=until,
+            event_types=event_types,
+            chunk_size=chunk_size,
+            progress=report,
+            resume_after=resume_after
+        )
+        
+        print(f"\n{'='*60}")
+        print(f"✅ Replay Complete!")
+        print(f"{'='*60}")
+        print(f"Events: {stats['events']} ({stats['duplicates']} duplicates skipped)")
+        print(f"Issues: {stats['issues']}")
+        print(f"Learning changes captured: {stats['changes_captured']}")
+        print(f"Members updated: {stats['members_updated']}")
+        print(f"Time: {stats['seconds']}s ({stats['events_per_second']} events/s)")
+        return stats
+    
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error replaying webhook events: {e}")
+        if service.replay_cursor:
+            issue_key, event_id = service.replay_cursor
+            print(f"Resume with: --resume-after {issue_key}:{event_id}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay stored Jira webhook events")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only events received at or after (ISO date/time, UTC)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only events received before (ISO date/time, UTC)")
+    parser.add_argument(
+        "--event-type",
+        action="append",
+        choices=sorted(CAPACITY_EVENTS),
+        dest="event_types",
+        help="Event type to replay (repeatable, default: all)"
+    )
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Events per read/commit chunk")
+    parser.add_argument(
+        "--resume-after",
+        type=parse_cursor,
+        metavar="ISSUE_KEY:EVENT_ID",
+        help="Continue an interrupted replay after this cursor"
+    )
+    args = parser.parse_args()
+    
+    print("="*60)
+    print("Jira AI Assistant - Webhook Event Replay")
+    print("="*60)
+    replay_webhook_events(args.since, args.until, args.event_types, args.chunk_size, args.resume_after)
@@ -0,0 +1,86 @@
+"""
+Shared pytest setup
+Tests import the app from the Backend directory and never reach PostgreSQL,
+Jira or an LLM provider
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.database creates its engine on import; point it at a throwaway SQLite file
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'jira_ai_test.db')}")
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "false")
+os.environ.setdefault("EMBEDDING_BACKEND", "local")
+
+try:
+    from sqlalchemy.dialects.postgresql import UUID
+    from sqlalchemy.ext.compiler import compiles
+    
+    # The models use PostgreSQL UUID columns; store them as 32-char hex on SQLite
+    @compiles(UUID, "sqlite")
+    def compile_uuid_for_sqlite(type_, compiler, **kw):
+        return "CHAR(32)"
+except ImportError:
+    pass
+
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory SQLite database with every table created"""
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    pytest.importorskip("app.models")
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.database import Base
+    
+    engine = sqlalchemy.create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+class FakeCapacityService:
+    """Records ledger changes instead of talking to Jira"""
+    
+    def __init__(self):
+        self.changes = []
+        self.recomputed = []
+    
+    def apply_issue_change(self, webhook_event, issue, changelog=None):
+        assignee = ((issue.get("fields") or {}).get("assignee") or {}).get("accountId")
+        self.changes.append((webhook_event, issue.get("key"), assignee))
+        return {assignee} if assignee else set()
+    
+    def recompute_members(self, usernames=None):
+        self.recomputed.append(set(usernames) if usernames is not None else None)
+        return len(usernames) if usernames is not None else 0
+
+
+@pytest.fixture
+def capacity_service():
+    return FakeCapacityService()
+
+
+@pytest.fixture
+def issue_updated():
+    """Build a jira:issue_updated payload"""
+    def build(issue_key, changelog_id, items, assignee="alice", timestamp=1700000000000):
+        return {
+            "webhookEvent": "jira:issue_updated",
+            "timestamp": timestamp,
+            "issue": {"key": issue_key, "fields": {"assignee": {"accountId": assignee}}},
+            "changelog": {"id": changelog_id, "items": items}
+        }
+    return build
@@ -0,0 +1,224 @@
+"""
+Tests for the open sprint issue ledger kept by CapacitySyncService, run
+against the real service with a stub JiraService
+"""
+import pytest
+
+capacity_sync_service = pytest.importorskip("app.services.capacity_sync_service")
+jira_service = pytest.importorskip("app.services.jira_service")
+models = pytest.importorskip("app.models")
+
+SPRINT_ID = 7
+POINTS_FIELD = "customfield_10016"
+SPRINT_FIELD = "customfield_10020"
+
+
+class StubJiraService:
+    """Just the JiraService surface the ledger uses; never calls Jira"""
+    
+    issue_story_points = staticmethod(jira_service.JiraService.issue_story_points)
+    project_key_from_issue_key = staticmethod(jira_service.JiraService.project_key_from_issue_key)
+    
+    def __init__(self, sprint_field=SPRINT_FIELD):
+        self.jira = object()
+        self.project_key = "PROJ"
+        self.sprint_field = sprint_field
+    
+    def get_story_points_fields(self):
+        return [POINTS_FIELD]
+    
+    def get_sprint_field(self):
+        return self.sprint_field
+
+
+def make_issue(key="PROJ-1", assignee="alice", points=3, status="In Progress",
+               sprints=((SPRINT_ID, "active"),), updated="2024-01-31T10:00:00.000+0000"):
+    return {
+        "key": key,
+        "fields": {
+            "assignee": {"accountId": assignee} if assignee else None,
+            POINTS_FIELD: points,
+            "status": {"name": status, "statusCategory": {"key": "done" if status == "Done" else "indeterminate"}},
+            SPRINT_FIELD: [{"id": sprint_id, "state": state} for sprint_id, state in sprints],
+            "updated": updated,
+        }
+    }
+
+
+@pytest.fixture
+def service(db):
+    db.add(models.JiraSyncState(project_key="PROJ", sprint_id=SPRINT_ID))
+    for username in ("alice", "bob", "carol"):
+        db.add(models.TeamMember(username=username, email=f"{username}@example.com", max_story_points=10))
+    db.commit()
+    return capacity_sync_service.CapacitySyncService(db, jira_service=StubJiraService())
+
+
+def member(db, username):
+    return db.query(models.TeamMember).filter(models.TeamMember.username == username).one()
+
+
+def ledger(db):
+    return {
+        row.issue_key: (row.assignee, row.story_points)
+        for row in db.query(models.OpenSprintIssue).all()
+    }
+
+
+def test_created_issue_is_added_to_the_ledger(db, service):
+    assert service.apply_issue_event("jira:issue_created", make_issue(points=3)) == 1
+    
+    assert ledger(db) == {"PROJ-1": ("alice", 3)}
+    assert member(db, "alice").current_story_points == 3
+    assert member(db, "alice").current_ticket_count == 1
+    assert member(db, "alice").availability_status == "available"
+
+
+def test_points_update_recomputes_the_assignee(db, service):
+    service.apply_issue_event("jira:issue_created", make_issue(points=3))
+    service.apply_issue_event("jira:issue_updated", make_issue(points=8, updated="2024-01-31T11:00:00.000+0000"))
+    
+    assert ledger(db) == {"PROJ-1": ("alice", 8)}
+    assert member(db, "alice").current_story_points == 8
+    assert member(db, "alice").availability_status == "busy"
+
+
+def test_reassignment_recomputes_old_and_new_assignee(db, service):
+    service.apply_issue_event("jira:issue_created", make_issue(assignee="alice"))
+    
+    affected = service.apply_issue_change(
+        "jira:issue_updated",
+        make_issue(assignee="bob", updated="2024-01-31T11:00:00.000+0000")
+    )
+    
+    assert affected == {"alice", "bob"}
+    service.recompute_members(affected)
+    assert member(db, "alice").current_story_points == 0
+    assert member(db, "alice").current_ticket_count == 0
+    assert member(db, "bob").current_story_points == 3
+
+
+def test_update_without_workload_change_affects_nobody(db, service):
+    service.apply_issue_event("jira:issue_created", make_issue())
+    
+    affected = service.apply_issue_change(
+        "jira:issue_updated",
+        make_issue(status="In Review", updated="2024-01-31T11:00:00.000+0000")
+    )
+    
+    assert affected == set()
+
+
+def test_changelog_without_workload_fields_is_skipped(db, service):
+    changelog = {"items": [{"field": "description"}]}
+    
+    assert service.apply_issue_change("jira:issue_updated", make_issue(), changelog) == set()
+    assert ledger(db) == {}
+
+
+@pytest.mark.parametrize("issue", [
+    make_issue(sprints=(), updated="2024-01-31T11:00:00.000+0000"),
+    make_issue(sprints=((SPRINT_ID + 1, "future"),), updated="2024-01-31T11:00:00.000+0000"),
+    make_issue(status="Done", updated="2024-01-31T11:00:00.000+0000"),
+], ids=["moved_out_of_sprint", "moved_to_next_sprint", "closed"])
+def test_issue_leaving_the_sprint_is_removed(db, service, issue):
+    service.apply_issue_event("jira:issue_created", make_issue())
+    
+    service.apply_issue_event("jira:issue_updated", issue)
+    
+    assert ledger(db) == {}
+    assert member(db, "alice").current_story_points == 0
+
+
+def test_deleted_issue_is_removed(db, service):
+    service.apply_issue_event("jira:issue_created", make_issue())
+    
+    service.apply_issue_event("jira:issue_deleted", make_issue(updated=None))
+    
+    assert ledger(db) == {}
+    assert member(db, "alice").current_ticket_count == 0
+
+
+def test_older_snapshot_does_not_overwrite_newer_row(db, service):
+    service.apply_issue_event("jira:issue_updated", make_issue(points=8, updated="2024-01-31T11:00:00.000+0000"))
+    
+    affected = service.apply_issue_change("jira:issue_updated", make_issue(points=3, updated="2024-01-31T10:00:00.000+0000"))
+    
+    assert affected == set()
+    assert ledger(db) == {"PROJ-1": ("alice", 8)}
+
+
+def test_older_removal_keeps_reopened_issue(db, service):
+    # Reopened at 11:00; the "closed at 10:00" event arrives late
+    service.apply_issue_event("jira:issue_updated", make_issue(updated="2024-01-31T11:00:00.000+0000"))
+    
+    service.apply_issue_event("jira:issue_updated", make_issue(status="Done", updated="2024-01-31T10:00:00.000+0000"))
+    
+    assert ledger(db) == {"PROJ-1": ("alice", 3)}
+    assert member(db, "alice").current_story_points == 3
+
+
+def test_open_in_sprint_checks_project_status_and_sprint(db, service):
+    assert service._is_open_in_sprint(make_issue())
+    assert not service._is_open_in_sprint(make_issue(key="OTHER-1"))
+    assert not service._is_open_in_sprint(make_issue(status="Done"))
+    assert not service._is_open_in_sprint(make_issue(sprints=((SPRINT_ID + 1, "active"),)))
+
+
+def test_open_in_sprint_uses_active_sprint_before_first_sync(db, service):
+    db.query(models.JiraSyncState).update({"sprint_id": None})
+    
+    assert service._is_open_in_sprint(make_issue(sprints=((SPRINT_ID + 1, "active"),)))
+    assert not service._is_open_in_sprint(make_issue(sprints=((SPRINT_ID + 1, "closed"),)))
+
+
+def test_open_in_sprint_without_sprint_field_keeps_tracked_issues(db, service):
+    service.apply_issue_event("jira:issue_created", make_issue(key="PROJ-1"))
+    service.jira_service.sprint_field = None
+    
+    assert service._is_open_in_sprint(make_issue(key="PROJ-1", sprints=()))
+    assert not service._is_open_in_sprint(make_issue(key="PROJ-2"))
+
+
+def test_recompute_members_totals_and_availability(db, service):
+    for key, assignee, points in [
+        ("PROJ-1", "alice", 5), ("PROJ-2", "alice", 5), ("PROJ-3", "bob", 2), ("PROJ-4", None, 8)
+    ]:
+        service.upsert_open_issue(service.issue_snapshot(make_issue(key, assignee, points), [POINTS_FIELD]))
+    db.add(models.OpenSprintIssue(issue_key="OTHER-1", project_key="OTHER", assignee="bob", story_points=13))
+    member(db, "carol").current_story_points = 4
+    
+    assert service.recompute_members() == 3
+    
+    assert (member(db, "alice").current_story_points, member(db, "alice").current_ticket_count) == (10, 2)
+    assert member(db, "alice").availability_status == "overloaded"
+    assert (member(db, "bob").current_story_points, member(db, "bob").current_ticket_count) == (2, 1)
+    assert (member(db, "carol").current_story_points, member(db, "carol").current_ticket_count) == (0, 0)
+
+
+def test_recompute_members_locks_only_the_given_members_in_order(db, service):
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from sqlalchemy.dialects import postgresql
+    
+    member_queries = []
+    
+    @sqlalchemy.event.listens_for(db, "do_orm_execute")
+    def capture(orm_execute_state):
+        sql = str(orm_execute_state.statement.compile(dialect=postgresql.dialect()))
+        if "FROM team_members" in sql:
+            member_queries.append(sql)
+    
+    member(db, "carol").current_story_points = 4
+    member_queries.clear()
+    
+    assert service.recompute_members(["bob", "alice"]) == 2
+    
+    assert len(member_queries) == 1
+    assert "ORDER BY team_members.username" in member_queries[0]
+    assert member_queries[0].rstrip().endswith("FOR UPDATE")
+    # Members outside the batch are neither locked nor touched
+    assert member(db, "carol").current_story_points == 4
+    
+    member_queries.clear()
+    service.recompute_members()
+    assert "FOR UPDATE" not in member_queries[0]
@@ -0,0 +1,104 @@
+"""
+Tests for embedding backend selection and the local hashing backend
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+embedding_backends = pytest.importorskip("app.services.embedding_backends")
+
+HashingEmbeddingBackend = embedding_backends.HashingEmbeddingBackend
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cosine(a, b):
+    return float(np.dot(a, b))
+
+
+def test_vectors_are_deterministic_within_a_process():
+    first = HashingEmbeddingBackend(dims=256).embed(["Add OAuth login with GitHub"])
+    second = HashingEmbeddingBackend(dims=256).embed(["Add OAuth login with GitHub"])
+    
+    assert first == second
+
+
+def test_vectors_are_deterministic_across_processes():
+    # hash() is salted per process; the backend must not depend on it
+    script = (
+        "from app.services.embedding_backends import HashingEmbeddingBackend;"
+        "print(HashingEmbeddingBackend(dims=64).embed(['Add OAuth login'])[0])"
+    )
+    outputs = set()
+    for seed in ("1", "2"):
+        env = {**os.environ, "PYTHONHASHSEED": seed}
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        outputs.add(result.stdout.strip().splitlines()[-1])
+    
+    assert len(outputs) == 1
+
+
+def test_vectors_are_unit_length_with_configured_dims():
+    vectors = HashingEmbeddingBackend(dims=128).embed(["Password reset via email", "Export report as CSV"])
+    
+    assert [len(vector) for vector in vectors] == [128, 128]
+    for vector in vectors:
+        assert np.linalg.norm(vector) == pytest.approx(1.0, rel=1e-5)
+
+
+def test_empty_text_embeds_to_zero_vector():
+    vector = HashingEmbeddingBackend(dims=32).embed([""])[0]
+    
+    assert vector == [0.0] * 32
+
+
+def test_related_texts_are_closer_than_unrelated():
+    login, oauth, report = HashingEmbeddingBackend(dims=1024).embed([
+        "Add OAuth login with GitHub",
+        "Support GitHub OAuth login for users",
+        "Export the monthly billing report as CSV"
+    ])
+    
+    assert cosine(login, oauth) > cosine(login, report)
+
+
+def test_backend_name_and_collections_depend_on_dims():
+    backend = HashingEmbeddingBackend(dims=512)
+    
+    assert backend.name == "local-hashing-v1-512"
+    assert backend.collection_suffix == "local512"
+    assert backend.remote is False
+
+
+def test_create_local_backend_uses_configured_dims(monkeypatch):
+    monkeypatch.setattr(embedding_backends.settings, "local_embedding_dims", 256)
+    
+    backend = embedding_backends.create_embedding_backend("local")
+    
+    assert isinstance(backend, HashingEmbeddingBackend)
+    assert backend.dims == 256
+
+
+@pytest.mark.parametrize("api_key, expected", [
+    ("", HashingEmbeddingBackend),
+    ("sk-test", embedding_backends.OpenAIEmbeddingBackend),
+])
+def test_auto_backend_follows_api_key(monkeypatch, api_key, expected):
+    monkeypatch.setattr(embedding_backends.settings, "openai_api_key", api_key)
+    
+    assert isinstance(embedding_backends.create_embedding_backend("auto"), expected)
+
+
+def test_backend_without_embed_cannot_be_instantiated():
+    class IncompleteBackend(embedding_backends.EmbeddingBackend):
+        name = "incomplete"
+    
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+    with pytest.raises(TypeError):
+        embedding_backends.EmbeddingBackend()
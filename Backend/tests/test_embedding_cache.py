@@ -0,0 +1,98 @@
+"""
+Tests for the SQLite embedding cache
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+embedding_cache = pytest.importorskip("app.services.embedding_cache")
+
+EmbeddingCache = embedding_cache.EmbeddingCache
+
+MODEL = "text-embedding-3-small"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+
+
+def test_round_trip_as_float32(cache):
+    cache.put(MODEL, "Add OAuth login", [0.1, 0.2, 0.3])
+    
+    assert cache.get(MODEL, "Add OAuth login") == pytest.approx([0.1, 0.2, 0.3], rel=1e-6)
+    assert cache.get(MODEL, "Something else") is None
+
+
+def test_whitespace_is_normalized(cache):
+    cache.put(MODEL, "Add  OAuth\nlogin ", [1.0, 0.0])
+    
+    assert cache.get(MODEL, "Add OAuth login") == [1.0, 0.0]
+    assert EmbeddingCache.text_hash(" a\tb ") == EmbeddingCache.text_hash("a b")
+
+
+def test_models_do_not_share_vectors(cache):
+    cache.put(MODEL, "Add OAuth login", [1.0, 0.0])
+    
+    assert cache.get("local-hashing-v1-1024", "Add OAuth login") is None
+
+
+def test_get_many_keeps_order_and_counts_hits(cache):
+    cache.put_many(MODEL, ["first", "second"], [[1.0], [2.0]])
+    
+    results = cache.get_many(MODEL, ["second", "missing", "first", "second"])
+    
+    assert results == [[2.0], None, [1.0], [2.0]]
+    stats = cache.get_stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["stores"] == 2
+    assert stats["entries"] == 2
+    assert stats["hit_rate"] == 0.75
+
+
+def test_empty_embeddings_are_not_stored(cache):
+    cache.put_many(MODEL, ["failed", "ok"], [[], [1.0]])
+    
+    assert cache.get(MODEL, "failed") is None
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_put_replaces_existing_vector(cache):
+    cache.put(MODEL, "text", [1.0, 0.0])
+    cache.put(MODEL, "text", [0.0, 1.0])
+    
+    assert cache.get(MODEL, "text") == [0.0, 1.0]
+
+
+def test_get_many_over_parameter_chunk(cache):
+    texts = [f"story {i}" for i in range(1200)]
+    cache.put_many(MODEL, texts, [[float(i)] for i in range(1200)])
+    
+    results = cache.get_many(MODEL, texts)
+    
+    assert results[0] == [0.0]
+    assert results[-1] == [1199.0]
+    assert all(result is not None for result in results)
+
+
+def test_clear_one_model(cache):
+    cache.put(MODEL, "text", [1.0])
+    cache.put("other-model", "text", [2.0])
+    
+    cache.clear(MODEL)
+    
+    assert cache.get(MODEL, "text") is None
+    assert cache.get("other-model", "text") == [2.0]
+
+
+def test_vectors_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    EmbeddingCache(path).put(MODEL, "text", [0.5, 0.5])
+    
+    assert EmbeddingCache(path).get(MODEL, "text") == [0.5, 0.5]
+
+
+def test_disabled_cache_is_none(monkeypatch):
+    monkeypatch.setattr(embedding_cache.settings, "embedding_cache_enabled", False)
+    
+    assert embedding_cache.get_embedding_cache() is None
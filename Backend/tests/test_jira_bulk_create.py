@@ -0,0 +1,121 @@
+"""
+Tests for bulk Jira issue creation: per-issue rejections fail their story,
+chunk-level failures leave stories for the per-story create_issue stage
+"""
+import asyncio
+
+import pytest
+
+jira_service = pytest.importorskip("app.services.jira_service")
+story_service = pytest.importorskip("app.services.story_service")
+models = pytest.importorskip("app.models")
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = str(body)
+    
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, outcome):
+        self.outcome = outcome
+    
+    def post(self, url, json=None, headers=None):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+class FakeJira:
+    def __init__(self, outcome):
+        self._options = {"server": "https://jira.example.com"}
+        self._session = FakeSession(outcome)
+
+
+def make_jira_service(outcome):
+    service = jira_service.JiraService.__new__(jira_service.JiraService)
+    service.jira = FakeJira(outcome)
+    service.project_key = "PROJ"
+    return service
+
+
+def test_rejected_issue_is_not_retryable():
+    service = make_jira_service(FakeResponse(201, {
+        "issues": [{"key": "PROJ-1", "id": "1"}],
+        "errors": [{"failedElementNumber": 1, "status": 400, "elementErrors": {"errors": {"summary": "required"}}}]
+    }))
+    
+    results = service.create_issues_bulk([{}, {}])
+    
+    assert results[0] == {"key": "PROJ-1", "id": "1"}
+    assert results[1] == {"error": "summary: required"}
+
+
+def test_transport_error_marks_whole_chunk_retryable():
+    service = make_jira_service(ConnectionError("connection reset"))
+    
+    results = service.create_issues_bulk([{}, {}, {}])
+    
+    assert len(results) == 3
+    assert all(result["retryable"] for result in results)
+
+
+def test_server_error_without_element_errors_is_retryable():
+    service = make_jira_service(FakeResponse(503, {}))
+    
+    results = service.create_issues_bulk([{}, {}])
+    
+    assert all(result["retryable"] for result in results)
+
+
+class StubJiraService:
+    def __init__(self, results):
+        self.results = results
+    
+    def build_issue_fields(self, **fields):
+        return fields
+    
+    def create_issues_bulk(self, issues):
+        return self.results[:len(issues)]
+
+
+def add_story(db, title):
+    story_request = models.StoryRequest(
+        user_prompt=f"Build {title} for the checkout flow",
+        generated_title=title,
+        generated_description=f"{title} description",
+        estimated_points=3,
+        status="processing",
+        pipeline_stage="estimate",
+        pipeline_options={"prompt": f"Build {title} for the checkout flow", "project_key": "PROJ"}
+    )
+    db.add(story_request)
+    db.commit()
+    return story_request
+
+
+def test_bulk_create_fails_only_rejected_stories(db):
+    created, rejected, unreached = (add_story(db, title) for title in ("Login", "Logout", "Signup"))
+    stub = StubJiraService([
+        {"key": "PROJ-1", "id": "1"},
+        {"error": "summary: required"},
+        {"error": "connection reset", "retryable": True}
+    ])
+    service = story_service.StoryService(db, ai_service=object(), jira_service=stub)
+    
+    asyncio.run(service.create_jira_issues_bulk([created.request_id, rejected.request_id, unreached.request_id]))
+    
+    assert created.jira_issue_key == "PROJ-1"
+    assert created.pipeline_stage == "create_issue"
+    assert rejected.status == "failed"
+    assert "summary: required" in rejected.error_message
+    # Left for the per-story create_issue stage
+    assert unreached.status == "processing"
+    assert unreached.jira_issue_key is None
+    assert unreached.pipeline_stage == "estimate"
+    assert unreached.error_message is None
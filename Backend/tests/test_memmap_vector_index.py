@@ -0,0 +1,139 @@
+"""
+Tests for the memory-mapped vector index and its generation swap
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+numpy_vector_index = pytest.importorskip("app.services.numpy_vector_index")
+
+MemmapVectorIndex = numpy_vector_index.MemmapVectorIndex
+NumpyVectorStore = numpy_vector_index.NumpyVectorStore
+
+COSINE = {"hnsw:space": "cosine"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return MemmapVectorIndex("stories", str(tmp_path), COSINE)
+
+
+def generation(tmp_path):
+    return int((tmp_path / "stories.current").read_text())
+
+
+def generation_files(tmp_path):
+    return sorted(path.name for path in tmp_path.glob("stories.0*"))
+
+
+def test_vectors_are_mapped_read_only(index, tmp_path):
+    index.add(ids=["PROJ-1", "PROJ-2"], embeddings=[[3.0, 4.0], [0.0, 1.0]], documents=["login", "report"])
+    
+    assert isinstance(index._matrix, np.memmap)
+    assert not index._matrix.flags.writeable
+    assert index._matrix[0].tolist() == pytest.approx([0.6, 0.8])
+    assert (tmp_path / "stories.00000001.vec").read_bytes()[:8] == numpy_vector_index.MEMMAP_MAGIC
+
+
+def test_query_matches_numpy_index(index, tmp_path):
+    numpy_index = numpy_vector_index.NumpyVectorIndex("plain", str(tmp_path), COSINE)
+    ids = ["PROJ-1", "PROJ-2", "PROJ-3"]
+    embeddings = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 1.0, 0.0]]
+    metadatas = [{"type": "Story"}, {"type": "Bug"}, {"type": "Story"}]
+    for collection in (index, numpy_index):
+        collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas)
+    
+    for where in (None, {"type": "Story"}):
+        expected = numpy_index.query(query_embeddings=[[1.0, 0.2, 0.0]], n_results=2, where=where)
+        results = index.query(query_embeddings=[[1.0, 0.2, 0.0]], n_results=2, where=where)
+        assert results["ids"] == expected["ids"]
+        np.testing.assert_allclose(results["distances"], expected["distances"], rtol=1e-6)
+
+
+def test_each_write_publishes_a_generation(index, tmp_path):
+    index.add(ids=["PROJ-1"], embeddings=[[1.0, 0.0]])
+    assert generation(tmp_path) == 1
+    
+    index.upsert(ids=["PROJ-1"], embeddings=[[0.0, 1.0]])
+    index.add(ids=["PROJ-2"], embeddings=[[1.0, 1.0]])
+    
+    assert generation(tmp_path) == 3
+    assert index.count() == 2
+    # The previous generation is kept for readers that have not remapped yet
+    assert generation_files(tmp_path) == [
+        "stories.00000002.json", "stories.00000002.vec",
+        "stories.00000003.json", "stories.00000003.vec"
+    ]
+
+
+def test_writes_that_change_nothing_publish_nothing(index, tmp_path):
+    index.add(ids=["PROJ-1"], embeddings=[[1.0, 0.0]])
+    
+    index.add(ids=["PROJ-1"], embeddings=[[0.0, 1.0]])
+    
+    assert generation(tmp_path) == 1
+
+
+def test_readers_remap_after_another_writer(tmp_path):
+    reader = MemmapVectorIndex("stories", str(tmp_path), COSINE)
+    writer = MemmapVectorIndex("stories", str(tmp_path), COSINE)
+    writer.add(ids=["PROJ-1"], embeddings=[[1.0, 0.0]])
+    
+    reader.add(ids=["PROJ-2"], embeddings=[[0.0, 1.0]])
+    writer.upsert(ids=["PROJ-1"], embeddings=[[1.0, 1.0]])
+    
+    assert reader.query(query_embeddings=[[1.0, 1.0]], n_results=1)["ids"] == [["PROJ-1"]]
+    assert reader.count() == writer.count() == 2
+    assert generation(tmp_path) == 3
+
+
+def test_old_map_survives_generation_swap(index, tmp_path):
+    index.add(ids=["PROJ-1"], embeddings=[[1.0, 0.0]])
+    old_matrix = index._matrix
+    
+    for i in range(2, 5):
+        MemmapVectorIndex("stories", str(tmp_path)).add(ids=[f"PROJ-{i}"], embeddings=[[0.0, 1.0]])
+    
+    assert old_matrix[0].tolist() == pytest.approx([1.0, 0.0])
+    assert index.count() == 4
+
+
+def test_batch_publishes_one_generation(index, tmp_path):
+    with index.batch():
+        index.add(ids=["PROJ-1", "PROJ-2"], embeddings=[[1.0, 0.0], [0.0, 1.0]])
+        index.upsert(ids=["PROJ-2"], embeddings=[[1.0, 1.0]], documents=["replaced"])
+        index.add(ids=["PROJ-1"], embeddings=[[0.0, 1.0]], documents=["ignored"])
+        # Queued writes are not visible until the batch is published
+        assert index.count() == 0
+    
+    assert generation(tmp_path) == 1
+    results = index.query(query_embeddings=[[1.0, 1.0]], n_results=2)
+    assert results["ids"] == [["PROJ-2", "PROJ-1"]]
+    assert results["documents"] == [["replaced", None]]
+
+
+def test_failed_batch_publishes_nothing(index, tmp_path):
+    index.add(ids=["PROJ-1"], embeddings=[[1.0, 0.0]])
+    
+    with pytest.raises(RuntimeError):
+        with index.batch():
+            index.add(ids=["PROJ-2"], embeddings=[[0.0, 1.0]])
+            raise RuntimeError("embedding failed")
+    
+    assert generation(tmp_path) == 1
+    assert index.count() == 1
+
+
+def test_dimension_mismatch_is_rejected(index):
+    index.add(ids=["PROJ-1"], embeddings=[[1.0, 0.0]])
+    
+    with pytest.raises(ValueError):
+        index.add(ids=["PROJ-2"], embeddings=[[1.0, 0.0, 0.0]])
+
+
+def test_store_selects_memmap_collections(tmp_path):
+    store = NumpyVectorStore(str(tmp_path), memory_mapped=True)
+    
+    collection = store.get_or_create_collection("stories", COSINE)
+    
+    assert isinstance(collection, MemmapVectorIndex)
+    assert store.get_or_create_collection("stories") is collection
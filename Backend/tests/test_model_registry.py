@@ -0,0 +1,48 @@
+"""
+Tests for the per-event-loop pooled HTTP client
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+model_registry = pytest.importorskip("app.services.model_registry")
+
+
+def test_run_async_closes_the_loop_client():
+    async def use_client():
+        client = model_registry._get_async_http_client()
+        assert client is model_registry._get_async_http_client()
+        return client
+    
+    client = model_registry.run_async(use_client())
+    
+    assert client.is_closed
+    assert client not in model_registry._ASYNC_HTTP_CLIENTS.values()
+
+
+def test_run_async_closes_the_client_when_the_coroutine_fails():
+    clients = []
+    
+    async def fail():
+        clients.append(model_registry._get_async_http_client())
+        raise RuntimeError("stage failed")
+    
+    with pytest.raises(RuntimeError):
+        model_registry.run_async(fail())
+    
+    assert clients[0].is_closed
+
+
+def test_each_loop_gets_its_own_client():
+    async def get_client():
+        return model_registry._get_async_http_client()
+    
+    first = model_registry.run_async(get_client())
+    second = model_registry.run_async(get_client())
+    
+    assert first is not second
+
+
+def test_close_without_a_client_is_a_no_op():
+    asyncio.run(model_registry.close_async_http_client())
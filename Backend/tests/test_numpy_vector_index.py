@@ -0,0 +1,201 @@
+"""
+Tests for ChromaDB-style where filters and the NumPy vector index
+"""
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+numpy_vector_index = pytest.importorskip("app.services.numpy_vector_index")
+
+matches_where = numpy_vector_index.matches_where
+NumpyVectorIndex = numpy_vector_index.NumpyVectorIndex
+
+COSINE = {"hnsw:space": "cosine"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return NumpyVectorIndex("stories", str(tmp_path), COSINE)
+
+
+def add_basis(index):
+    index.add(
+        ids=["PROJ-1", "PROJ-2", "PROJ-3"],
+        embeddings=[[1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [1.0, 1.0, 0.0]],
+        documents=["login", "report", "login report"],
+        metadatas=[{"points": 3, "type": "Story"}, {"points": 8, "type": "Bug"}, {"points": 5, "type": "Story"}]
+    )
+
+
+# ============= matches_where =============
+
+@pytest.mark.parametrize("where, expected", [
+    (None, True),
+    ({}, True),
+    ({"type": "Story"}, True),
+    ({"type": "Bug"}, False),
+    ({"type": {"$eq": "Story"}}, True),
+    ({"type": {"$ne": "Story"}}, False),
+    ({"points": {"$in": [3, 5]}}, True),
+    ({"points": {"$nin": [3, 5]}}, False),
+    ({"points": {"$gt": 5}}, False),
+    ({"points": {"$gte": 5}}, True),
+    ({"points": {"$lt": 5}}, False),
+    ({"points": {"$lte": 5}}, True),
+    ({"points": {"$gte": 3, "$lt": 8}}, True),
+    ({"$and": [{"type": "Story"}, {"points": {"$gt": 3}}]}, True),
+    ({"$and": [{"type": "Story"}, {"points": {"$gt": 5}}]}, False),
+    ({"$or": [{"type": "Bug"}, {"points": 5}]}, True),
+    ({"$or": [{"type": "Bug"}, {"points": 8}]}, False),
+])
+def test_matches_where(where, expected):
+    assert matches_where({"type": "Story", "points": 5}, where) is expected
+
+
+def test_range_operators_never_match_missing_values():
+    assert matches_where({}, {"points": {"$gt": 0}}) is False
+    assert matches_where({}, {"points": {"$ne": 3}}) is True
+
+
+# ============= NumpyVectorIndex =============
+
+def test_query_returns_nearest_first(index):
+    add_basis(index)
+    
+    results = index.query(query_embeddings=[[1.0, 0.1, 0.0]], n_results=2)
+    
+    assert results["ids"] == [["PROJ-1", "PROJ-3"]]
+    assert results["documents"] == [["login", "login report"]]
+    assert results["metadatas"][0][0] == {"points": 3, "type": "Story"}
+    assert results["distances"][0][0] < results["distances"][0][1]
+
+
+def test_query_batch_answers_each_query(index):
+    add_basis(index)
+    
+    results = index.query(query_embeddings=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], n_results=1)
+    
+    assert results["ids"] == [["PROJ-1"], ["PROJ-2"]]
+    assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_distances_match_chromadb_spaces(tmp_path):
+    cosine = NumpyVectorIndex("cosine", str(tmp_path), COSINE)
+    l2 = NumpyVectorIndex("l2", str(tmp_path))
+    for collection in (cosine, l2):
+        collection.add(ids=["a"], embeddings=[[0.0, 1.0]])
+    
+    # Orthogonal unit vectors: 1 - cos = 1, squared L2 = 2
+    assert cosine.query(query_embeddings=[[1.0, 0.0]], n_results=1)["distances"] == [[pytest.approx(1.0)]]
+    assert l2.query(query_embeddings=[[1.0, 0.0]], n_results=1)["distances"] == [[pytest.approx(2.0)]]
+
+
+def test_query_applies_where_filter(index):
+    add_basis(index)
+    
+    results = index.query(query_embeddings=[[1.0, 0.0, 0.0]], n_results=5, where={"type": "Bug"})
+    
+    assert results["ids"] == [["PROJ-2"]]
+
+
+def test_query_include_limits_fields(index):
+    add_basis(index)
+    
+    results = index.query(query_embeddings=[[1.0, 0.0, 0.0]], n_results=1, include=["distances"])
+    
+    assert set(results) == {"ids", "distances"}
+
+
+def test_query_without_candidates_returns_empty_lists(index):
+    results = index.query(query_embeddings=[[1.0, 0.0], [0.0, 1.0]], n_results=3)
+    
+    assert results["ids"] == [[], []]
+    assert results["distances"] == [[], []]
+
+
+def test_add_keeps_existing_ids_and_upsert_replaces(index):
+    add_basis(index)
+    
+    index.add(ids=["PROJ-1"], embeddings=[[0.0, 0.0, 1.0]], documents=["changed"])
+    assert index.query(query_embeddings=[[1.0, 0.0, 0.0]], n_results=1)["documents"] == [["login"]]
+    
+    index.upsert(ids=["PROJ-1", "PROJ-4"], embeddings=[[0.0, 0.0, 1.0], [0.0, 1.0, 1.0]], documents=["changed", "new"])
+    results = index.query(query_embeddings=[[0.0, 0.0, 1.0]], n_results=1)
+    assert results["ids"] == [["PROJ-1"]]
+    assert results["documents"] == [["changed"]]
+    assert index.count() == 4
+
+
+def test_dimension_mismatch_is_rejected(index):
+    add_basis(index)
+    
+    with pytest.raises(ValueError):
+        index.add(ids=["PROJ-9"], embeddings=[[1.0, 0.0]])
+
+
+def test_collection_persists(tmp_path):
+    add_basis(NumpyVectorIndex("stories", str(tmp_path), COSINE))
+    
+    reopened = NumpyVectorIndex("stories", str(tmp_path))
+    
+    assert reopened.count() == 3
+    assert reopened.metadata == COSINE
+    assert reopened.query(query_embeddings=[[0.0, 1.0, 0.0]], n_results=1)["ids"] == [["PROJ-2"]]
+
+
+def test_writers_in_other_processes_are_not_lost(tmp_path):
+    # Two instances on one directory stand in for two worker processes
+    first = NumpyVectorIndex("stories", str(tmp_path), COSINE)
+    second = NumpyVectorIndex("stories", str(tmp_path), COSINE)
+    
+    first.add(ids=["PROJ-1"], embeddings=[[1.0, 0.0]])
+    second.add(ids=["PROJ-2"], embeddings=[[0.0, 1.0]])
+    first.add(ids=["PROJ-3"], embeddings=[[1.0, 1.0]])
+    
+    assert first.count() == 3
+    assert second.count() == 3
+    assert NumpyVectorIndex("stories", str(tmp_path)).count() == 3
+
+
+def test_inconsistent_files_are_never_saved_over(tmp_path):
+    index = NumpyVectorIndex("stories", str(tmp_path), COSINE)
+    add_basis(index)
+    sidecar_path = tmp_path / "stories.json"
+    sidecar = json.loads(sidecar_path.read_text())
+    sidecar["ids"].append("PROJ-9")
+    edited = tmp_path / "stories.json.edit"
+    edited.write_text(json.dumps(sidecar))
+    os.replace(edited, sidecar_path)
+    
+    # Reads keep the last good state; writes refuse rather than persist a partial view
+    assert index.count() == 3
+    with pytest.raises(ValueError):
+        index.add(ids=["PROJ-4"], embeddings=[[0.0, 0.0, 1.0]])
+    assert json.loads(sidecar_path.read_text())["ids"] == sidecar["ids"]
+
+
+def test_batch_saves_once(index, monkeypatch):
+    saves = []
+    original_save = index._save
+    monkeypatch.setattr(index, "_save", lambda: saves.append(1) or original_save())
+    
+    with index.batch():
+        for i in range(5):
+            index.upsert(ids=[f"PROJ-{i}"], embeddings=[[1.0, float(i)]])
+    
+    assert len(saves) == 1
+    assert NumpyVectorIndex("stories", index._directory).count() == 5
+
+
+def test_failed_batch_is_discarded(index):
+    add_basis(index)
+    
+    with pytest.raises(RuntimeError):
+        with index.batch():
+            index.add(ids=["PROJ-4"], embeddings=[[0.0, 0.0, 1.0]])
+            raise RuntimeError("embedding failed")
+    
+    assert index.count() == 3
+    assert "PROJ-4" not in index.query(query_embeddings=[[0.0, 0.0, 1.0]], n_results=5)["ids"][0]
@@ -0,0 +1,76 @@
+"""
+Tests for semantic cache write buffering on the NumPy vector store
+"""
+import pytest
+
+pytest.importorskip("numpy")
+semantic_cache = pytest.importorskip("app.services.semantic_cache")
+numpy_vector_index = pytest.importorskip("app.services.numpy_vector_index")
+embedding_backends = pytest.importorskip("app.services.embedding_backends")
+
+
+class StubVectorService:
+    """Local embeddings and a NumPy store, without VectorService's settings"""
+    
+    def __init__(self, directory, memory_mapped=False):
+        self.store = numpy_vector_index.NumpyVectorStore(directory, memory_mapped=memory_mapped)
+        self.backend = embedding_backends.HashingEmbeddingBackend(dims=256)
+    
+    def get_collection(self, name, metadata=None):
+        return self.store.get_or_create_collection(name, metadata)
+    
+    def generate_embedding(self, text):
+        return self.backend.embed([text])[0]
+
+
+@pytest.fixture(params=[False, True], ids=["numpy", "memmap"])
+def cache(tmp_path, request):
+    return semantic_cache.SemanticCache(
+        StubVectorService(str(tmp_path), memory_mapped=request.param),
+        threshold=0.9,
+        flush_size=3,
+        flush_interval=3600
+    )
+
+
+def test_stores_are_buffered_until_flush_size(cache, monkeypatch):
+    writes = []
+    upsert = cache.collection.upsert
+    monkeypatch.setattr(cache.collection, "upsert", lambda **kwargs: writes.append(len(kwargs["ids"])) or upsert(**kwargs))
+    
+    for i in range(2):
+        cache.store("estimate", "gpt", f"Add login provider {i}", {"points": 3})
+    assert writes == []
+    assert cache.collection.count() == 0
+    
+    cache.store("estimate", "gpt", "Add login provider 2", {"points": 3})
+    assert writes == [3]
+    assert cache.collection.count() == 3
+
+
+def test_buffered_entries_are_served(cache):
+    cache.store("estimate", "gpt", "Add Google login", {"points": 5})
+    
+    hit = cache.lookup("estimate", "gpt", "add google login!")
+    
+    assert hit["result"] == {"points": 5}
+    assert cache.lookup("estimate", "other-model", "Add Google login") is None
+    assert cache.lookup("generate", "gpt", "Add Google login") is None
+
+
+def test_lookup_compares_buffered_and_stored_entries(cache):
+    cache.store("estimate", "gpt", "Add Google login", {"points": 5})
+    cache.flush()
+    cache.store("estimate", "gpt", "Export billing report", {"points": 2})
+    
+    assert cache.lookup("estimate", "gpt", "Add Google login")["result"] == {"points": 5}
+    assert cache.lookup("estimate", "gpt", "Export billing report")["result"] == {"points": 2}
+
+
+def test_flush_interval_triggers_write(tmp_path):
+    cache = semantic_cache.SemanticCache(StubVectorService(str(tmp_path)), flush_size=50, flush_interval=0)
+    
+    cache.store("estimate", "gpt", "Add Google login", {"points": 5})
+    
+    assert cache.collection.count() == 1
+    assert cache.get_stats()["pending_writes"] == 0
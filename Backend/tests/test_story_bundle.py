@@ -0,0 +1,121 @@
+"""
+Tests for fused story bundle validation and the pipeline_mode option
+"""
+import asyncio
+import json
+
+import pytest
+
+ai_service = pytest.importorskip("app.services.ai_service")
+schemas = pytest.importorskip("app.schemas")
+
+validate = ai_service.AIService._validate_story_bundle
+
+
+def make_bundle(**overrides):
+    bundle = {
+        "title": "Add OAuth login",
+        "description": "Users sign in with Google or GitHub",
+        "acceptance_criteria": ["Google login works", "GitHub login works"],
+        "points": "5",
+        "subtasks": []
+    }
+    bundle.update(overrides)
+    return bundle
+
+
+def test_valid_bundle_is_normalized():
+    result = validate(make_bundle())
+    
+    assert result["points"] == 5
+    assert result["subtasks"] == []
+    assert result["required_skills"] == []
+    assert result["reasoning"] == ""
+    assert result["confidence"] == 0.5
+
+
+def test_missing_subtasks_key_becomes_empty_list():
+    bundle = make_bundle()
+    del bundle["subtasks"]
+    
+    assert validate(bundle)["subtasks"] == []
+
+
+@pytest.mark.parametrize("bundle", [
+    "not a dict",
+    make_bundle(title=""),
+    make_bundle(description=None),
+    make_bundle(acceptance_criteria="Google login works"),
+    make_bundle(points="many"),
+    make_bundle(points=4),
+    make_bundle(points=0),
+    make_bundle(points=None),
+    make_bundle(subtasks=[{"description": "no title"}]),
+    make_bundle(subtasks="Write tests"),
+])
+def test_invalid_bundles_are_rejected(bundle):
+    with pytest.raises(ValueError):
+        validate(bundle)
+
+
+def test_large_story_without_subtasks_is_rejected_above_threshold():
+    with pytest.raises(ValueError, match="no 'subtasks'"):
+        validate(make_bundle(points=8), breakdown_threshold=5)
+
+
+def test_story_at_threshold_needs_no_subtasks():
+    assert validate(make_bundle(points=5), breakdown_threshold=5)["points"] == 5
+
+
+def test_large_story_with_subtasks_is_accepted():
+    subtasks = [{"title": "Google provider"}, {"title": "GitHub provider"}]
+    result = validate(make_bundle(points=8, subtasks=subtasks), breakdown_threshold=5)
+    
+    assert result["subtasks"] == subtasks
+
+
+def test_threshold_is_not_checked_without_breakdown():
+    assert validate(make_bundle(points=13))["points"] == 13
+
+
+@pytest.mark.parametrize("breakdown_threshold, accepted", [(5, False), (None, True)])
+def test_generate_story_bundle_skips_breakdown_rule_when_off(breakdown_threshold, accepted):
+    service = ai_service.AIService.__new__(ai_service.AIService)
+    service.vector_service = None
+    service.model_instance = {}
+    prompts = []
+    
+    async def call_model(messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        return json.dumps(make_bundle(points=13))
+    
+    service._call_model = call_model
+    generate = service.generate_story_bundle("Add OAuth login", breakdown_threshold=breakdown_threshold)
+    
+    if accepted:
+        assert asyncio.run(generate)["points"] == 13
+        assert "Do not break the story down" in prompts[0]
+    else:
+        with pytest.raises(ValueError, match="no 'subtasks'"):
+            asyncio.run(generate)
+
+
+def test_pipeline_mode_accepts_known_modes():
+    for mode in ("staged", "fused", "speculative", None):
+        request = schemas.StoryCreateRequest(
+            prompt="Create a user login feature",
+            project_key="PROJ",
+            pipeline_mode=mode
+        )
+        assert request.pipeline_mode == mode
+
+
+def test_pipeline_mode_rejects_unknown_mode():
+    pydantic = pytest.importorskip("pydantic")
+    
+    with pytest.raises(pydantic.ValidationError):
+        schemas.StoryCreateRequest(
+            prompt="Create a user login feature",
+            project_key="PROJ",
+            pipeline_mode="parallel"
+        )
@@ -0,0 +1,168 @@
+"""
+Tests for webhook log replay: resets scoped to the replayed events, and resuming
+"""
+from datetime import datetime
+
+import pytest
+
+webhook_service = pytest.importorskip("app.services.webhook_service")
+models = pytest.importorskip("app.models")
+
+WebhookService = webhook_service.WebhookService
+
+JANUARY = datetime(2024, 1, 1)
+FEBRUARY = datetime(2024, 2, 1)
+MID_JANUARY = datetime(2024, 1, 15)
+
+
+@pytest.fixture
+def service(db, capacity_service):
+    db.add(models.StoryRequest(user_prompt="Login", jira_issue_key="PROJ-1", estimated_points=5))
+    db.commit()
+    return WebhookService(db, capacity_service=capacity_service)
+
+
+def points_change(to_value):
+    return {"field": "Story Points", "fromString": "5", "toString": str(to_value)}
+
+
+def reassignment(from_user, to_user):
+    return {"field": "assignee", "from": from_user, "to": to_user}
+
+
+def record_processed(service, payload, received_at):
+    event = service.record_event(payload)
+    event.received_at = received_at
+    service.db.commit()
+    service.process_pending(batch_size=10)
+    return event
+
+
+def feedback_rows(db):
+    return db.query(models.FeedbackEstimation).order_by(models.FeedbackEstimation.id).all()
+
+
+def test_filtered_replay_keeps_learning_from_other_events(service, db, issue_updated):
+    db.add(models.FeedbackEstimation(issue_key="PROJ-1", ai_estimated_points=5, human_estimated_points=3))
+    db.commit()
+    january = record_processed(service, issue_updated("PROJ-1", 100, [points_change(8)]), JANUARY)
+    february = record_processed(service, issue_updated("PROJ-1", 101, [points_change(13)]), FEBRUARY)
+    
+    stats = service.replay(since=MID_JANUARY)
+    
+    assert stats["events"] == 1
+    assert stats["changes_captured"] == 1
+    rows = feedback_rows(db)
+    assert sorted((row.webhook_event_id or 0, row.human_estimated_points) for row in rows) == [
+        (0, 3), (january.id, 8), (february.id, 13)
+    ]
+
+
+def test_replay_is_idempotent(service, db, issue_updated):
+    record_processed(service, issue_updated("PROJ-1", 100, [points_change(8)]), JANUARY)
+    record_processed(service, issue_updated("PROJ-1", 101, [points_change(13)]), FEBRUARY)
+    
+    service.replay()
+    service.replay()
+    
+    assert [row.human_estimated_points for row in feedback_rows(db)] == [8, 13]
+
+
+def test_replay_drops_retries(service, db, issue_updated):
+    payload = issue_updated("PROJ-1", 100, [points_change(8)])
+    service.record_event(payload)
+    service.record_event(payload)
+    db.commit()
+    
+    stats = service.replay()
+    
+    assert stats["duplicates"] == 1
+    assert [row.human_estimated_points for row in feedback_rows(db)] == [8]
+
+
+def test_replay_leaves_reassignments_it_did_not_produce(service, db, issue_updated):
+    db.add(models.AssignmentHistory(issue_key="PROJ-1", was_reassigned=True, reassignment_reason="Set by hand"))
+    db.commit()
+    record_processed(service, issue_updated("PROJ-1", 100, [points_change(8)]), JANUARY)
+    
+    service.replay()
+    
+    assignment = db.query(models.AssignmentHistory).one()
+    assert assignment.was_reassigned is True
+    assert assignment.reassignment_reason == "Set by hand"
+
+
+def test_replay_rebuilds_reassignments_from_replayed_events(service, db, issue_updated):
+    db.add(models.AssignmentHistory(issue_key="PROJ-1", assignee="alice"))
+    db.commit()
+    event = record_processed(service, issue_updated("PROJ-1", 100, [reassignment("alice", "bob")]), JANUARY)
+    
+    service.replay()
+    
+    assignment = db.query(models.AssignmentHistory).one()
+    assert assignment.was_reassigned is True
+    assert assignment.reassignment_event_id == event.id
+    assert assignment.reassignment_reason == "Manually reassigned from alice to bob"
+
+
+def test_replayed_older_event_keeps_newer_reassignment(service, db, issue_updated):
+    db.add(models.AssignmentHistory(issue_key="PROJ-1", assignee="alice"))
+    db.commit()
+    record_processed(service, issue_updated("PROJ-1", 100, [reassignment("alice", "bob")]), JANUARY)
+    february = record_processed(service, issue_updated("PROJ-1", 101, [reassignment("bob", "carol")]), FEBRUARY)
+    
+    service.replay(until=MID_JANUARY)
+    
+    assignment = db.query(models.AssignmentHistory).one()
+    assert assignment.reassignment_event_id == february.id
+    assert assignment.reassignment_reason == "Manually reassigned from bob to carol"
+
+
+def test_replay_resumes_after_cursor(service, db, issue_updated, capacity_service):
+    events = []
+    for issue_key in ("PROJ-1", "PROJ-2", "PROJ-3"):
+        events.append(service.record_event(issue_updated(issue_key, issue_key, [points_change(8)])))
+    db.commit()
+    
+    stats = service.replay(chunk_size=1, resume_after=("PROJ-1", events[0].id))
+    
+    assert stats["events"] == 2
+    assert stats["issues"] == 2
+    assert sorted(key for _, key, _ in capacity_service.changes) == ["PROJ-2", "PROJ-3"]
+    assert stats["cursor"] == ["PROJ-3", events[2].id]
+    assert service.replay_cursor == ("PROJ-3", events[2].id)
+
+
+def test_replay_cursor_tracks_committed_issues(service, db, issue_updated):
+    events = [
+        service.record_event(issue_updated(issue_key, issue_key, [points_change(8)]))
+        for issue_key in ("PROJ-1", "PROJ-2", "PROJ-3")
+    ]
+    db.commit()
+    cursors = []
+    
+    service.replay(chunk_size=1, progress=lambda stats: cursors.append(service.replay_cursor))
+    
+    # The last issue of each chunk may continue in the next one, so it is committed a chunk later
+    assert cursors == [None, ("PROJ-1", events[0].id), ("PROJ-2", events[1].id)]
+
+
+def test_replay_bounded_by_until_leaves_ledger(service, issue_updated, capacity_service):
+    record_processed(service, issue_updated("PROJ-1", 100, [points_change(8)]), JANUARY)
+    capacity_service.changes.clear()
+    capacity_service.recomputed.clear()
+    
+    service.replay(until=MID_JANUARY)
+    
+    assert capacity_service.changes == []
+    assert capacity_service.recomputed == []
+
+
+def test_replay_of_some_event_types_leaves_ledger(service, issue_updated, capacity_service):
+    record_processed(service, issue_updated("PROJ-1", 100, [points_change(8)]), JANUARY)
+    capacity_service.changes.clear()
+    
+    stats = service.replay(event_types=["jira:issue_updated"])
+    
+    assert capacity_service.changes == []
+    assert stats["changes_captured"] == 1
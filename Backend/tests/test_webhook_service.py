@@ -0,0 +1,134 @@
+"""
+Tests for queued webhook processing: retry dedupe and per-issue coalescing
+"""
+import importlib
+
+import pytest
+
+webhook_service = pytest.importorskip("app.services.webhook_service")
+models = pytest.importorskip("app.models")
+
+WebhookService = webhook_service.WebhookService
+
+POINTS_CHANGE = {"field": "Story Points", "fromString": "5", "toString": "8"}
+STATUS_CHANGE = {"field": "status", "fromString": "To Do", "toString": "In Progress"}
+SUMMARY_CHANGE = {"field": "summary", "fromString": "Old", "toString": "New"}
+
+
+@pytest.fixture
+def service(db, capacity_service):
+    return WebhookService(db, capacity_service=capacity_service)
+
+
+def record(service, *payloads):
+    events = [service.record_event(payload) for payload in payloads]
+    service.db.commit()
+    return events
+
+
+def test_dedupe_key_prefers_changelog_id(service, issue_updated):
+    event = service.record_event(issue_updated("PROJ-1", 100, [STATUS_CHANGE]))
+    
+    assert event.changelog_id == "100"
+    assert webhook_service.dedupe_key(event) == ("PROJ-1", "100")
+
+
+def test_dedupe_key_falls_back_to_timestamp(service):
+    event = service.record_event({
+        "webhookEvent": "jira:issue_created",
+        "timestamp": 42,
+        "issue": {"key": "PROJ-2", "fields": {}}
+    })
+    
+    assert webhook_service.dedupe_key(event) == ("PROJ-2", "jira:issue_created", 42)
+
+
+def test_retries_in_a_batch_are_dropped(service, issue_updated, capacity_service):
+    payload = issue_updated("PROJ-1", 100, [STATUS_CHANGE])
+    events = record(service, payload, payload, issue_updated("PROJ-2", 200, [STATUS_CHANGE]))
+    
+    stats = service.process_pending(batch_size=10)
+    
+    assert stats["events"] == 3
+    assert stats["duplicates"] == 1
+    assert stats["issues"] == 2
+    assert all(event.processed_at is not None for event in events)
+    assert sorted(key for _, key, _ in capacity_service.changes) == ["PROJ-1", "PROJ-2"]
+
+
+def test_retry_of_processed_change_is_dropped(service, issue_updated, capacity_service):
+    payload = issue_updated("PROJ-1", 100, [STATUS_CHANGE])
+    record(service, payload)
+    service.process_pending(batch_size=10)
+    
+    record(service, payload)
+    stats = service.process_pending(batch_size=10)
+    
+    assert stats["duplicates"] == 1
+    assert stats["issues"] == 0
+    assert len(capacity_service.changes) == 1
+
+
+def test_updates_to_one_issue_are_coalesced(service, issue_updated, capacity_service):
+    record(
+        service,
+        issue_updated("PROJ-1", 100, [STATUS_CHANGE], assignee="alice"),
+        issue_updated("PROJ-1", 101, [STATUS_CHANGE], assignee="bob"),
+        issue_updated("PROJ-1", 102, [SUMMARY_CHANGE], assignee="carol")
+    )
+    
+    stats = service.process_pending(batch_size=10)
+    
+    # One ledger change from the latest payload, even though it touched no workload field
+    assert stats["issues"] == 1
+    assert capacity_service.changes == [("jira:issue_updated", "PROJ-1", "carol")]
+    assert capacity_service.recomputed == [{"carol"}]
+
+
+def test_updates_without_workload_changes_skip_the_ledger(service, issue_updated, capacity_service):
+    record(service, issue_updated("PROJ-1", 100, [SUMMARY_CHANGE]))
+    
+    stats = service.process_pending(batch_size=10)
+    
+    assert stats["issues"] == 0
+    assert capacity_service.changes == []
+
+
+def test_every_distinct_change_is_learned(service, db, issue_updated):
+    db.add(models.StoryRequest(user_prompt="Login", jira_issue_key="PROJ-1", estimated_points=5))
+    db.commit()
+    first, second, retry = record(
+        service,
+        issue_updated("PROJ-1", 100, [POINTS_CHANGE]),
+        issue_updated("PROJ-1", 101, [{"field": "Story Points", "fromString": "8", "toString": "13"}]),
+        issue_updated("PROJ-1", 101, [{"field": "Story Points", "fromString": "8", "toString": "13"}])
+    )
+    
+    service.process_pending(batch_size=10)
+    
+    feedback = db.query(models.FeedbackEstimation).order_by(models.FeedbackEstimation.id).all()
+    assert [row.human_estimated_points for row in feedback] == [8, 13]
+    assert [row.webhook_event_id for row in feedback] == [first.id, second.id]
+
+
+def test_batch_size_limits_events_per_call(service, issue_updated):
+    record(service, *(issue_updated(f"PROJ-{i}", i, [STATUS_CHANGE]) for i in range(5)))
+    
+    assert service.process_pending(batch_size=3)["events"] == 3
+    assert service.process_pending(batch_size=3)["events"] == 2
+    assert service.process_pending(batch_size=3)["events"] == 0
+
+
+@pytest.mark.parametrize("mode, scheduled", [("inline", False), ("queued", True)])
+def test_beat_schedule_follows_ingest_mode(monkeypatch, mode, scheduled):
+    pytest.importorskip("celery")
+    from app.config import settings
+    
+    monkeypatch.setattr(settings, "webhook_ingest_mode", mode)
+    monkeypatch.setattr(settings, "webhook_batch_interval", 7)
+    celery_app = importlib.reload(importlib.import_module("celery_app"))
+    
+    schedule = celery_app.celery_app.conf.beat_schedule
+    assert ("process-webhook-events" in schedule) == scheduled
+    if scheduled:
+        assert schedule["process-webhook-events"]["schedule"] == 7.0
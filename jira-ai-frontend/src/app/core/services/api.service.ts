@@ -55,6 +55,33 @@ export class ApiService {
     );
   }
 
+  /**
+   * Subscribe to story creation stage events pushed over Server-Sent Events.
+   * Completes after a terminal stage (completed/failed); errors if the stream
+   * cannot be opened so callers can fall back to polling.
+   */
+  streamStoryEvents(requestId: string): Observable<any> {
+    return new Observable(observer => {
+      const source = new EventSource(`${this.apiUrl}/prompt/story-events/${requestId}`);
+
+      source.addEventListener('stage', (event: MessageEvent) => {
+        const data = JSON.parse(event.data);
+        observer.next(data);
+        if (data.stage === 'completed' || data.stage === 'failed') {
+          source.close();
+          observer.complete();
+        }
+      });
+
+      source.onerror = () => {
+        source.close();
+        observer.error(new Error('Story event stream closed'));
+      };
+
+      return () => source.close();
+    });
+  }
+
   getStoryStatus(requestId: string): Observable<any> {
     return this.http.get(`${this.apiUrl}/prompt/story-status/${requestId}`).pipe(
       retry(3),
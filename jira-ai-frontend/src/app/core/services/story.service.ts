@@ -15,6 +15,26 @@ export interface StoryRequest {
   autoAssign: boolean;
 }
 
+export type StoryStage =
+  | 'pending'
+  | 'processing'
+  | 'generating'
+  | 'estimating'
+  | 'jira_created'
+  | 'subtasks_created'
+  | 'assigned'
+  | 'completed'
+  | 'failed';
+
+export interface StoryStageEvent {
+  requestId: string;
+  stage: StoryStage;
+  jiraIssueKey?: string;
+  estimatedPoints?: number;
+  assignedTo?: string;
+  errorMessage?: string;
+}
+
 export interface StoryResponse {
   requestId: string;
   status: 'pending' | 'processing' | 'completed' | 'failed';
@@ -63,6 +83,19 @@ export class StoryService {
     );
   }
 
+  watchStoryEvents(requestId: string): Observable<StoryStageEvent> {
+    return this.apiService.streamStoryEvents(requestId).pipe(
+      map(event => ({
+        requestId: event.request_id,
+        stage: event.stage,
+        jiraIssueKey: event.jira_issue_key,
+        estimatedPoints: event.estimated_points,
+        assignedTo: event.assigned_to,
+        errorMessage: event.error_message
+      }))
+    );
+  }
+
   getRecentStories(): Observable<Story[]> {
     // This would typically call a backend endpoint
     // For now, return empty array as placeholder
@@ -2,8 +2,8 @@ import { Component, OnInit, OnDestroy } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { FormsModule, ReactiveFormsModule, FormBuilder, FormGroup, Validators } from '@angular/forms';
 import { Router } from '@angular/router';
-import { Subject, takeUntil, interval, switchMap, takeWhile } from 'rxjs';
-import { StoryService } from '../../core/services/story.service';
+import { Subject, takeUntil, timer, switchMap, takeWhile } from 'rxjs';
+import { StoryService, StoryStage } from '../../core/services/story.service';
 import { NotificationService } from '../../core/services/notification.service';
 import { 
   StoryRequest, 
@@ -36,6 +36,7 @@ export class StoryCreatorComponent implements OnInit, OnDestroy {
   isSubmitting = false;
   showResult = false;
   createdStory: StoryResponse | null = null;
+  currentStage: StoryStage | null = null;
   
   priorities: Priority[] = ['Highest', 'High', 'Medium', 'Low', 'Lowest'];
   issueTypes: IssueType[] = ['Story', 'Task', 'Bug'];
@@ -119,7 +120,7 @@ export class StoryCreatorComponent implements OnInit, OnDestroy {
           this.createdStory = response;
           
           if (response.status === 'processing') {
-            this.pollStoryStatus(response.requestId);
+            this.watchStoryStatus(response.requestId);
           } else if (response.status === 'completed') {
             this.isSubmitting = false;
             this.showResult = true;
@@ -138,8 +139,34 @@ export class StoryCreatorComponent implements OnInit, OnDestroy {
       });
   }
 
-  private pollStoryStatus(requestId: string): void {
-    interval(2000)
+  /**
+   * Follow progress over the server-pushed event stream, falling back to
+   * polling if the stream is unavailable.
+   */
+  private watchStoryStatus(requestId: string): void {
+    if (typeof EventSource === 'undefined') {
+      this.pollStoryStatus(requestId);
+      return;
+    }
+
+    this.storyService.watchStoryEvents(requestId)
+      .pipe(takeUntil(this.destroy$))
+      .subscribe({
+        next: (event) => {
+          this.currentStage = event.stage;
+        },
+        complete: () => {
+          // Fetch the full result once the pipeline has finished
+          this.pollStoryStatus(requestId, 0);
+        },
+        error: () => {
+          this.pollStoryStatus(requestId);
+        }
+      });
+  }
+
+  private pollStoryStatus(requestId: string, delay = 2000): void {
+    timer(delay, 2000)
       .pipe(
         takeUntil(this.destroy$),
         switchMap(() => this.storyService.getStoryStatus(requestId)),
@@ -166,9 +193,21 @@ export class StoryCreatorComponent implements OnInit, OnDestroy {
       });
   }
 
+  get stageLabel(): string {
+    switch (this.currentStage) {
+      case 'generating': return 'Generating ticket details';
+      case 'estimating': return 'Estimating complexity';
+      case 'jira_created': return 'Ticket created in Jira';
+      case 'subtasks_created': return 'Subtasks created';
+      case 'assigned': return 'Assignee selected';
+      default: return 'Analyzing requirements';
+    }
+  }
+
   createAnother(): void {
     this.showResult = false;
     this.createdStory = null;
+    this.currentStage = null;
     this.storyForm.reset({
       issueType: 'Story',
       priority: 'Medium',